@@ -0,0 +1,84 @@
+"""
+Checkpoints of long optimizer runs (optimize_params.py / genetic_optimizer.py --resume).
+
+A checkpoint is one pickle of the optimizer's state plus the identity of the
+run it belongs to: the optimizer, its search settings, the trading settings
+and a fingerprint of the candles. The candle range is kept too, so --resume
+can cut freshly synced data back to the same window; any other difference
+means the checkpoint cannot be continued exactly and is refused.
+
+Writes are atomic and durable (temp file, fsync, rename): a kill mid-write
+leaves the previous checkpoint intact.
+"""
+import os
+import pickle
+import time
+from typing import Optional
+
+import pandas as pd
+
+from config import settings
+from indicators.cache import fingerprint
+
+CHECKPOINT_VERSION = 2
+
+
+def run_identity(kind: str, df_15m: pd.DataFrame, config: dict) -> dict:
+    """What a checkpoint must match to be resumed: optimizer, search config, data and trading settings."""
+    return {
+        'kind': kind,
+        'config': config,
+        'data': fingerprint(df_15m['high'], df_15m['low'], df_15m['close']),
+        'start': df_15m.index[0] if len(df_15m) else None,
+        'end': df_15m.index[-1] if len(df_15m) else None,
+        'trading': (settings.PAPER_TRADING_BALANCE, settings.RISK_PERCENT, settings.TAKER_FEE),
+    }
+
+
+def save_checkpoint(path: str, identity: dict, state: dict) -> None:
+    """Write the optimizer state of the run `identity` atomically."""
+    payload = {
+        'version': CHECKPOINT_VERSION,
+        'saved_at': int(time.time() * 1000),
+        'identity': identity,
+        'state': state,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str) -> Optional[dict]:
+    """The saved payload, or None if there is no checkpoint; raises ValueError if it is unusable."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        raise ValueError(f"Unreadable checkpoint {path}: {e}") from e
+    if not isinstance(payload, dict) or payload.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint {path} was written by another version")
+    return payload
+
+
+def resume_window(df_15m: pd.DataFrame, checkpoint: Optional[dict]) -> pd.DataFrame:
+    """df_15m cut to the candle range of the checkpointed run (unchanged without a checkpoint)."""
+    if checkpoint is None or checkpoint['identity']['start'] is None:
+        return df_15m
+    identity = checkpoint['identity']
+    return df_15m.loc[identity['start']:identity['end']]
+
+
+def check_resumable(checkpoint: dict, identity: dict, path: str) -> None:
+    """Raise ValueError naming what differs if `checkpoint` is not a state of the run `identity`."""
+    saved = checkpoint['identity']
+    diffs = [key for key in identity if saved.get(key) != identity[key]]
+    if diffs:
+        raise ValueError(f"Checkpoint {path} belongs to another run (differs in: {', '.join(diffs)})")
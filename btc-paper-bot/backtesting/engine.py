@@ -0,0 +1,272 @@
+"""
+Backtest engine shared by backtest.py, optimize_params.py and genetic_optimizer.py.
+
+Signals come from the strategy itself (DayTradingStrategy.generate_signals),
+and the trade simulation follows the live PaperEngine rules:
+
+- entry:  at the close of the signal bar, if no position is open
+- sizing: balance * RISK_PERCENT / 100 at risk over the SL distance, notional
+          capped at 98% of the balance
+- exits:  from the next bar on, SL if the bar's range touches it (checked first),
+          else TP if touched; filled at the SL / TP price
+- fees:   TAKER_FEE on entry value + exit value
+- no new entry on the bar a position was closed on (as in the original loops)
+
+The simulation jumps from one entry signal to the next and resolves each exit
+with a first-touch query on the candles' ExitIndex (backtesting/exit_index.py):
+O(log n) range-min / range-max lookups instead of a scan to the exit bar, with
+outcomes cached per (entry bar, SL, TP) so parameter sets sharing a Candles
+object (optimizers) resolve a repeated exit once. Its cost grows with the
+number of trades rather than bars. A bar-by-bar loop (compiled with numba when
+installed) is kept as the reference; both give identical trades, parity and
+throughput: benchmark_backtest.py.
+Open positions at the end of the data are not counted as trades.
+"""
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting.exit_index import ExitIndex, cached_exit
+from config import settings
+from strategies.day_trading import DayTradingStrategy, SignalArrays
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+MAX_NOTIONAL_PCT = 0.98  # Same cap as PaperEngine.open_position
+TRADE_FIELDS = ('entry_time', 'side', 'entry', 'sl', 'tp', 'size', 'time', 'exit', 'reason', 'fee', 'pnl', 'balance')
+
+
+@dataclass
+class Candles:
+    """OHLC columns of a frame as float64 arrays."""
+    index: pd.DatetimeIndex
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    _exits: Optional[ExitIndex] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "Candles":
+        cols = {c: df[c].to_numpy(dtype=np.float64) for c in ('open', 'high', 'low', 'close')}
+        return cls(index=df.index, **cols)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @property
+    def exits(self) -> ExitIndex:
+        """First-touch index over high / low, built on first use and kept with its outcome cache."""
+        if self._exits is None:
+            self._exits = ExitIndex(self.high, self.low)
+        return self._exits
+
+
+@dataclass
+class BacktestResult:
+    initial_balance: float
+    final_balance: float
+    trades: List[dict] = field(default_factory=list)
+    open_trade: Optional[dict] = None
+    equity: np.ndarray = None  # Realized balance after every bar
+
+    @property
+    def pnl(self) -> np.ndarray:
+        return np.array([t['pnl'] for t in self.trades], dtype=np.float64)
+
+    def summary(self) -> dict:
+        return summarize(self.pnl, self.initial_balance, self.final_balance)
+
+
+def summarize(pnl: np.ndarray, initial_balance: float, final_balance: float) -> dict:
+    """Trade statistics used by the CLIs and optimizers (win rate and drawdown in %)."""
+    n = len(pnl)
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl <= 0]
+    win_rate = len(wins) / n if n else 0.0
+    avg_win = wins.mean() if len(wins) else 0.0
+    avg_loss = abs(losses.mean()) if len(losses) else 1.0
+    loss_sum = losses.sum()
+    profit_factor = wins.sum() / abs(loss_sum) if len(losses) and loss_sum != 0 else 0.0
+
+    equity = initial_balance + np.cumsum(pnl)
+    running_max = np.maximum.accumulate(equity) if n else equity
+    max_drawdown = ((equity - running_max) / running_max * 100).min() if n else 0.0
+
+    return {
+        'total_trades': n,
+        'win_rate': win_rate * 100,
+        'total_pnl': pnl.sum(),
+        'final_balance': final_balance,
+        'profit_factor': profit_factor,
+        'max_drawdown': max_drawdown,
+        'expectancy': (win_rate * avg_win) - ((1 - win_rate) * avg_loss),
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+    }
+
+
+def _simulate_jumps(high, low, max_table, min_table, block, cache, stats,
+                    close, side, sl, tp, balance, risk_percent, taker_fee):
+    """Jumps from entry signal to entry signal; each exit is a cached ExitIndex query."""
+    entries = np.flatnonzero(side)
+    out = np.empty((len(entries), 7))  # entry bar, exit bar, hit SL, size, fee, pnl, balance
+    count = 0
+    open_bar, open_size = -1, 0.0
+    k = 0
+    while k < len(entries):
+        i = entries[k]
+        entry = close[i]
+        dist = abs(entry - sl[i])
+        available = balance * MAX_NOTIONAL_PCT
+        if not dist > 0 or available <= 0:  # Also skips a NaN SL (ATR not warmed up)
+            k += 1
+            continue
+        size = min(balance * risk_percent / 100 / dist, available / entry)
+
+        j, hit_sl = cached_exit(high, low, max_table, min_table, block, cache, stats, i, sl[i], tp[i])
+        if j < 0:
+            open_bar, open_size = i, size
+            break
+        exit_price = sl[i] if hit_sl else tp[i]
+        raw_pnl = (exit_price - entry) * size if side[i] > 0 else (entry - exit_price) * size
+        fee = (entry * size + exit_price * size) * taker_fee
+        balance += raw_pnl - fee
+        out[count, 0] = i
+        out[count, 1] = j
+        out[count, 2] = hit_sl
+        out[count, 3] = size
+        out[count, 4] = fee
+        out[count, 5] = raw_pnl - fee
+        out[count, 6] = balance
+        count += 1
+        k = np.searchsorted(entries, j, side='right')  # No re-entry on the exit bar
+    return out[:count], open_bar, open_size
+
+
+def _simulate_loop(high, low, close, side, sl, tp, balance, risk_percent, taker_fee):
+    """Bar-by-bar reference of _simulate_jumps (compiled with numba when available)."""
+    n = len(close)
+    out = np.empty((np.count_nonzero(side), 7))
+    count = 0
+    pos_bar, pos_size = -1, 0.0
+    for i in range(n):
+        if pos_bar >= 0:
+            s = side[pos_bar]
+            if s > 0:
+                hit_sl = low[i] <= sl[pos_bar]
+                hit = hit_sl or high[i] >= tp[pos_bar]
+            else:
+                hit_sl = high[i] >= sl[pos_bar]
+                hit = hit_sl or low[i] <= tp[pos_bar]
+            if hit:
+                entry = close[pos_bar]
+                exit_price = sl[pos_bar] if hit_sl else tp[pos_bar]
+                raw_pnl = (exit_price - entry) * pos_size if s > 0 else (entry - exit_price) * pos_size
+                fee = (entry * pos_size + exit_price * pos_size) * taker_fee
+                balance += raw_pnl - fee
+                out[count, 0] = pos_bar
+                out[count, 1] = i
+                out[count, 2] = hit_sl
+                out[count, 3] = pos_size
+                out[count, 4] = fee
+                out[count, 5] = raw_pnl - fee
+                out[count, 6] = balance
+                count += 1
+                pos_bar = -1
+            continue  # Exit bar (or bar with an open position): no entry
+
+        if side[i] != 0:
+            dist = abs(close[i] - sl[i])
+            available = balance * MAX_NOTIONAL_PCT
+            if dist > 0 and available > 0:
+                pos_bar = i
+                pos_size = min(balance * risk_percent / 100 / dist, available / close[i])
+    return out[:count], pos_bar, pos_size
+
+
+if HAVE_NUMBA:
+    _simulate_jumps = njit(cache=True)(_simulate_jumps)
+    _simulate_loop = njit(cache=True)(_simulate_loop)
+
+
+def _simulate_indexed(candles, side, sl, tp, balance, risk_percent, taker_fee):
+    x = candles.exits
+    return _simulate_jumps(x.high, x.low, x.max_table, x.min_table, x.block, x.cache, x.stats,
+                           candles.close, side, sl, tp, balance, risk_percent, taker_fee)
+
+
+def _simulate_reference(candles, side, sl, tp, balance, risk_percent, taker_fee):
+    return _simulate_loop(candles.high, candles.low, candles.close, side, sl, tp, balance, risk_percent, taker_fee)
+
+
+def simulate(candles: Candles, signals: SignalArrays, balance: float = None,
+             risk_percent: float = None, taker_fee: float = None, kernel=None) -> BacktestResult:
+    """Trade the signals on the candles (one position at a time)."""
+    balance = settings.PAPER_TRADING_BALANCE if balance is None else balance
+    risk_percent = settings.RISK_PERCENT if risk_percent is None else risk_percent
+    taker_fee = settings.TAKER_FEE if taker_fee is None else taker_fee
+
+    side = signals.long.astype(np.int8) - signals.short.astype(np.int8)
+    rows, open_bar, open_size = (kernel or _simulate_indexed)(
+        candles, side,
+        np.ascontiguousarray(signals.sl, dtype=np.float64), np.ascontiguousarray(signals.tp, dtype=np.float64),
+        float(balance), float(risk_percent), float(taker_fee),
+    )
+
+    result = BacktestResult(initial_balance=balance, final_balance=rows[-1, 6] if len(rows) else balance)
+    entry_bars = rows[:, 0].astype(np.int64)
+    exit_bars = rows[:, 1].astype(np.int64)
+    hit_sl = rows[:, 2] > 0
+    # Trade fields gathered column-wise, then zipped into dicts
+    columns = _trade_columns(candles, signals, entry_bars, rows[:, 3]) + [
+        candles.index[exit_bars],
+        np.where(hit_sl, signals.sl[entry_bars], signals.tp[entry_bars]).tolist(),
+        np.where(hit_sl, 'SL', 'TP').tolist(),
+        rows[:, 4].tolist(), rows[:, 5].tolist(), rows[:, 6].tolist(),
+    ]
+    result.trades = [dict(zip(TRADE_FIELDS, values)) for values in zip(*columns)]
+    if open_bar >= 0:
+        values = [col[0] for col in _trade_columns(candles, signals, np.array([open_bar]), np.array([open_size]))]
+        result.open_trade = dict(zip(TRADE_FIELDS, values))
+
+    # Realized equity per bar
+    realized = np.zeros(len(candles))
+    np.add.at(realized, exit_bars, rows[:, 5])
+    result.equity = balance + np.cumsum(realized)
+    return result
+
+
+def _trade_columns(candles: Candles, signals: SignalArrays, bars: np.ndarray, sizes: np.ndarray) -> list:
+    """Entry-side trade fields (TRADE_FIELDS order) of the positions opened at `bars`."""
+    return [
+        candles.index[bars], np.where(signals.long[bars], 'LONG', 'SHORT').tolist(),
+        candles.close[bars].tolist(), signals.sl[bars].tolist(), signals.tp[bars].tolist(), sizes.tolist(),
+    ]
+
+
+def strategy_with_params(params: dict) -> DayTradingStrategy:
+    """DayTradingStrategy with the given tunable parameters (optimizer genomes / grid points)."""
+    strategy = DayTradingStrategy()
+    for name, value in params.items():
+        if not hasattr(strategy, name):
+            raise ValueError(f"DayTradingStrategy has no parameter {name!r}")
+        setattr(strategy, name, value)
+    return strategy
+
+
+def run_strategy(strategy: DayTradingStrategy, df_15m: pd.DataFrame, df_1h: pd.DataFrame,
+                 candles: Candles = None, **kwargs) -> BacktestResult:
+    """generate_signals + simulate; pass `candles` (Candles.from_frame(df_15m)) when reusing a dataset."""
+    signals = strategy.generate_signals(df_15m, df_1h)
+    return simulate(candles if candles is not None else Candles.from_frame(df_15m), signals, **kwargs)
@@ -0,0 +1,216 @@
+"""
+First-touch queries for trade exits: the first bar at or after `start` whose
+low is <= a level, or whose high is >= a level.
+
+Bars are grouped in blocks of BLOCK; a sparse table over the block minima of
+the lows (maxima of the highs) answers "does any bar in blocks [b, b + 2^k)
+breach the level" in O(1), so a query is one partial-block scan, O(log n)
+block jumps (binary lifting over the table levels) and one block scan instead
+of a linear scan to the exit. Tables take 2 * (n / BLOCK) * log2(n / BLOCK)
+floats, e.g. ~45MB for 10M bars.
+
+cached_exit combines the SL and TP queries of a trade (SL wins a tie, like the
+bar-by-bar simulation) and caches outcomes by (entry bar, SL, TP), so optimizer
+runs that share entries and SL / TP levels resolve them once. Everything here
+is compiled with numba when it is installed (the cache is then a numba typed
+Dict); without it, the block scans are NumPy searches. first_exits resolves
+many trades at once with the same tables, in NumPy (parameter sweeps).
+"""
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, typed, types
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+BLOCK = 64
+CACHE_MAX_ENTRIES = 1_000_000  # Outcome cache is cleared when it reaches this size
+
+
+def _sparse_table(block_extremes: np.ndarray, ufunc) -> np.ndarray:
+    """table[k, b] = extreme over blocks [b, min(b + 2^k, nb)); ranges running past the end are truncated."""
+    nb = len(block_extremes)
+    levels = max(1, int(nb).bit_length())
+    table = np.empty((levels, nb))
+    table[0] = block_extremes
+    for k in range(1, levels):
+        half = 1 << (k - 1)
+        table[k] = table[k - 1]
+        table[k, :nb - half] = ufunc(table[k - 1, :nb - half], table[k - 1, half:])
+    return table
+
+
+def _scan_loop(values, lo, hi, level, below):
+    for j in range(lo, hi):
+        if (values[j] <= level) if below else (values[j] >= level):
+            return j
+    return -1
+
+
+def _scan_numpy(values, lo, hi, level, below):
+    seg = values[lo:hi]
+    hits = np.flatnonzero(seg <= level if below else seg >= level)
+    return lo + hits[0] if len(hits) else -1
+
+
+def _first_breach(values, table, block, start, level, below):
+    """First j >= start with values[j] <= level (below) / >= level (above), -1 if none."""
+    n = len(values)
+    if start >= n:
+        return -1
+    b = start // block
+    j = _scan(values, start, min((b + 1) * block, n), level, below)
+    if j >= 0:
+        return j
+
+    # Skip 2^k blocks at a time while the range holds no breach (each level at most once)
+    b += 1
+    nb = table.shape[1]
+    for k in range(table.shape[0] - 1, -1, -1):
+        if b >= nb:
+            return -1
+        extreme = table[k, b]
+        if not ((extreme <= level) if below else (extreme >= level)):
+            b += 1 << k
+    if b >= nb:
+        return -1
+    return _scan(values, b * block, min((b + 1) * block, n), level, below)
+
+
+def cached_exit(high, low, max_table, min_table, block, cache, stats, entry_bar, sl, tp):
+    """
+    (exit bar, hit SL) of a position opened at the close of entry_bar, or
+    (-1, False) if neither level is touched; LONG if sl < tp, else SHORT.
+    SL wins a tie. Outcomes are memoized in `cache`, stats = [hits, misses].
+    """
+    key = (entry_bar, sl, tp)
+    if key in cache:
+        stats[0] += 1
+        return cache[key]
+    stats[1] += 1
+
+    start = entry_bar + 1
+    if sl < tp:
+        sl_bar = _first_breach(low, min_table, block, start, sl, True)
+        tp_bar = _first_breach(high, max_table, block, start, tp, False)
+    else:
+        sl_bar = _first_breach(high, max_table, block, start, sl, False)
+        tp_bar = _first_breach(low, min_table, block, start, tp, True)
+    if sl_bar >= 0 and (tp_bar < 0 or sl_bar <= tp_bar):
+        outcome = (sl_bar, True)
+    else:
+        outcome = (tp_bar, False)
+    if len(cache) >= CACHE_MAX_ENTRIES:
+        cache.clear()  # Start over rather than keep only the earliest outcomes of a long sweep
+    cache[key] = outcome
+    return outcome
+
+
+if HAVE_NUMBA:
+    _scan = njit(cache=True)(_scan_loop)
+    _first_breach = njit(cache=True)(_first_breach)
+    cached_exit = njit(cache=True)(cached_exit)
+else:
+    _scan = _scan_numpy
+
+
+def first_breaches(values, table, block, starts, levels, below):
+    """Vectorized _first_breach over arrays of starts / levels (same results)."""
+    n = len(values)
+    nb = table.shape[1]
+    offsets = np.arange(block)
+
+    def scan_blocks(blocks, lo, lv):
+        pos = blocks[:, None] * block + offsets
+        vals = values[np.minimum(pos, n - 1)]
+        hit = (pos >= lo[:, None]) & (pos < n) & ((vals <= lv[:, None]) if below else (vals >= lv[:, None]))
+        return np.where(hit.any(axis=1), pos[np.arange(len(pos)), hit.argmax(axis=1)], -1)
+
+    out = scan_blocks(starts // block, starts, levels)
+    rest = np.flatnonzero((out < 0) & (starts < n))
+    b = starts[rest] // block + 1
+    lv = levels[rest]
+    for k in range(table.shape[0] - 1, -1, -1):
+        inside = b < nb
+        extreme = table[k, np.minimum(b, nb - 1)]
+        clear = ~((extreme <= lv) if below else (extreme >= lv))
+        b = np.where(inside & clear, b + (1 << k), b)
+    inside = b < nb
+    out[rest[inside]] = scan_blocks(b[inside], b[inside] * block, lv[inside])
+    return out
+
+
+def _new_cache():
+    if HAVE_NUMBA:
+        return typed.Dict.empty(key_type=types.Tuple((types.int64, types.float64, types.float64)),
+                                value_type=types.Tuple((types.int64, types.boolean)))
+    return {}
+
+
+class ExitIndex:
+    """First-touch index over a candle history, with its exit-outcome cache."""
+
+    def __init__(self, high: np.ndarray, low: np.ndarray, block: int = BLOCK):
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.block = block
+        nb = -(-len(self.high) // block)
+        pad = nb * block - len(self.high)
+        self.max_table = _sparse_table(np.concatenate([self.high, np.full(pad, -np.inf)]).reshape(nb, block).max(axis=1),
+                                       np.maximum)
+        self.min_table = _sparse_table(np.concatenate([self.low, np.full(pad, np.inf)]).reshape(nb, block).min(axis=1),
+                                       np.minimum)
+        self.cache = _new_cache()  # (entry bar, SL, TP) -> (exit bar, hit SL)
+        self.stats = np.zeros(2, dtype=np.int64)  # hits, misses
+
+    @classmethod
+    def from_tables(cls, high: np.ndarray, low: np.ndarray, max_table: np.ndarray, min_table: np.ndarray,
+                    block: int = BLOCK) -> "ExitIndex":
+        """Index over prebuilt tables (e.g. views of shared memory), with an empty outcome cache."""
+        index = cls.__new__(cls)
+        index.high, index.low, index.max_table, index.min_table = high, low, max_table, min_table
+        index.block = block
+        index.cache = _new_cache()
+        index.stats = np.zeros(2, dtype=np.int64)
+        return index
+
+    @property
+    def hits(self) -> int:
+        return int(self.stats[0])
+
+    @property
+    def misses(self) -> int:
+        return int(self.stats[1])
+
+    def first_below(self, start: int, level: float) -> int:
+        """First bar >= start with low <= level, -1 if none."""
+        return int(_first_breach(self.low, self.min_table, self.block, start, level, True))
+
+    def first_above(self, start: int, level: float) -> int:
+        """First bar >= start with high >= level, -1 if none."""
+        return int(_first_breach(self.high, self.max_table, self.block, start, level, False))
+
+    def first_exits(self, entry_bars: np.ndarray, sl: np.ndarray, tp: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized first_exit without the outcome cache: (exit bars, hit SL) arrays."""
+        start = np.asarray(entry_bars, dtype=np.int64) + 1
+        sl = np.asarray(sl, dtype=np.float64)
+        tp = np.asarray(tp, dtype=np.float64)
+        long = sl < tp
+        sl_bar = np.empty(len(start), dtype=np.int64)
+        tp_bar = np.empty(len(start), dtype=np.int64)
+        for mask, sl_below in ((long, True), (~long, False)):
+            sl_values, sl_table = (self.low, self.min_table) if sl_below else (self.high, self.max_table)
+            tp_values, tp_table = (self.high, self.max_table) if sl_below else (self.low, self.min_table)
+            sl_bar[mask] = first_breaches(sl_values, sl_table, self.block, start[mask], sl[mask], sl_below)
+            tp_bar[mask] = first_breaches(tp_values, tp_table, self.block, start[mask], tp[mask], not sl_below)
+        hit_sl = (sl_bar >= 0) & ((tp_bar < 0) | (sl_bar <= tp_bar))
+        return np.where(hit_sl, sl_bar, tp_bar), hit_sl
+
+    def first_exit(self, entry_bar: int, sl: float, tp: float) -> Tuple[int, bool]:
+        """See cached_exit."""
+        bar, hit_sl = cached_exit(self.high, self.low, self.max_table, self.min_table, self.block,
+                                  self.cache, self.stats, int(entry_bar), float(sl), float(tp))
+        return int(bar), bool(hit_sl)
@@ -0,0 +1,106 @@
+"""
+Successive-halving search over large parameter grids (optimize_params.py --adaptive).
+
+Every candidate is first backtested on a short, recent slice of the history.
+Only the best 1/eta (grid search's composite score, the trade minimum scaled to
+the slice) go on to a slice eta times longer, and so on up to the full history:
+
+    rung 1: 460,800 candidates x last 2.2 days
+    rung 2: 153,600 candidates x last 6.7 days
+    rung 3:  51,200 candidates x last 20 days
+    rung 4:  17,067 candidates x 60 days        (eta=3, 60 days)
+
+Each rung costs about as much as one full-history run of its survivors.
+Candidates are kept as parameter columns, not dicts. On a short slice most of
+them make identical trades, because many thresholds fall between the same
+candidate-bar values. ParameterSweep.distinct groups those, and each group is
+simulated once on the pool. Candidates tied in a group are kept or dropped
+together. With the sweep's drawdown_cut set, a simulation also stops as soon
+as its drawdown passes the cut, and the candidate is dropped.
+"""
+import math
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting.parallel import SweepPool
+from backtesting.results_store import ResultsStore
+
+BARS_PER_DAY = 96  # 15m candles
+ETA = 3  # Rung-to-rung slice growth and survivor reduction
+MIN_SLICE_BARS = 2 * BARS_PER_DAY  # Shortest slice
+
+
+def grid_columns(grid: Dict[str, list]) -> Dict[str, np.ndarray]:
+    """{parameter: values} of every grid point, in itertools.product order."""
+    mesh = np.meshgrid(*[np.asarray(v) for v in grid.values()], indexing='ij')
+    return {name: m.ravel() for name, m in zip(grid, mesh)}
+
+
+def grid_types(grid: Dict[str, list]) -> Dict[str, type]:
+    """{parameter: int / float} (ResultsStore column types)."""
+    return {name: int if all(isinstance(v, int) for v in values) else float for name, values in grid.items()}
+
+
+def rung_windows(n_bars: int, eta: int = ETA, min_bars: int = MIN_SLICE_BARS) -> List[Tuple[int, int]]:
+    """Trailing (start, end) bar windows, eta times longer each, the last one the whole history."""
+    windows = [(0, n_bars)]
+    bars = n_bars // eta
+    while bars >= min_bars:
+        windows.insert(0, (n_bars - bars, n_bars))
+        bars //= eta
+    return windows
+
+
+def _ranked_groups(params: List[dict], metrics: list, param_types: Dict[str, type], min_trades: int) -> List[int]:
+    """Groups with min_trades trades, best composite score first."""
+    store = ResultsStore(':memory:', param_types)
+    store.append((g, p, m) for g, (p, m) in enumerate(zip(params, metrics)))
+    order = [row['grid_index'] for row in store.top_composite(len(params), min_trades=min_trades)]
+    store.close()
+    return order
+
+
+def successive_halving(pool: SweepPool, columns: Dict[str, np.ndarray], param_types: Dict[str, type],
+                       min_trades: int, eta: int = ETA, min_bars: int = MIN_SLICE_BARS,
+                       progress: Optional[Callable[[dict], None]] = None) -> Tuple[np.ndarray, list]:
+    """
+    (indices of the candidates that reached the full history, their evaluate() metrics).
+    columns: {parameter: value per candidate} (grid_columns); progress gets a dict per rung.
+    """
+    n_bars = pool.sweep.end
+    windows = rung_windows(n_bars, eta, min_bars)
+    alive = np.arange(len(next(iter(columns.values()))))
+    for rung, window in enumerate(windows, 1):
+        started = time.monotonic()
+        cols = {name: values[alive] for name, values in columns.items()}
+        first, group = pool.sweep.window(*window).distinct(cols)
+        params = [{name: param_types[name](cols[name][i]) for name in param_types} for i in first]
+        metrics = pool.map_windows(params, [window])[0]
+        stats = {'rung': rung, 'rungs': len(windows), 'bars': window[1] - window[0],
+                 'candidates': len(alive), 'simulations': len(params)}
+
+        if rung == len(windows):
+            stats.update(kept=len(alive), seconds=time.monotonic() - started)
+            if progress:
+                progress(stats)
+            return alive, [metrics[g] for g in group]
+
+        # Keep the best groups until they hold 1/eta of the candidates
+        scaled_trades = max(1, math.floor(min_trades * (window[1] - window[0]) / n_bars))
+        order = np.array(_ranked_groups(params, metrics, param_types, scaled_trades), dtype=np.int64)
+        sizes = np.bincount(group, minlength=len(params))[order]
+        target = math.ceil(len(alive) / eta)
+        keep = order[:np.searchsorted(np.cumsum(sizes), target) + 1]
+        alive = alive[np.isin(group, keep)]
+        stats.update(kept=len(alive), seconds=time.monotonic() - started)
+        if progress:
+            progress(stats)
+        if not len(alive):
+            break
+    return alive, []
@@ -0,0 +1,26 @@
+"""
+Shared market data loading for the backtesting tools.
+Serves 15m candles from the local candle store and derives the 1H frame.
+"""
+import os
+import sys
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from data.candle_store import load_history
+
+def resample_1h(df_15m: pd.DataFrame) -> pd.DataFrame:
+    return df_15m.resample('1h').agg({
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'volume': 'sum'
+    }).dropna()
+
+def load_backtest_data(days: int = 60, offline: bool = False, symbol: str = None):
+    """Return (df_15m, df_1h) for the last `days` days."""
+    df_15m = load_history(symbol or settings.SYMBOL, '15m', days=days, offline=offline)
+    return df_15m, resample_1h(df_15m)
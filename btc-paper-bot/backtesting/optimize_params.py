@@ -5,22 +5,23 @@ Tests multiple parameter combinations and finds optimal settings.
 WARNING: This is in-sample optimization and can lead to overfitting!
 Always validate results with out-of-sample (forward) testing.
 """
-import ccxt
-import pandas as pd
-import pandas_ta as ta
+import argparse
 import numpy as np
 from datetime import datetime
 from itertools import product
 import json
 import os
 import sys
+import time
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import settings
-
-print("=" * 80)
-print("PARAMETER OPTIMIZATION - BRUTE FORCE SEARCH")
-print("=" * 80)
+from indicators.cache import indicator_cache
+from backtesting.market_data import load_backtest_data, resample_1h
+from backtesting.sweep import ParameterSweep
+from backtesting.parallel import SweepPool
+from backtesting.checkpoint import check_resumable, load_checkpoint, resume_window, run_identity, save_checkpoint
+from backtesting.results_store import ResultsStore
+from backtesting.halving import BARS_PER_DAY, ETA, grid_columns, grid_types, successive_halving
 
 # --- PARAMETER SEARCH SPACE (Reduced for speed) ---
 PARAM_GRID = {
@@ -32,288 +33,208 @@ PARAM_GRID = {
     'rsi_long_max': [60, 65],                        # 2 values (was 4) - less impactful
     'rsi_short_min': [35, 40],                       # 2 values (was 4) - less impactful
 }
-# Total: 5 × 4 × 4 × 4 × 3 × 2 × 2 = 3,840 combinations (~20 min)
+# Total: 5 × 4 × 4 × 4 × 3 × 2 × 2 = 3,840 combinations (~1 s)
 
-# Calculate total combinations
-total_combinations = np.prod([len(v) for v in PARAM_GRID.values()])
-print(f"\n📊 Testing {total_combinations:,} parameter combinations...")
-print(f"⏱️  Estimated time: ~{total_combinations * 0.3 / 60:.1f} minutes\n")
+# --- ADAPTIVE SEARCH SPACE (--adaptive, successive halving) ---
+ADAPTIVE_GRID = {
+    'adx_threshold': [12, 14, 16, 18, 20, 22, 24, 26, 28, 30],
+    'stoch_oversold': [10, 15, 20, 25, 30, 35],
+    'stoch_overbought': [65, 70, 75, 80, 85, 90],
+    'risk_reward_ratio': [1.5, 1.75, 2.0, 2.25, 2.5, 2.75, 3.0, 3.25, 3.5, 3.75],
+    'sl_atr_multiplier': [1.25, 1.5, 1.75, 2.0, 2.25, 2.5, 2.75, 3.0],
+    'rsi_long_max': [55, 60, 65, 70],
+    'rsi_short_min': [30, 35, 40, 45],
+}
+# Total: 10 × 6 × 6 × 10 × 8 × 4 × 4 = 460,800 combinations (120× PARAM_GRID)
+ADAPTIVE_DRAWDOWN_CUT = 30.0  # %, --adaptive default: simulations past this drawdown stop and are dropped
 
-def run_single_backtest(params, df_15m, df_1h):
-    """Run backtest with specific parameters."""
-    
-    # Pre-calculate all indicators (vectorized for speed)
-    df_1h_copy = df_1h.copy()
-    df_15m_copy = df_15m.copy()
-    
-    # 1H indicators
-    df_1h_copy['EMA50'] = ta.ema(df_1h_copy['close'], length=50)
-    df_1h_copy['EMA200'] = ta.ema(df_1h_copy['close'], length=200)
-    adx_result = ta.adx(df_1h_copy['high'], df_1h_copy['low'], df_1h_copy['close'], length=14)
-    if adx_result is not None:
-        df_1h_copy = df_1h_copy.join(adx_result)
-    
-    # 15m indicators
-    df_15m_copy['EMA200'] = ta.ema(df_15m_copy['close'], length=200)
-    df_15m_copy['RSI'] = ta.rsi(df_15m_copy['close'], length=14)
-    df_15m_copy['ATR'] = ta.atr(df_15m_copy['high'], df_15m_copy['low'], df_15m_copy['close'], length=14)
-    
-    stoch = ta.stochrsi(df_15m_copy['close'], length=14, rsi_length=14, k=3, d=3)
-    if stoch is not None:
-        df_15m_copy = df_15m_copy.join(stoch)
-    
-    k_col = [c for c in df_15m_copy.columns if c.startswith('STOCHRSIk')][0]
-    d_col = [c for c in df_15m_copy.columns if c.startswith('STOCHRSId')][0]
-    
-    balance = settings.PAPER_TRADING_BALANCE
-    position = None
-    trades = []
-    
-    # Backtest loop
-    for i in range(200, len(df_15m_copy)):
-        current_time = df_15m_copy.index[i]
-        row_15m = df_15m_copy.iloc[i]
-        prev_15m = df_15m_copy.iloc[i-1]
-        
-        # Get 1H context
-        last_hour_ts = current_time.floor('1h') - pd.Timedelta(hours=1)
-        if last_hour_ts not in df_1h_copy.index:
-            continue
-        row_1h = df_1h_copy.loc[last_hour_ts]
-        
-        # Check exits
-        if position:
-            pnl = 0
-            closed = False
-            reason = ""
-            
-            if position['side'] == 'LONG':
-                if row_15m['low'] <= position['sl']:
-                    pnl = (position['sl'] - position['entry']) * position['size']
-                    closed = True; reason = "SL"
-                elif row_15m['high'] >= position['tp']:
-                    pnl = (position['tp'] - position['entry']) * position['size']
-                    closed = True; reason = "TP"
-            else:
-                if row_15m['high'] >= position['sl']:
-                    pnl = (position['entry'] - position['sl']) * position['size']
-                    closed = True; reason = "SL"
-                elif row_15m['low'] <= position['tp']:
-                    pnl = (position['entry'] - position['tp']) * position['size']
-                    closed = True; reason = "TP"
-            
-            if closed:
-                # Fees
-                fee = (position['entry'] * position['size'] * 2) * 0.0004
-                pnl -= fee
-                balance += pnl
-                trades.append({'time': current_time, 'pnl': pnl, 'reason': reason, 'side': position['side']})
-                position = None
-                continue
-        
-        # Check entries
-        if not position:
-            # Trend filter
-            adx_val = row_1h.get('ADX_14', 0)
-            trend_bullish = (row_1h['EMA50'] > row_1h['EMA200']) and (adx_val > params['adx_threshold'])
-            trend_bearish = (row_1h['EMA50'] < row_1h['EMA200']) and (adx_val > params['adx_threshold'])
-            
-            atr_val = row_15m.get('ATR', 0)
-            if pd.isna(atr_val) or atr_val == 0:
-                continue
-            
-            signal = None
-            
-            # LONG
-            stoch_k = row_15m[k_col]
-            stoch_d = row_15m[d_col]
-            prev_k = prev_15m[k_col]
-            prev_d = prev_15m[d_col]
-            
-            stoch_cross_up = (stoch_k > stoch_d) and (prev_k <= prev_d)
-            stoch_in_oversold = stoch_k < params['stoch_oversold']
-            rsi_valid_long = row_15m['RSI'] < params['rsi_long_max']
-            price_above_ema = row_15m['close'] > row_15m['EMA200']
-            
-            if trend_bullish and price_above_ema and rsi_valid_long and stoch_cross_up and stoch_in_oversold:
-                sl_dist = atr_val * params['sl_atr_multiplier']
-                entry = row_15m['close']
-                sl = entry - sl_dist
-                risk = entry - sl
-                tp = entry + (risk * params['risk_reward_ratio'])
-                signal = {'side': 'LONG', 'entry': entry, 'sl': sl, 'tp': tp}
-            
-            # SHORT
-            stoch_cross_down = (stoch_k < stoch_d) and (prev_k >= prev_d)
-            stoch_in_overbought = stoch_k > params['stoch_overbought']
-            rsi_valid_short = row_15m['RSI'] > params['rsi_short_min']
-            price_below_ema = row_15m['close'] < row_15m['EMA200']
-            
-            if trend_bearish and price_below_ema and rsi_valid_short and stoch_cross_down and stoch_in_overbought:
-                sl_dist = atr_val * params['sl_atr_multiplier']
-                entry = row_15m['close']
-                sl = entry + sl_dist
-                risk = sl - entry
-                tp = entry - (risk * params['risk_reward_ratio'])
-                signal = {'side': 'SHORT', 'entry': entry, 'sl': sl, 'tp': tp}
-            
-            if signal:
-                risk_amt = balance * 0.01
-                dist = abs(signal['entry'] - signal['sl'])
-                if dist > 0:
-                    size = risk_amt / dist
-                    position = {
-                        'side': signal['side'],
-                        'entry': signal['entry'],
-                        'sl': signal['sl'],
-                        'tp': signal['tp'],
-                        'size': size
-                    }
-    
-    # Calculate metrics
-    if not trades:
-        return None
-    
-    df_trades = pd.DataFrame(trades)
-    wins = df_trades[df_trades['pnl'] > 0]
-    losses = df_trades[df_trades['pnl'] <= 0]
-    
-    total_pnl = df_trades['pnl'].sum()
-    win_rate = len(wins) / len(trades) if len(trades) > 0 else 0
-    
-    avg_win = wins['pnl'].mean() if len(wins) > 0 else 0
-    avg_loss = abs(losses['pnl'].mean()) if len(losses) > 0 else 1
-    profit_factor = (wins['pnl'].sum() / abs(losses['pnl'].sum())) if len(losses) > 0 and losses['pnl'].sum() != 0 else 0
-    
-    # Calculate max drawdown
-    equity_curve = df_trades['pnl'].cumsum() + settings.PAPER_TRADING_BALANCE
-    running_max = equity_curve.expanding().max()
-    drawdown = (equity_curve - running_max) / running_max * 100
-    max_drawdown = drawdown.min()
-    
-    # Expectancy
-    expectancy = (win_rate * avg_win) - ((1 - win_rate) * avg_loss)
-    
-    return {
-        'params': params,
-        'total_trades': len(trades),
-        'win_rate': win_rate * 100,
-        'total_pnl': total_pnl,
-        'final_balance': balance,
-        'profit_factor': profit_factor,
-        'max_drawdown': max_drawdown,
-        'expectancy': expectancy,
-        'avg_win': avg_win,
-        'avg_loss': avg_loss,
-    }
+PROGRESS_INTERVAL = 1.0  # Seconds between progress lines
+MIN_TRADES = 10  # Fewer trades: not a valid configuration
 
-def main():
-    # Fetch data
-    print("Fetching historical data...")
-    exchange = ccxt.binance({'enableRateLimit': True})
-    symbol = settings.SYMBOL
-    
-    # Fetch 60 days of 15m data
-    start_time = exchange.parse8601((pd.Timestamp.now() - pd.Timedelta(days=60)).strftime('%Y-%m-%dT%H:%M:%SZ'))
-    
-    ohlcv = []
-    since = start_time
-    while True:
-        data = exchange.fetch_ohlcv(symbol, '15m', since, limit=1000)
-        if not data:
-            break
-        ohlcv.extend(data)
-        since = data[-1][0] + (15 * 60 * 1000)
-        if len(data) < 1000:
-            break
-    
-    df_15m = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-    df_15m['timestamp'] = pd.to_datetime(df_15m['timestamp'], unit='ms')
-    df_15m.set_index('timestamp', inplace=True)
-    
-    df_1h = df_15m.resample('1h').agg({
-        'open': 'first',
-        'high': 'max',
-        'low': 'min',
-        'close': 'last',
-        'volume': 'sum'
-    }).dropna()
-    
-    print(f"✅ Data loaded: {len(df_15m)} 15m candles, {len(df_1h)} 1h candles\n")
-    
+def search_grid(args, checkpoint, df_15m, sweep):
+    """Every PARAM_GRID combination, streamed into the results store; returns (store, store path)."""
     # Generate parameter combinations
     keys = list(PARAM_GRID.keys())
     values = [PARAM_GRID[k] for k in keys]
-    combinations = list(product(*values))
-    
-    print(f"🔍 Testing {len(combinations):,} combinations...\n")
-    
-    results = []
-    for i, combo in enumerate(combinations):
-        params = dict(zip(keys, combo))
-        
-        # Progress
-        if (i + 1) % 100 == 0 or i == 0:
-            print(f"Progress: {i+1}/{len(combinations)} ({(i+1)/len(combinations)*100:.1f}%)")
-        
-        result = run_single_backtest(params, df_15m, df_1h)
-        if result and result['total_trades'] >= 10:  # Minimum 10 trades
-            results.append(result)
-    
-    print(f"\n✅ Optimization complete! Found {len(results)} valid configurations.\n")
+    combinations = [dict(zip(keys, combo)) for combo in product(*values)]
+    param_types = grid_types(PARAM_GRID)
+    
+    print(f"🔍 Testing {len(combinations):,} combinations ({len(sweep):,} candidate entry bars)...\n")
+    
+    # Results stream into the store as chunks finish; its rows also record which combinations are done
+    config = {'grid': PARAM_GRID}
+    if sweep.drawdown_cut is not None:
+        config['drawdown_cut'] = sweep.drawdown_cut
+    identity = run_identity('grid', df_15m, config)
+    if checkpoint:
+        try:
+            check_resumable(checkpoint, identity, args.checkpoint)
+        except ValueError as e:
+            sys.exit(f"❌ {e}")
+    results_path = checkpoint['state']['results'] if checkpoint else args.results
+    store = ResultsStore(results_path, param_types, fresh=checkpoint is None)
+    save_checkpoint(args.checkpoint, identity, {'results': results_path})
+    completed = np.zeros(len(combinations), dtype=bool)
+    completed[list(store.grid_indices())] = True
+    if checkpoint:
+        print(f"♻️  Resuming: {completed.sum():,} combinations already done\n")
+    pending = np.flatnonzero(~completed)
+    
+    # Chunks of combinations run on a process pool sharing the sweep's arrays (see backtesting/parallel.py)
+    done = 0
+    started = last_report = time.monotonic()
+    try:
+        with SweepPool(sweep, workers=args.workers) as pool:
+            print(f"⚙️  Workers: {pool.workers}\n")
+            for start, chunk in pool.imap([combinations[i] for i in pending]):
+                indices = pending[start:start + len(chunk)]
+                store.append((i, combinations[i], metrics) for i, metrics in zip(indices, chunk))
+                completed[indices] = True
+                done += len(chunk)
+                
+                # Progress
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL or done == len(pending):
+                    last_report = now
+                    rate = done / max(now - started, 1e-9)
+                    print(f"Progress: {completed.sum()}/{len(combinations)} ({completed.mean()*100:.1f}%) | "
+                          f"{rate:,.0f}/s | ETA {(len(pending) - done) / rate:.0f}s")
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Interrupted: reporting the {completed.sum():,} of {len(combinations):,} combinations finished so far")
+        print(f"   Continue later with --resume (checkpoint: {args.checkpoint})")
+    
+    return store, results_path
+
+def search_adaptive(args, sweep):
+    """ADAPTIVE_GRID by successive halving; the full-history results of the last rung go to the store."""
+    columns = grid_columns(ADAPTIVE_GRID)
+    param_types = grid_types(ADAPTIVE_GRID)
+    n = len(columns['adx_threshold'])
+    print(f"🔍 Successive halving over {n:,} combinations ({len(sweep):,} candidate entry bars, "
+          f"eta {args.eta}, drawdown cut {sweep.drawdown_cut:.0f}%)...\n")
+    
+    store = ResultsStore(args.results, param_types)
+    started = time.monotonic()
+    try:
+        with SweepPool(sweep, workers=args.workers) as pool:
+            print(f"⚙️  Workers: {pool.workers}\n")
+            indices, metrics = successive_halving(pool, columns, param_types, MIN_TRADES, eta=args.eta,
+                                                  progress=print_rung)
+    except KeyboardInterrupt:
+        store.close()
+        sys.exit("\n⚠️  Interrupted (adaptive runs are not checkpointed, start again)")
+    store.append((i, {k: param_types[k](columns[k][i]) for k in param_types}, m) for i, m in zip(indices, metrics))
+    print(f"\n⏱️  {n:,} combinations searched in {time.monotonic() - started:.1f}s, "
+          f"{len(indices):,} backtested on the full history\n")
+    return store, args.results
+
+def print_rung(stats):
+    print(f"Rung {stats['rung']}/{stats['rungs']}: {stats['candidates']:,} candidates x last "
+          f"{stats['bars'] / BARS_PER_DAY:.1f} days | {stats['simulations']:,} distinct backtests | "
+          f"kept {stats['kept']:,} | {stats['seconds']:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--offline', action='store_true', help="Use local candle store only, no network")
+    parser.add_argument('--days', type=int, default=60, help="Days of 15m history to use")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Worker processes (1 = serial, in-process; default: all cores)")
+    parser.add_argument('--results', default='optimization_results.db', help="SQLite results store")
+    parser.add_argument('--checkpoint', default='optimization_checkpoint.pkl',
+                        help="Checkpoint file (run identity; progress is in the results store)")
+    parser.add_argument('--resume', action='store_true', help="Continue the run saved in --checkpoint")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Successive halving over ADAPTIVE_GRID instead of every PARAM_GRID combination")
+    parser.add_argument('--eta', type=int, default=ETA, help="--adaptive: keep 1/eta per rung, slices eta times longer")
+    parser.add_argument('--max-drawdown', type=float, default=None,
+                        help=f"Stop a backtest once its drawdown passes this %% (--adaptive default: {ADAPTIVE_DRAWDOWN_CUT:.0f})")
+    args = parser.parse_args()
+    if args.adaptive and args.resume:
+        sys.exit("❌ --resume is not supported with --adaptive (adaptive runs are not checkpointed)")
+    drawdown_cut = ADAPTIVE_DRAWDOWN_CUT if args.adaptive and args.max_drawdown is None else args.max_drawdown
     
-    # Sort by different metrics
-    df_results = pd.DataFrame(results)
+    print("=" * 80)
+    print(f"PARAMETER OPTIMIZATION - {'SUCCESSIVE HALVING' if args.adaptive else 'BRUTE FORCE SEARCH'}")
+    print("=" * 80)
     
-    # Save all results
-    df_results.to_csv('optimization_results.csv', index=False)
-    print("💾 Full results saved to: optimization_results.csv\n")
+    # Calculate total combinations
+    grid = ADAPTIVE_GRID if args.adaptive else PARAM_GRID
+    total_combinations = np.prod([len(v) for v in grid.values()])
+    print(f"\n📊 Testing {total_combinations:,} parameter combinations...")
+    if not args.adaptive:
+        print(f"⏱️  Estimated time: ~{max(1, total_combinations * 0.0002):.0f} seconds\n")
+    else:
+        print("✂️  Pruned on short slices of the history first (successive halving)\n")
+    
+    try:
+        checkpoint = load_checkpoint(args.checkpoint) if args.resume else None
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    if args.resume and checkpoint is None:
+        print(f"⚠️  No checkpoint at {args.checkpoint}, starting from scratch\n")
+    
+    # Load data (local candle store, missing tail synced from Binance)
+    print("Loading historical data...")
+    df_15m, df_1h = load_backtest_data(days=args.days, offline=args.offline)
+    if checkpoint:
+        df_15m = resume_window(df_15m, checkpoint)  # Same candles as the interrupted run
+        df_1h = resample_1h(df_15m)
     
+    print(f"✅ Data loaded: {len(df_15m)} 15m candles, {len(df_1h)} 1h candles\n")
+    # Indicators + candidate entry bars, computed once for all combinations
+    sweep = ParameterSweep(df_15m, df_1h, drawdown_cut=drawdown_cut)
+    
+    if args.adaptive:
+        store, results_path = search_adaptive(args, sweep)
+    else:
+        store, results_path = search_grid(args, checkpoint, df_15m, sweep)
+    
+    store.create_indexes()
+    valid = store.count(min_trades=MIN_TRADES)
+    print(f"\n✅ Optimization complete! Found {valid} valid configurations.\n")
+    print(f"💾 Full results saved to: {results_path} (SQLite, table 'results')\n")
+    if not valid:
+        store.close()
+        return
+    stats = indicator_cache.stats()
+    print(f"🗃️  Indicator cache: {stats['hits']} memory / {stats['disk_hits']} disk hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)\n")
+    
+    # Reports: indexed queries over the store
     print("=" * 80)
     print("TOP 5 BY WIN RATE")
     print("=" * 80)
-    top_wr = df_results.nlargest(5, 'win_rate')
-    for idx, row in top_wr.iterrows():
+    for row in store.top('win_rate', 5, min_trades=MIN_TRADES):
         print(f"\nWin Rate: {row['win_rate']:.1f}% | Trades: {row['total_trades']} | PnL: ${row['total_pnl']:.0f}")
         print(f"  Params: {row['params']}")
     
     print("\n" + "=" * 80)
     print("TOP 5 BY TOTAL PNL")
     print("=" * 80)
-    top_pnl = df_results.nlargest(5, 'total_pnl')
-    for idx, row in top_pnl.iterrows():
+    for row in store.top('total_pnl', 5, min_trades=MIN_TRADES):
         print(f"\nPnL: ${row['total_pnl']:.0f} | Win Rate: {row['win_rate']:.1f}% | Trades: {row['total_trades']}")
         print(f"  Params: {row['params']}")
     
     print("\n" + "=" * 80)
     print("TOP 5 BY PROFIT FACTOR")
     print("=" * 80)
-    top_pf = df_results.nlargest(5, 'profit_factor')
-    for idx, row in top_pf.iterrows():
+    for row in store.top('profit_factor', 5, min_trades=MIN_TRADES):
         print(f"\nProfit Factor: {row['profit_factor']:.2f} | Win Rate: {row['win_rate']:.1f}% | PnL: ${row['total_pnl']:.0f}")
         print(f"  Params: {row['params']}")
     
     print("\n" + "=" * 80)
     print("TOP 5 BY EXPECTANCY (Best Risk-Adjusted)")
     print("=" * 80)
-    top_exp = df_results.nlargest(5, 'expectancy')
-    for idx, row in top_exp.iterrows():
+    for row in store.top('expectancy', 5, min_trades=MIN_TRADES):
         print(f"\nExpectancy: ${row['expectancy']:.2f} | Win Rate: {row['win_rate']:.1f}% | PnL: ${row['total_pnl']:.0f}")
         print(f"  Params: {row['params']}")
     
-    # BEST OVERALL (composite score)
-    df_results['composite_score'] = (
-        df_results['win_rate'] / 100 * 0.3 +  # 30% weight on win rate
-        (df_results['total_pnl'] / df_results['total_pnl'].max()) * 0.3 +  # 30% on PnL
-        (df_results['profit_factor'] / df_results['profit_factor'].max()) * 0.2 +  # 20% on PF
-        (1 - abs(df_results['max_drawdown']) / 100) * 0.2  # 20% on low drawdown
-    )
-    
+    # BEST OVERALL (composite score: 30% win rate, 30% PnL, 20% PF, 20% low drawdown)
     print("\n" + "=" * 80)
     print("🏆 TOP 3 OVERALL (Composite Score)")
     print("=" * 80)
-    top_overall = df_results.nlargest(3, 'composite_score')
-    for rank, (idx, row) in enumerate(top_overall.iterrows(), 1):
+    top_overall = store.top_composite(3, min_trades=MIN_TRADES)
+    store.close()
+    for rank, row in enumerate(top_overall, 1):
         print(f"\n#{rank}")
         print(f"  Win Rate: {row['win_rate']:.1f}%")
         print(f"  Total PnL: ${row['total_pnl']:.0f}")
@@ -326,7 +247,7 @@ def main():
             print(f"    {k}: {v}")
     
     # Save best config
-    best = top_overall.iloc[0]
+    best = top_overall[0]
     with open('best_params.json', 'w') as f:
         json.dump({
             'params': best['params'],
@@ -348,7 +269,7 @@ def main():
     print("   1. These are IN-SAMPLE results (overfitting risk)")
     print("   2. Past performance ≠ future results")
     print("   3. Always validate with forward testing on new data")
-    print("   4. Consider using walk-forward optimization")
+    print("   4. Check them out-of-sample: python backtesting/walk_forward.py")
     print("   5. Monitor live performance and adjust if needed")
 
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+"""
+Process-pool evaluation of parameter sweeps (optimize_params.py / genetic_optimizer.py --workers).
+
+The sweep's arrays (candidate-bar features, highs / lows and the ExitIndex
+tables) are copied once into one shared-memory block. Every worker attaches to
+it in its initializer and rebuilds the ParameterSweep over zero-copy views, so
+tasks carry only parameter dicts and return metrics, never DataFrames.
+Parameter sets are submitted in chunks and picked up by whichever worker is
+free:
+
+    with SweepPool(sweep, workers=8) as pool:
+        for start, metrics in pool.imap(params_list):  # Completion order
+            ...  # metrics[i] belongs to params_list[start + i]
+
+map_windows() runs the same parameter sets on several bar windows of the sweep
+(walk-forward folds) as one batch of chunks, so all folds share the workers.
+With workers=1 the chunks run in-process (no pool, no shared memory).
+Workers ignore SIGINT: on Ctrl-C the caller stops iterating, and leaving the
+with-block cancels the chunks not started yet and frees the shared memory.
+"""
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting.sweep import ParameterSweep
+
+CHUNKS_PER_WORKER = 4  # Scheduling granularity: more chunks balance better, bigger ones batch better
+MIN_CHUNK = 64
+MAX_CHUNK = 1024
+ALIGN = 64
+
+
+class SharedArrays:
+    """Named NumPy arrays packed into one shared-memory block (owned by the creating process)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        layout = {}
+        size = 0
+        for name, a in arrays.items():
+            size = -(-size // ALIGN) * ALIGN
+            layout[name] = (size, a.shape, np.asarray(a).dtype.str)
+            size += np.asarray(a).nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.layout = layout
+        for name, view in _views(self.shm, layout).items():
+            view[...] = arrays[name]
+
+    @property
+    def spec(self) -> Tuple[str, dict]:
+        """Picklable handle for attach()."""
+        return self.shm.name, self.layout
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _views(shm: shared_memory.SharedMemory, layout: dict) -> Dict[str, np.ndarray]:
+    return {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for name, (offset, shape, dtype) in layout.items()}
+
+
+def attach(spec: Tuple[str, dict]) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+    """(block, read-only views) of a SharedArrays in another process; keep the block referenced."""
+    name, layout = spec
+    shm = shared_memory.SharedMemory(name=name)
+    views = _views(shm, layout)
+    for view in views.values():
+        view.flags.writeable = False
+    return shm, views
+
+
+# --- Worker side (one sweep per process, built by the initializer) ---
+_worker_shm = None
+_worker_sweep = None
+
+
+def _init_worker(spec, scalars):
+    global _worker_shm, _worker_sweep
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C is handled by the parent
+    _worker_shm, arrays = attach(spec)
+    _worker_sweep = ParameterSweep.from_arrays(arrays, scalars)
+
+
+def _run_chunk(method: str, window: Optional[Tuple[int, int]], start: int, params_list: List[dict]):
+    return window, start, _evaluate(_worker_sweep, method, window, params_list)
+
+
+def _evaluate(sweep: ParameterSweep, method: str, window, params_list: List[dict]) -> list:
+    if window is not None:
+        sweep = sweep.window(*window)
+    return getattr(sweep, method)(params_list)
+
+
+class SweepPool:
+    """ParameterSweep evaluation fanned out over worker processes sharing the sweep's arrays."""
+
+    def __init__(self, sweep: ParameterSweep, workers: int = None):
+        self.sweep = sweep
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._shared = None
+        self._executor = None
+        if self.workers > 1:
+            arrays, scalars = sweep.to_arrays()
+            self._shared = SharedArrays(arrays)
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                 initargs=(self._shared.spec, scalars))
+
+    def chunk_size(self, n: int) -> int:
+        return max(MIN_CHUNK, min(MAX_CHUNK, -(-n // (self.workers * CHUNKS_PER_WORKER))))
+
+    def imap(self, params_list: Sequence[dict], method: str = 'evaluate',
+             chunk_size: int = None) -> Iterator[Tuple[int, list]]:
+        """
+        (start, results of params_list[start:start + chunk]) per chunk, in completion
+        order; method is the ParameterSweep method run on each chunk.
+        """
+        for _, start, results in self._imap(params_list, [None], method, chunk_size):
+            yield start, results
+
+    def _imap(self, params_list, windows, method, chunk_size):
+        """(window, start, results) of every chunk of params_list on every window, in completion order."""
+        params_list = list(params_list)
+        size = chunk_size or self.chunk_size(len(params_list) * len(windows))
+        tasks = [(window, start) for window in windows for start in range(0, len(params_list), size)]
+        if self._executor is None:
+            for window, start in tasks:
+                yield window, start, _evaluate(self.sweep, method, window, params_list[start:start + size])
+            return
+
+        futures = [self._executor.submit(_run_chunk, method, window, start, params_list[start:start + size])
+                   for window, start in tasks]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def map(self, params_list: Sequence[dict], method: str = 'evaluate', chunk_size: int = None) -> list:
+        """Results of every parameter set, in input order."""
+        out = [None] * len(params_list)
+        for start, results in self.imap(params_list, method, chunk_size):
+            out[start:start + len(results)] = results
+        return out
+
+    def map_windows(self, params_list: Sequence[dict], windows: Sequence[Tuple[int, int]],
+                    method: str = 'evaluate', chunk_size: int = None) -> List[list]:
+        """Per (start, end) bar window (ParameterSweep.window): results of every parameter set, in input order."""
+        windows = [(int(start), int(end)) for start, end in windows]
+        out = {window: [None] * len(params_list) for window in windows}
+        for window, start, results in self._imap(params_list, windows, method, chunk_size):
+            out[window][start:start + len(results)] = results
+        return [out[window] for window in windows]
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __enter__(self) -> "SweepPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
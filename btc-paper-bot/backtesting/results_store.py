@@ -0,0 +1,125 @@
+"""
+SQLite store of grid-search results (optimize_params.py).
+
+One row per evaluated grid point with one typed column per parameter and per
+summarize() metric, appended chunk by chunk as results arrive. The database is
+in WAL mode, so it can be queried while a run is still writing:
+
+    sqlite3 optimization_results.db \
+        "SELECT * FROM results WHERE adx_threshold = 20 AND total_trades >= 10 ORDER BY expectancy DESC LIMIT 5"
+
+Parameters and the ranked metrics are indexed by create_indexes() once the
+run is over: building the indexes in bulk is several times cheaper than
+updating them on every append. top() and top_composite() are the grid
+search's reports as queries. Grid points without any trade are stored too
+(total_trades 0, NULL metrics), so the rows also record which grid points are
+done (--resume).
+"""
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+METRIC_COLUMNS = {
+    'total_trades': 'INTEGER',
+    'win_rate': 'REAL',
+    'total_pnl': 'REAL',
+    'final_balance': 'REAL',
+    'profit_factor': 'REAL',
+    'max_drawdown': 'REAL',
+    'expectancy': 'REAL',
+    'avg_win': 'REAL',
+    'avg_loss': 'REAL',
+}
+RANKED_METRICS = ('win_rate', 'total_pnl', 'profit_factor', 'expectancy')
+
+# Same weights as the grid search's original pandas report
+COMPOSITE_SCORE = (
+    "win_rate / 100 * 0.3"                      # 30% weight on win rate
+    " + total_pnl / :max_pnl * 0.3"             # 30% on PnL
+    " + profit_factor / :max_pf * 0.2"          # 20% on PF
+    " + (1 - ABS(max_drawdown) / 100) * 0.2"    # 20% on low drawdown
+)
+
+
+def _quote(name: str) -> str:
+    if not name.isidentifier():
+        raise ValueError(f"Invalid column name {name!r}")
+    return f'"{name}"'
+
+
+class ResultsStore:
+    def __init__(self, path: str, param_types: Dict[str, type], fresh: bool = True):
+        """param_types: {parameter: int / float}; fresh drops the results of a previous run."""
+        self.path = path
+        self.params = list(param_types)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if fresh:
+            self.conn.execute("DROP TABLE IF EXISTS results")
+
+        columns = ["grid_index INTEGER PRIMARY KEY"]
+        columns += [f"{_quote(p)} {'INTEGER' if t is int else 'REAL'} NOT NULL" for p, t in param_types.items()]
+        columns += [f"{_quote(m)} {sql_type}" for m, sql_type in METRIC_COLUMNS.items()]
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS results ({', '.join(columns)})")
+        self.conn.commit()
+
+        names = ['grid_index'] + self.params + list(METRIC_COLUMNS)
+        self._insert = (f"INSERT OR IGNORE INTO results ({', '.join(map(_quote, names))}) "
+                        f"VALUES ({', '.join('?' * len(names))})")
+
+    def append(self, rows: Iterable[Tuple[int, dict, Optional[dict]]]) -> None:
+        """Append (grid index, params, summarize() metrics or None) rows in one transaction."""
+        values = []
+        for index, params, metrics in rows:
+            row = [int(index)] + [params[p] for p in self.params]
+            if metrics is None:
+                row += [0] + [None] * (len(METRIC_COLUMNS) - 1)
+            else:
+                row += [int(metrics[m]) if t == 'INTEGER' else float(metrics[m]) for m, t in METRIC_COLUMNS.items()]
+            values.append(row)
+        with self.conn:
+            self.conn.executemany(self._insert, values)
+
+    def create_indexes(self) -> None:
+        """Index the parameter and ranked metric columns (no-op for existing indexes)."""
+        with self.conn:
+            for column in self.params + list(RANKED_METRICS):
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_results_{column} ON results({_quote(column)})")
+
+    def grid_indices(self) -> Set[int]:
+        """Grid points already stored."""
+        return {row[0] for row in self.conn.execute("SELECT grid_index FROM results")}
+
+    def count(self, min_trades: int = 0) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM results WHERE total_trades >= ?",
+                                 (max(min_trades, 1),)).fetchone()[0]
+
+    def _rows(self, query: str, args) -> List[dict]:
+        cursor = self.conn.execute(query, args)
+        names = [d[0] for d in cursor.description]
+        out = []
+        for values in cursor:
+            row = dict(zip(names, values))
+            row['params'] = {p: row.pop(p) for p in self.params}
+            out.append(row)
+        return out
+
+    def top(self, metric: str, n: int, min_trades: int = 0) -> List[dict]:
+        """n best rows by metric ({'params': {...}, metric columns...}); grid order breaks ties."""
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric {metric!r}")
+        return self._rows(f"SELECT * FROM results WHERE total_trades >= ? "
+                          f"ORDER BY {_quote(metric)} DESC, grid_index LIMIT ?", (max(min_trades, 1), n))
+
+    def top_composite(self, n: int, min_trades: int = 0) -> List[dict]:
+        """n best rows by composite_score (metrics normalized by their best value over the filtered rows)."""
+        min_trades = max(min_trades, 1)
+        max_pnl, max_pf = self.conn.execute("SELECT MAX(total_pnl), MAX(profit_factor) FROM results "
+                                            "WHERE total_trades >= ?", (min_trades,)).fetchone()
+        return self._rows(
+            f"SELECT *, {COMPOSITE_SCORE} AS composite_score FROM results WHERE total_trades >= :min_trades "
+            f"ORDER BY composite_score DESC, grid_index LIMIT :n",
+            {'max_pnl': max_pnl, 'max_pf': max_pf, 'min_trades': min_trades, 'n': n})
+
+    def close(self) -> None:
+        self.conn.close()
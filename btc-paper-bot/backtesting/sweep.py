@@ -0,0 +1,261 @@
+"""
+Batched parameter sweeps of DayTradingStrategy for the optimizers.
+
+No indicator depends on the swept parameters (SWEEP_PARAMS), so a
+ParameterSweep computes them once per dataset (DayTradingStrategy.signal_features)
+and keeps a sparse index of candidate bars: a StochRSI cross with the close and
+the 1H EMAs on the same side of their EMA200, i.e. the bars where some
+parameter values give a signal. A parameter set only decides which candidates
+pass the ADX / RSI / StochRSI thresholds and where SL / TP sit, so a batch of
+parameter sets is one (parameter sets x candidates) matrix computation. The
+batch is then simulated in lockstep, one trade of every set per step, with
+exits from batched first-touch queries (ExitIndex.first_exits): the number of
+NumPy steps is the largest trade count in the batch, not the number of sets.
+
+    sweep = ParameterSweep(df_15m, df_1h)
+    metrics = sweep.evaluate([{'adx_threshold': 20, 'risk_reward_ratio': 2.5}, ...])
+    # summarize() dict per parameter set (None without trades), omitted parameters
+    # keep the DayTradingStrategy defaults
+
+Trades are identical to run_strategy(strategy_with_params(params), df_15m, df_1h);
+parity and throughput: benchmark_sweep.py. sweep.window(start, end) trades only
+bars [start, end) with the indicators of the whole history (walk_forward.py
+folds): views of the candidate arrays, nothing is recomputed.
+
+For pruned searches (backtesting/halving.py, genetic_optimizer.py): with
+drawdown_cut set, a parameter set stops trading once its drawdown passes the
+cut (evaluate() gives None for it, pnls() no trades), and distinct() groups
+parameter sets that trade identically on the sweep's window, e.g. thresholds
+that fall between the same candidate values, so each group is simulated once.
+"""
+import copy
+import os
+import sys
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting.engine import MAX_NOTIONAL_PCT, Candles, summarize
+from backtesting.exit_index import ExitIndex
+from config import settings
+from strategies.day_trading import DayTradingStrategy
+
+SWEEP_PARAMS = ('adx_threshold', 'stoch_oversold', 'stoch_overbought', 'risk_reward_ratio',
+                'sl_atr_multiplier', 'rsi_long_max', 'rsi_short_min')
+CANDIDATE_ARRAYS = ('entries', 'side', 'close', 'atr', 'adx', 'rsi', 'stoch_k')
+BATCH_CELLS = 4_000_000  # Parameter sets x candidates per vectorized batch
+
+
+class ParameterSweep:
+    """Indicators and candidate bars of one dataset, evaluated against many parameter sets."""
+
+    def __init__(self, df_15m: pd.DataFrame, df_1h: pd.DataFrame, candles: Candles = None,
+                 balance: float = None, risk_percent: float = None, taker_fee: float = None,
+                 drawdown_cut: float = None):
+        self.exits = (candles if candles is not None else Candles.from_frame(df_15m)).exits
+        self.balance = float(settings.PAPER_TRADING_BALANCE if balance is None else balance)
+        self.risk_percent = float(settings.RISK_PERCENT if risk_percent is None else risk_percent)
+        self.taker_fee = float(settings.TAKER_FEE if taker_fee is None else taker_fee)
+        self.drawdown_cut = drawdown_cut  # %, None: every set trades to the end
+
+        strategy = DayTradingStrategy()
+        self.defaults = {name: getattr(strategy, name) for name in SWEEP_PARAMS}
+        f = strategy.signal_features(df_15m, df_1h)
+        long = ((f['stoch_k'] > f['stoch_d']) & (f['prev_k'] <= f['prev_d'])
+                & (f['close'] > f['ema200']) & (f['ema50_1h'] > f['ema200_1h']))
+        short = ((f['stoch_k'] < f['stoch_d']) & (f['prev_k'] >= f['prev_d'])
+                 & (f['close'] < f['ema200']) & (f['ema50_1h'] < f['ema200_1h']))
+
+        # Candidate bars and their parameter-independent inputs
+        self.entries = np.flatnonzero(long | short)
+        self.side = np.where(long[self.entries], 1, -1).astype(np.int8)
+        self.close = f['close'][self.entries]
+        self.atr = f['atr'][self.entries]
+        self.adx = f['adx_1h'][self.entries]
+        self.rsi = f['rsi'][self.entries]
+        self.stoch_k = f['stoch_k'][self.entries]
+        self.end = len(self.exits.high)  # Positions not closed before this bar stay open
+
+    def to_arrays(self):
+        """(arrays, scalars) rebuilding this sweep with from_arrays, e.g. in a worker process."""
+        x = self.exits
+        arrays = {name: getattr(self, name) for name in CANDIDATE_ARRAYS}
+        arrays.update(high=x.high, low=x.low, max_table=x.max_table, min_table=x.min_table)
+        scalars = {'balance': self.balance, 'risk_percent': self.risk_percent, 'taker_fee': self.taker_fee,
+                   'block': x.block, 'defaults': self.defaults, 'drawdown_cut': self.drawdown_cut}
+        return arrays, scalars
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], scalars: dict) -> "ParameterSweep":
+        sweep = cls.__new__(cls)
+        for name in CANDIDATE_ARRAYS:
+            setattr(sweep, name, arrays[name])
+        sweep.exits = ExitIndex.from_tables(arrays['high'], arrays['low'], arrays['max_table'],
+                                            arrays['min_table'], scalars['block'])
+        sweep.balance = scalars['balance']
+        sweep.risk_percent = scalars['risk_percent']
+        sweep.taker_fee = scalars['taker_fee']
+        sweep.defaults = scalars['defaults']
+        sweep.drawdown_cut = scalars['drawdown_cut']
+        sweep.end = len(sweep.exits.high)
+        return sweep
+
+    def window(self, start: int, end: int, balance: float = None) -> "ParameterSweep":
+        """
+        This sweep trading bars [start, end) only, as run_strategy on that slice of
+        the candles but with indicators warmed up on the whole history: entries in
+        the window, positions still open at its end are not counted.
+        """
+        lo, hi = np.searchsorted(self.entries, [start, end])
+        sweep = copy.copy(self)
+        for name in CANDIDATE_ARRAYS:
+            setattr(sweep, name, getattr(self, name)[lo:hi])
+        sweep.end = min(int(end), self.end)
+        if balance is not None:
+            sweep.balance = float(balance)
+        return sweep
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _columns(self, params_list: Sequence[dict]) -> dict:
+        """{parameter: (n, 1) float column} with defaults filled in."""
+        for params in params_list:
+            unknown = set(params) - set(SWEEP_PARAMS)
+            if unknown:
+                raise ValueError(f"Not a sweepable parameter: {', '.join(sorted(unknown))}")
+        return {name: np.array([p.get(name, self.defaults[name]) for p in params_list],
+                               dtype=np.float64)[:, None]
+                for name in SWEEP_PARAMS}
+
+    def _batch(self, params_list: Sequence[dict]):
+        """Per parameter set: which candidates signal, and their SL / TP (n x candidates)."""
+        return self._signals(self._columns(params_list))
+
+    def _signals(self, p: dict):
+        """_batch for {parameter: (n, 1) column}."""
+        is_long = self.side > 0
+        trend = self.adx > p['adx_threshold']
+        enabled = trend & np.where(is_long,
+                                   (self.rsi < p['rsi_long_max']) & (self.stoch_k < p['stoch_oversold']),
+                                   (self.rsi > p['rsi_short_min']) & (self.stoch_k > p['stoch_overbought']))
+
+        # Same expressions as generate_signals, so SL / TP are bit-identical
+        sl_dist = self.atr * p['sl_atr_multiplier']
+        long_sl = self.close - sl_dist
+        short_sl = self.close + sl_dist
+        sl = np.where(is_long, long_sl, short_sl)
+        tp = np.where(is_long, self.close + (self.close - long_sl) * p['risk_reward_ratio'],
+                      self.close - (short_sl - self.close) * p['risk_reward_ratio'])
+        return enabled, sl, tp
+
+    def _simulate(self, enabled: np.ndarray, sl: np.ndarray, tp: np.ndarray) -> List[np.ndarray]:
+        """
+        engine.simulate rules for every row of a batch in lockstep: step t takes the
+        t-th trade of each parameter set, with the same per-trade arithmetic
+        (elementwise across sets) and batched first-touch exits.
+        """
+        n_sets, n_cand = enabled.shape
+        enabled = enabled & (np.abs(self.close - sl) > 0)  # Also drops a NaN SL (ATR not warmed up)
+
+        # nxt[r, k]: first signalling candidate at or after k (n_cand if none)
+        nxt = np.where(enabled, np.arange(n_cand), n_cand)
+        nxt = np.minimum.accumulate(nxt[:, ::-1], axis=1)[:, ::-1]
+        nxt = np.concatenate([nxt, np.full((n_sets, 1), n_cand)], axis=1)
+
+        cur = nxt[:, 0].copy()
+        balance = np.full(n_sets, self.balance)
+        peak = np.full(n_sets, -np.inf)  # Highest balance after a trade (summarize()'s drawdown reference)
+        stopped = np.zeros(n_sets, dtype=bool)
+        steps = []
+        active = np.flatnonzero(cur < n_cand)
+        while len(active):
+            active = active[balance[active] * MAX_NOTIONAL_PCT > 0]  # Broke: no further entries
+            c = cur[active]
+            entry = self.close[c]
+            s, t = sl[active, c], tp[active, c]
+            available = balance[active] * MAX_NOTIONAL_PCT
+            size = np.minimum(balance[active] * self.risk_percent / 100 / np.abs(entry - s), available / entry)
+
+            exit_bar, hit_sl = self.exits.first_exits(self.entries[c], s, t)
+            closed = (exit_bar >= 0) & (exit_bar < self.end)  # Else the position stays open until the end
+            active, c, entry, s, t, size = (a[closed] for a in (active, c, entry, s, t, size))
+            exit_bar, hit_sl = exit_bar[closed], hit_sl[closed]
+
+            exit_price = np.where(hit_sl, s, t)
+            raw_pnl = np.where(self.side[c] > 0, (exit_price - entry) * size, (entry - exit_price) * size)
+            fee = (entry * size + exit_price * size) * self.taker_fee
+            balance[active] += raw_pnl - fee
+            steps.append(np.column_stack([active, self.entries[c], exit_bar, hit_sl, size, fee,
+                                          raw_pnl - fee, balance[active]]))
+            if self.drawdown_cut is not None:
+                peak[active] = np.maximum(peak[active], balance[active])
+                deep = (balance[active] - peak[active]) / peak[active] * 100 < -self.drawdown_cut
+                stopped[active[deep]] = True
+                active, exit_bar = active[~deep], exit_bar[~deep]
+
+            # No re-entry on the exit bar
+            cur[active] = nxt[active, np.searchsorted(self.entries, exit_bar, side='right')]
+            active = active[cur[active] < n_cand]
+
+        trades = np.concatenate(steps) if steps else np.empty((0, 8))
+        trades = trades[np.argsort(trades[:, 0], kind='stable')]  # Steps are in trade order
+        return np.split(trades[:, 1:], np.cumsum(np.bincount(trades[:, 0].astype(np.int64),
+                                                             minlength=n_sets))[:-1]), stopped
+
+    def _run(self, params_list: Sequence[dict]):
+        """(trades per parameter set, whether the drawdown cut stopped it), in batches of BATCH_CELLS."""
+        out = []
+        stopped = []
+        step = self._batch_size()
+        for start in range(0, len(params_list), step):
+            trades, cut = self._simulate(*self._batch(params_list[start:start + step]))
+            out.extend(trades)
+            stopped.append(cut)
+        return out, np.concatenate(stopped) if stopped else np.zeros(0, dtype=bool)
+
+    def _batch_size(self) -> int:
+        return max(1, BATCH_CELLS // max(len(self), 1))
+
+    def distinct(self, columns: Dict[str, np.ndarray]):
+        """
+        Parameter sets ({parameter: values} columns, all SWEEP_PARAMS) grouped by the
+        trades they make on this sweep: (index of each group's first set, group of
+        every set). Same signalling candidates and same SL / TP inputs = same trades.
+        """
+        n = len(columns[SWEEP_PARAMS[0]])
+        keys = []
+        step = self._batch_size()
+        for start in range(0, n, step):
+            p = {name: np.asarray(columns[name][start:start + step], dtype=np.float64)[:, None]
+                 for name in SWEEP_PARAMS}
+            enabled, sl, _ = self._signals(p)
+            enabled &= np.abs(self.close - sl) > 0  # As in _simulate
+            keys.append(np.concatenate([np.packbits(enabled, axis=1),
+                                        p['risk_reward_ratio'].view(np.uint8),
+                                        p['sl_atr_multiplier'].view(np.uint8)], axis=1))
+        keys = np.ascontiguousarray(np.concatenate(keys))
+        _, first, group = np.unique(keys.view(np.dtype((np.void, keys.shape[1]))).ravel(),
+                                    return_index=True, return_inverse=True)
+        return first, group.ravel()
+
+    def trades(self, params_list: Sequence[dict]) -> List[np.ndarray]:
+        """
+        Closed trades of every parameter set, one row per trade: entry bar, exit bar,
+        hit SL, size, fee, PnL, balance (the engine kernels' layout).
+        """
+        return self._run(params_list)[0]
+
+    def pnls(self, params_list: Sequence[dict]) -> List[np.ndarray]:
+        """Net PnL of every closed trade, per parameter set; none for sets stopped by drawdown_cut."""
+        trades, stopped = self._run(params_list)
+        return [rows[:0, 5] if cut else rows[:, 5] for rows, cut in zip(trades, stopped)]
+
+    def evaluate(self, params_list: Sequence[dict]) -> List[Optional[dict]]:
+        """summarize() metrics per parameter set, None for sets without a closed trade or stopped by drawdown_cut."""
+        trades, stopped = self._run(params_list)
+        return [summarize(rows[:, 5], self.balance, rows[-1, 6]) if len(rows) and not cut else None
+                for rows, cut in zip(trades, stopped)]
@@ -0,0 +1,200 @@
+"""
+Walk-Forward Optimization for Day Trading Strategy
+Optimizes on each train fold, then trades the winner on the next (unseen) test fold.
+
+    python backtesting/walk_forward.py                    # 180 days, 30-day train / 10-day test folds
+    python backtesting/walk_forward.py --anchored         # Train folds all start at the first candle
+    python backtesting/walk_forward.py --days 365 --train-days 60 --test-days 14
+
+Folds: the test windows tile the end of the history back to back, each one
+preceded by its train window (rolling: the last --train-days, anchored:
+everything since the first fold). Every train fold is the grid search of
+optimize_params.py (PARAM_GRID, same composite score); its best parameters
+trade the test fold with the balance the previous test fold ended on. The
+chained test folds are the stitched out-of-sample equity curve: no trade in
+it was seen by the parameter choice that made it.
+
+Indicators and candidate bars are computed once over the whole history
+(ParameterSweep) and folds are bar windows of it (ParameterSweep.window), so
+early folds trade on warmed-up indicators and nothing is recomputed per fold.
+The grid searches of all folds run as one batch on the process pool.
+"""
+import argparse
+from itertools import product
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backtesting.engine import summarize
+from backtesting.halving import grid_types
+from backtesting.market_data import load_backtest_data
+from backtesting.optimize_params import MIN_TRADES, PARAM_GRID
+from backtesting.parallel import SweepPool
+from backtesting.results_store import ResultsStore
+from backtesting.sweep import ParameterSweep
+
+BARS_PER_DAY = 96  # 15m candles
+
+
+def make_folds(n_bars, train_bars, test_bars, anchored=False):
+    """(train_start, test_start, test_end) bar indices of every fold; train folds end where their test fold starts."""
+    first_test = train_bars + (n_bars - train_bars) % test_bars  # Test folds end on the last candle
+    folds = []
+    for test_start in range(first_test, n_bars - test_bars + 1, test_bars):
+        train_start = first_test - train_bars if anchored else test_start - train_bars
+        folds.append((train_start, test_start, test_start + test_bars))
+    return folds
+
+
+def best_params(params_list, metrics, param_types, min_trades):
+    """Row of the grid search's top composite score (None if no configuration has min_trades trades)."""
+    store = ResultsStore(':memory:', param_types)
+    store.append((i, params, m) for i, (params, m) in enumerate(zip(params_list, metrics)))
+    top = store.top_composite(1, min_trades=min_trades)
+    store.close()
+    return top[0] if top else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--offline', action='store_true', help="Use local candle store only, no network")
+    parser.add_argument('--days', type=int, default=180, help="Days of 15m history to use")
+    parser.add_argument('--train-days', type=int, default=30, help="Days per train fold (anchored: the first one)")
+    parser.add_argument('--test-days', type=int, default=10, help="Days per test fold")
+    parser.add_argument('--anchored', action='store_true', help="Train folds grow from the first candle instead of rolling")
+    parser.add_argument('--min-trades', type=int, default=MIN_TRADES, help="Fewest train-fold trades of a valid configuration")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Worker processes (1 = serial, in-process; default: all cores)")
+    parser.add_argument('--output', default='walk_forward_results.json', help="Per-fold parameters and metrics")
+    parser.add_argument('--equity', default='walk_forward_equity.csv', help="Stitched out-of-sample equity per bar")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"WALK-FORWARD OPTIMIZATION - {'ANCHORED' if args.anchored else 'ROLLING'} FOLDS")
+    print("=" * 80)
+
+    # Load data (local candle store, missing tail synced from Binance)
+    print("\nLoading historical data...")
+    df_15m, df_1h = load_backtest_data(days=args.days, offline=args.offline)
+    print(f"✅ Data loaded: {len(df_15m)} 15m candles, {len(df_1h)} 1h candles\n")
+
+    folds = make_folds(len(df_15m), args.train_days * BARS_PER_DAY, args.test_days * BARS_PER_DAY, args.anchored)
+    if not folds:
+        sys.exit(f"❌ {args.days} days do not fit a {args.train_days}-day train + {args.test_days}-day test fold")
+
+    # Indicators + candidate entry bars, computed once for all folds
+    sweep = ParameterSweep(df_15m, df_1h)
+    keys = list(PARAM_GRID.keys())
+    combinations = [dict(zip(keys, combo)) for combo in product(*PARAM_GRID.values())]
+    param_types = grid_types(PARAM_GRID)
+    print(f"🔍 {len(folds)} folds x {len(combinations):,} combinations ({len(sweep):,} candidate entry bars)...\n")
+
+    # Train: every fold's grid search, as one batch of chunks over the pool
+    started = time.monotonic()
+    with SweepPool(sweep, workers=args.workers) as pool:
+        print(f"⚙️  Workers: {pool.workers}\n")
+        train_metrics = pool.map_windows(combinations, [(train_start, test_start) for train_start, test_start, _ in folds])
+    elapsed = time.monotonic() - started
+    print(f"⏱️  Train folds: {len(folds) * len(combinations):,} backtests in {elapsed:.1f}s\n")
+
+    # Test: each fold's best parameters on the next window, balances chained across folds
+    balance = sweep.balance
+    oos_rows = []
+    reports = []
+    is_rate = oos_rate = 0.0  # Summed PnL per bar, for the walk-forward efficiency
+    print("=" * 80)
+    print("FOLDS (in-sample = train fold, out-of-sample = test fold)")
+    print("=" * 80)
+    for n, ((train_start, test_start, test_end), metrics) in enumerate(zip(folds, train_metrics), 1):
+        best = best_params(combinations, metrics, param_types, args.min_trades)
+        start_balance = balance
+        if best is None:
+            rows = np.empty((0, 7))  # No valid configuration: the fold sits in cash
+        else:
+            rows = sweep.window(test_start, test_end, balance).trades([best['params']])[0]
+            if len(rows):
+                balance = rows[-1, 6]
+        oos_rows.append(rows)
+        oos = summarize(rows[:, 5], start_balance, balance) if len(rows) else None
+        if best is not None:
+            is_rate += best['total_pnl'] / (test_start - train_start)
+            oos_rate += oos['total_pnl'] / (test_end - test_start) if oos else 0.0
+        reports.append({
+            'fold': n,
+            'train': [str(df_15m.index[train_start]), str(df_15m.index[test_start - 1])],
+            'test': [str(df_15m.index[test_start]), str(df_15m.index[test_end - 1])],
+            'params': best['params'] if best else None,
+            'in_sample': {k: v for k, v in best.items() if k != 'params'} if best else None,
+            'out_of_sample': oos,
+        })
+
+        print(f"\nFold {n}/{len(folds)} | Train {df_15m.index[train_start]:%Y-%m-%d} → {df_15m.index[test_start]:%Y-%m-%d} | "
+              f"Test → {df_15m.index[test_end - 1]:%Y-%m-%d}")
+        if best is None:
+            print(f"  No configuration with {args.min_trades}+ trades in the train fold: no trades")
+            continue
+        print(f"  In-sample:     PnL ${best['total_pnl']:.0f} | Win Rate: {best['win_rate']:.1f}% | Trades: {best['total_trades']}")
+        if oos:
+            print(f"  Out-of-sample: PnL ${oos['total_pnl']:.0f} | Win Rate: {oos['win_rate']:.1f}% | Trades: {oos['total_trades']}")
+        else:
+            print("  Out-of-sample: no trades")
+        print(f"  Params: {best['params']}")
+
+    # Stitched out-of-sample equity: realized balance after every test-fold bar
+    first, last = folds[0][1], folds[-1][2]
+    rows = np.concatenate(oos_rows)
+    realized = np.zeros(last - first)
+    np.add.at(realized, rows[:, 1].astype(np.int64) - first, rows[:, 5])
+    fold_of_bar = np.repeat(np.arange(1, len(folds) + 1), [test_end - test_start for _, test_start, test_end in folds])
+    pd.DataFrame({'fold': fold_of_bar, 'equity': sweep.balance + np.cumsum(realized)},
+                 index=df_15m.index[first:last].rename('timestamp')).to_csv(args.equity)
+
+    print("\n" + "=" * 80)
+    print("🏁 STITCHED OUT-OF-SAMPLE RESULT")
+    print("=" * 80)
+    overall = summarize(rows[:, 5], sweep.balance, balance) if len(rows) else None
+    if overall:
+        print(f"  Period: {df_15m.index[first]:%Y-%m-%d} → {df_15m.index[last - 1]:%Y-%m-%d} ({len(folds)} test folds)")
+        print(f"  Win Rate: {overall['win_rate']:.1f}%")
+        print(f"  Total PnL: ${overall['total_pnl']:.0f} (${sweep.balance:.0f} → ${balance:.0f})")
+        print(f"  Profit Factor: {overall['profit_factor']:.2f}")
+        print(f"  Max Drawdown: {overall['max_drawdown']:.1f}%")
+        print(f"  Trades: {overall['total_trades']}")
+        print(f"  Expectancy: ${overall['expectancy']:.2f}")
+        if is_rate > 0:
+            print(f"  Walk-forward efficiency: {oos_rate / is_rate:.0%} (out-of-sample / in-sample PnL per bar)")
+    else:
+        print("  No out-of-sample trades")
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'mode': 'anchored' if args.anchored else 'rolling',
+            'train_days': args.train_days,
+            'test_days': args.test_days,
+            'folds': reports,
+            'out_of_sample': overall,
+        }, f, indent=2)
+
+    print("\n" + "=" * 80)
+    print(f"💾 Folds saved to: {args.output}")
+    print(f"📈 Out-of-sample equity saved to: {args.equity}")
+    print("=" * 80)
+
+    latest = reports[-1]['params']
+    if latest:
+        print("\n📋 Latest fold's parameters (what walk-forward would trade next):")
+        for k, v in latest.items():
+            print(f"    {k}: {v}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted")
+        sys.exit(130)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Parity check and benchmark of the backtest simulation kernels (backtesting/engine.py).
+
+    python benchmark_backtest.py                      # 100k / 1M / 10M bars
+    python benchmark_backtest.py --sizes 1000000 --loose
+
+DayTradingStrategy signals on a random-walk 15m history are simulated with:
+- indexed: the default, signal to signal with ExitIndex first-touch queries;
+           "cold" includes building the index, "cached" re-runs with the
+           exit-outcome cache warm (as in an optimizer sweep)
+- loop:    the bar-by-bar reference (compiled with numba if installed, else plain Python)
+Both must produce identical trades, and --queries random first-touch queries
+must match a brute-force scan; exits 1 on a mismatch. Throughput is reported
+in simulated bars per second (signal generation not included).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from backtesting import engine
+from backtesting.engine import Candles, simulate
+from backtesting.market_data import resample_1h
+from benchmark_signals import make_strategy, random_walk_15m
+
+PYTHON_LOOP_MAX_BARS = 1_000_000  # Uncompiled reference loop, too slow beyond this
+
+
+def best_time(fn, repeats: int) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_queries(candles: Candles, queries: int, seed: int) -> bool:
+    """Random ExitIndex.first_below / first_above queries against np.flatnonzero."""
+    rng = np.random.default_rng(seed)
+    exits = candles.exits
+    n = len(candles)
+    for _ in range(queries):
+        start = int(rng.integers(0, n + 1))
+        ref = candles.close[min(start, n - 1)]
+        level = ref * (1 + rng.normal(0, 0.02))
+        below = np.flatnonzero(candles.low[start:] <= level)
+        above = np.flatnonzero(candles.high[start:] >= level)
+        if (exits.first_below(start, level) != (start + below[0] if len(below) else -1)
+                or exits.first_above(start, level) != (start + above[0] if len(above) else -1)):
+            print(f"  ❌ first-touch query mismatch: start={start} level={level}")
+            return False
+    return True
+
+
+def same_trades(a, b) -> bool:
+    if len(a.trades) != len(b.trades) or (a.open_trade is None) != (b.open_trade is None):
+        return False
+    keys = ('entry_time', 'time', 'side', 'reason', 'size', 'pnl', 'balance')
+    return all(x[k] == y[k] for x, y in zip(a.trades, b.trades) for k in keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000],
+                        help="Bar counts to simulate")
+    parser.add_argument("--loose", action="store_true", help="Loose strategy thresholds (more trades)")
+    parser.add_argument("--seed", type=int, default=7, help="Random-walk seed")
+    parser.add_argument("--queries", type=int, default=2000, help="Random first-touch queries checked per size")
+    args = parser.parse_args()
+
+    loop_name = 'loop (numba)' if engine.HAVE_NUMBA else 'loop (Python)'
+    print("⏱️  Simulation kernels (best of N runs)")
+    print(f"  {'bars':>12} {'trades':>8} {'indexed cold':>14} {'indexed cached':>15} {loop_name:>15}  parity")
+    ok = True
+    for n in args.sizes:
+        df_15m = random_walk_15m(n, args.seed)
+        signals = make_strategy(args.loose).generate_signals(df_15m, resample_1h(df_15m))
+        candles = Candles.from_frame(df_15m)
+        repeats = 5 if n <= 1_000_000 else 2
+
+        def cold():
+            candles._exits = None  # Rebuild the index, empty outcome cache
+            return simulate(candles, signals)
+
+        fast = cold()
+        t_cold = best_time(cold, repeats)
+        t_cached = best_time(lambda: simulate(candles, signals), repeats)
+        cells = f"{n / t_cold / 1e6:10.1f}M/s {n / t_cached / 1e6:11.1f}M/s"
+        passed = check_queries(candles, args.queries, args.seed)
+        if engine.HAVE_NUMBA or n <= PYTHON_LOOP_MAX_BARS:
+            reference = simulate(candles, signals, kernel=engine._simulate_reference)
+            t_loop = best_time(lambda: simulate(candles, signals, kernel=engine._simulate_reference), repeats)
+            passed &= same_trades(fast, reference)
+            loop_cell = f"{n / t_loop / 1e6:11.1f}M/s"
+        else:
+            loop_cell = '-'
+        ok &= passed
+        print(f"  {n:>12,} {len(fast.trades):>8,} {cells} {loop_cell:>15}  {'✅' if passed else '❌'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Parity check and benchmark of the vectorized indicator kernels (indicators/kernels.py).
+
+    python benchmark_indicators.py                       # parity + 1k / 100k / 10M bars
+    python benchmark_indicators.py --sizes 1000 100000
+    python benchmark_indicators.py --parity-only
+
+Parity: every kernel output is compared with pandas_ta (requirements-dev.txt)
+on a random-walk series; NaN warm-up rows must match exactly and values within
+--tolerance. Exits 1 on a mismatch, and 2 if pandas_ta is not installed: parity
+is then NOT checked. --reference streaming compares with the per-bar
+indicators in indicators/streaming.py instead (in-repo cross-check only).
+
+Benchmark: best-of-N wall time per indicator for the kernels (numba backend if
+installed, else NumPy) against pandas_ta, and against the streaming indicators
+up to 100k bars.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from indicators import kernels
+from indicators import streaming
+
+try:
+    import pandas_ta as ta
+except ImportError:
+    ta = None
+
+STREAMING_MAX_BARS = 100_000  # Pure-Python per-bar loop, too slow beyond this
+
+
+def random_walk(n: int, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    close = 60000.0 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.0015, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.0015, n)))
+    volume = rng.uniform(50, 500, n)
+    return {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+
+
+# --- Implementations: each returns a tuple of arrays ---
+
+KERNELS = {
+    'EMA200': lambda d: (kernels.ema(d['close'], 200),),
+    'SMA20': lambda d: (kernels.sma(d['close'], 20),),
+    'RSI14': lambda d: (kernels.rsi(d['close'], 14),),
+    'ATR14': lambda d: (kernels.atr(d['high'], d['low'], d['close'], 14),),
+    'ADX14': lambda d: kernels.adx(d['high'], d['low'], d['close'], 14),
+    'MACD': lambda d: kernels.macd(d['close'], 12, 26, 9),
+    'StochRSI': lambda d: kernels.stochrsi(d['close'], length=14, rsi_length=14, k=3, d=3),
+}
+
+
+def _frame_columns(df: pd.DataFrame) -> tuple:
+    return tuple(df[col].to_numpy() for col in df.columns)
+
+
+PANDAS_TA = {
+    # pandas_ta column order: ADX, DMP, DMN / MACD, MACDh, MACDs / STOCHRSIk, STOCHRSId
+    'EMA200': lambda df: (ta.ema(df['close'], length=200).to_numpy(),),
+    'SMA20': lambda df: (ta.sma(df['close'], length=20).to_numpy(),),
+    'RSI14': lambda df: (ta.rsi(df['close'], length=14).to_numpy(),),
+    'ATR14': lambda df: (ta.atr(df['high'], df['low'], df['close'], length=14).to_numpy(),),
+    'ADX14': lambda df: _frame_columns(ta.adx(df['high'], df['low'], df['close'], length=14)),
+    'MACD': lambda df: _frame_columns(ta.macd(df['close'], fast=12, slow=26, signal=9)),
+    'StochRSI': lambda df: _frame_columns(ta.stochrsi(df['close'], length=14, rsi_length=14, k=3, d=3)),
+}
+
+
+def _streaming_macd(close: np.ndarray) -> tuple:
+    fast, slow, signal = streaming.EMA(12), streaming.EMA(26), streaming.EMA(9)
+    line = np.array([fast.push(x) - slow.push(x) for x in close])
+    signal_line = np.array([signal.push(x) if not np.isnan(x) else np.nan for x in line])
+    return line, line - signal_line, signal_line
+
+
+def _run_streaming(indicator, d: dict) -> tuple:
+    candles = np.column_stack([np.arange(len(d['close'])), d['open'], d['high'], d['low'], d['close'], d['volume']])
+    out = np.array([indicator.update(candle) for candle in candles], dtype=np.float64)
+    return tuple(out.T) if out.ndim == 2 else (out,)
+
+
+STREAMING = {
+    'EMA200': lambda d: _run_streaming(streaming.EMA(200), d),
+    'SMA20': lambda d: _run_streaming(streaming.SMA(20), d),
+    'RSI14': lambda d: _run_streaming(streaming.RSI(14), d),
+    'ATR14': lambda d: _run_streaming(streaming.ATR(14), d),
+    'ADX14': lambda d: _run_streaming(streaming.ADX(14), d),
+    'MACD': lambda d: _streaming_macd(d['close']),
+    'StochRSI': lambda d: _run_streaming(streaming.StochRSI(length=14, rsi_length=14, k=3, d=3), d),
+}
+
+
+# --- Parity ---
+
+def check_parity(bars: int, tolerance: float, seed: int, reference_name: str) -> bool:
+    data = random_walk(bars, seed)
+    if reference_name == 'pandas_ta':
+        reference, ref_input = PANDAS_TA, pd.DataFrame(data)
+    else:
+        reference, ref_input = STREAMING, data
+    title = 'pandas_ta' if reference_name == 'pandas_ta' else 'indicators.streaming (in-repo cross-check, NOT pandas_ta)'
+    print(f"🔍 Parity vs {title}, {bars:,} bars, tolerance {tolerance:g} (relative)")
+
+    ok = True
+    for name, kernel in KERNELS.items():
+        got, expected = kernel(data), reference[name](ref_input)
+        for i, (a, b) in enumerate(zip(got, expected)):
+            same_nan = np.array_equal(np.isnan(a), np.isnan(b))
+            valid = ~np.isnan(b)
+            err = np.max(np.abs(a[valid] - b[valid]) / np.maximum(np.abs(b[valid]), 1.0)) if valid.any() else 0.0
+            passed = same_nan and err <= tolerance
+            ok &= passed
+            label = name if len(got) == 1 else f"{name}[{i}]"
+            print(f"  {'✅' if passed else '❌'} {label:<12} warm-up rows {'match' if same_nan else 'DIFFER'}, "
+                  f"max rel err {err:.2e}")
+    return ok
+
+
+# --- Benchmark ---
+
+def best_time(fn, arg, repeats: int) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(sizes: list, seed: int):
+    backend = 'numba' if kernels.HAVE_NUMBA else 'NumPy'
+    baseline = 'pandas_ta' if ta is not None else None
+    print(f"\n⏱️  Benchmark (kernels backend: {backend}; best of N runs)")
+    for name, kernel in KERNELS.items():
+        kernel(random_walk(1000, seed))  # JIT compile / warm caches outside the timings
+
+    print(f"  {'indicator':<10} {'bars':>12} {'kernels':>11} {'pandas_ta':>11} {'streaming':>11} {'speedup':>9}")
+    for n in sizes:
+        data = random_walk(n, seed)
+        frame = pd.DataFrame(data) if baseline else None
+        repeats = 5 if n <= 100_000 else 1
+        for name, kernel in KERNELS.items():
+            t_kernel = best_time(kernel, data, repeats)
+            t_ta = best_time(PANDAS_TA[name], frame, repeats) if baseline else None
+            t_stream = best_time(STREAMING[name], data, 1) if n <= STREAMING_MAX_BARS else None
+            reference = t_ta if t_ta is not None else t_stream
+            speedup = f"{reference / t_kernel:8.1f}x" if reference else f"{'-':>9}"
+            print(f"  {name:<10} {n:>12,} {t_kernel * 1000:9.2f}ms "
+                  + (f"{t_ta * 1000:9.2f}ms " if t_ta is not None else f"{'-':>11} ")
+                  + (f"{t_stream * 1000:9.2f}ms " if t_stream is not None else f"{'-':>11} ")
+                  + speedup)
+    if not baseline:
+        print("  (pandas_ta not installed: speedup is against the streaming indicators)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs='+', default=[1_000, 100_000, 10_000_000],
+                        help="Bar counts to benchmark")
+    parser.add_argument("--parity-bars", type=int, default=20_000, help="Bars used for the parity check")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="Max relative error in the parity check")
+    parser.add_argument("--parity-only", action="store_true", help="Skip the benchmark")
+    parser.add_argument("--seed", type=int, default=7, help="Random-walk seed")
+    parser.add_argument("--reference", choices=['pandas_ta', 'streaming'], default='pandas_ta',
+                        help="Parity reference (streaming: in-repo cross-check, not a pandas_ta parity check)")
+    args = parser.parse_args()
+
+    if args.reference == 'pandas_ta' and ta is None:
+        print("❌ pandas_ta not installed: reference unavailable, parity NOT checked "
+              "(pip install -r requirements-dev.txt)")
+        ok = None
+    else:
+        ok = check_parity(args.parity_bars, args.tolerance, args.seed, args.reference)
+    if not args.parity_only:
+        benchmark(args.sizes, args.seed)
+    sys.exit(2 if ok is None else 0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
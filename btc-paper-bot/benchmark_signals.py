@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark of DayTradingStrategy.generate_signals (batch signals of a whole history).
+
+    python benchmark_signals.py                  # 100k bars
+    python benchmark_signals.py --bars 1000000 --loose
+
+Best-of-3 wall time on a random-walk 15m history, indicators included (the
+indicator cache is cleared before every run). Looser thresholds than the live
+defaults (--loose) produce more signals. Consistency with bar-by-bar analyze()
+is checked by tests/test_signals.py; the random walk and the loose strategy are
+shared with it and with the other benchmarks.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from backtesting.market_data import resample_1h
+from indicators.cache import indicator_cache
+from strategies.day_trading import DayTradingStrategy
+
+
+def random_walk_15m(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 60000.0 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.0015, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.0015, n)))
+    index = pd.date_range('2024-01-01', periods=n, freq='15min')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.uniform(50, 500, n)}, index=index)
+
+
+def make_strategy(loose: bool) -> DayTradingStrategy:
+    strategy = DayTradingStrategy()
+    if loose:
+        strategy.adx_threshold = 10
+        strategy.stoch_oversold = 40
+        strategy.stoch_overbought = 60
+        strategy.rsi_long_max = 70
+        strategy.rsi_short_min = 30
+    return strategy
+
+
+def benchmark(bars: int, loose: bool, seed: int):
+    df_15m = random_walk_15m(bars, seed)
+    df_1h = resample_1h(df_15m)
+    strategy = make_strategy(loose)
+    best = float('inf')
+    for _ in range(3):
+        indicator_cache.clear()  # Time the indicators too, not just cache hits
+        start = time.perf_counter()
+        batch = strategy.generate_signals(df_15m, df_1h)
+        best = min(best, time.perf_counter() - start)
+    print(f"⏱️  generate_signals: {bars:,} bars in {best * 1000:.1f}ms "
+          f"({int(batch.long.sum())} LONG / {int(batch.short.sum())} SHORT)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=100_000, help="15m bars for the batch timing")
+    parser.add_argument("--loose", action="store_true", help="Loose thresholds (more signals)")
+    parser.add_argument("--seed", type=int, default=7, help="Random-walk seed")
+    args = parser.parse_args()
+    benchmark(args.bars, args.loose, args.seed)
+
+
+if __name__ == "__main__":
+    main()
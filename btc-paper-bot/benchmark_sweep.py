@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Parity check and benchmark of the batched parameter sweep (backtesting/sweep.py).
+
+    python benchmark_sweep.py                        # 5,760 bars (60 days), 3,840 grid points
+    python benchmark_sweep.py --bars 100000 --params 500
+
+Random parameter sets (within the genetic optimizer's ranges) on a random-walk
+15m history are evaluated with:
+- sweep:   ParameterSweep.evaluate, indicators and candidate bars computed once
+- engine:  run_strategy(strategy_with_params(params), ...) per set, as the
+           optimizers did before (--check sets only, it is the slow one)
+Metrics must be identical; exits 1 on a mismatch. Throughput is reported in
+parameter sets per second, including the sweep's one-off setup.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from backtesting.engine import Candles, run_strategy, strategy_with_params
+from backtesting.market_data import resample_1h
+from backtesting.sweep import ParameterSweep
+from benchmark_signals import random_walk_15m
+
+RANGES = {
+    'adx_threshold': (5, 30),
+    'stoch_oversold': (10, 45),
+    'stoch_overbought': (55, 90),
+    'risk_reward_ratio': (1.3, 3.5),
+    'sl_atr_multiplier': (1.3, 3.0),
+    'rsi_long_max': (55, 75),
+    'rsi_short_min': (25, 45),
+}
+
+
+def random_params(rng: random.Random) -> dict:
+    return {k: rng.randint(lo, hi) if isinstance(lo, int) else round(rng.uniform(lo, hi), 2)
+            for k, (lo, hi) in RANGES.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=5_760, help="15m bars in the history")
+    parser.add_argument("--params", type=int, default=3_840, help="Parameter sets evaluated by the sweep")
+    parser.add_argument("--check", type=int, default=300, help="Parameter sets also run through the engine")
+    parser.add_argument("--seed", type=int, default=7, help="Random-walk / parameter seed")
+    args = parser.parse_args()
+
+    df_15m = random_walk_15m(args.bars, args.seed)
+    df_1h = resample_1h(df_15m)
+    rng = random.Random(args.seed)
+    params_list = [random_params(rng) for _ in range(args.params)]
+
+    start = time.perf_counter()
+    sweep = ParameterSweep(df_15m, df_1h)
+    metrics = sweep.evaluate(params_list)
+    t_sweep = time.perf_counter() - start
+
+    checked = params_list[:args.check]
+    candles = Candles.from_frame(df_15m)
+    start = time.perf_counter()
+    reference = []
+    for params in checked:
+        result = run_strategy(strategy_with_params(params), df_15m, df_1h, candles=candles)
+        reference.append(result.summary() if result.trades else None)
+    t_engine = time.perf_counter() - start
+
+    mismatches = [i for i, (a, b) in enumerate(zip(metrics, reference)) if a != b]
+    for i in mismatches[:10]:
+        print(f"  ❌ {checked[i]}: sweep={metrics[i]} engine={reference[i]}")
+
+    traded = sum(m is not None for m in metrics)
+    print(f"🔍 {args.bars:,} bars, {len(sweep):,} candidate bars, {traded:,}/{len(params_list):,} sets with trades")
+    print(f"⏱️  sweep:  {len(params_list) / t_sweep:10,.0f} sets/s ({t_sweep:.2f}s total)")
+    if checked:
+        print(f"⏱️  engine: {len(checked) / t_engine:10,.0f} sets/s")
+    print(f"{'✅' if not mismatches else '❌'} {len(checked):,} sets compared, {len(mismatches)} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
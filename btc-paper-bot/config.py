@@ -1,15 +1,26 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field, SecretStr
-from typing import Optional
+from pydantic import Field, SecretStr, model_validator
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # Trading
     PAPER_TRADING_BALANCE: float = Field(10000.0, description="Initial balance for paper trading")
     RISK_PERCENT: float = Field(0.75, description="Max risk percentage per trade")
     SYMBOL: str = Field("BTC/USDT", description="Symbol to trade")
+    SYMBOLS: List[str] = Field([], description="Multi-symbol mode: pairs to trade (empty = just SYMBOL)")
+    MAX_OPEN_POSITIONS: int = Field(5, description="Max concurrent positions across all symbols")
     TIMEFRAME_CHECK: str = "1m"
+    BASE_TIMEFRAME: str = Field("15m", description="Only websocket kline subscription; higher timeframes are derived")
+    TIMEFRAMES: List[str] = Field(["15m", "1h"], description="Buffered timeframes (add 4h for MultiTimeframeStrategy)")
+    ENTRY_TIMEFRAME: str = Field("15m", description="Strategy entry frame; its bar closes trigger an evaluation")
+    TREND_TIMEFRAME: str = Field("1h", description="Strategy trend-filter frame")
     SLIPPAGE_PCT: float = 0.00
     TAKER_FEE: float = 0.0004
+    BUFFER_CAPACITY: int = Field(500, description="Candles kept in memory per timeframe")
+    QUEUE_MAXSIZE: int = Field(1000, description="Max pending (coalesced) events before producers wait")
+    BAR_CLOSE_GRACE_MS: int = Field(2000, description="Wait after a bar boundary before closing it by timer")
+    BACKFILL_MIN_INTERVAL_MS: int = Field(250, description="Min spacing of REST requests that backfill stream gaps")
+    STARTUP_FETCH_RETRIES: int = Field(5, description="Retries (with backoff) of the startup history fetch")
     
     # Notifications
     RESEND_API_KEY: Optional[SecretStr] = None
@@ -28,6 +39,33 @@ class Settings(BaseSettings):
     # Metrics
     METRICS_PORT: int = 8000
 
+    # Local candle store (backtests / history)
+    CANDLE_STORE_DIR: str = "data/candles"
+
+    # Indicator cache (backtests / optimizers / full-recompute strategies)
+    INDICATOR_CACHE_MB: float = Field(256, description="Memory bound of the in-process indicator cache")
+    INDICATOR_CACHE_DIR: Optional[str] = Field(None, description="On-disk indicator cache directory (empty = memory only)")
+
+    # Warm start: buffers + indicator state, saved periodically and on shutdown
+    SNAPSHOT_PATH: Optional[str] = Field("data/snapshot.pkl", description="Warm-start snapshot file (empty = off)")
+    SNAPSHOT_INTERVAL: int = Field(300, description="Seconds between periodic snapshots")
+
+    # Event journal for record & replay (see replay.py)
+    JOURNAL_PATH: Optional[str] = Field(None, description="Append every received ticker/OHLCV message to this file")
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
+    @model_validator(mode='after')
+    def check_timeframes(self) -> 'Settings':
+        """The strategy's frames must be buffered, or every bar close would fail."""
+        missing = [tf for tf in (self.ENTRY_TIMEFRAME, self.TREND_TIMEFRAME) if tf not in self.TIMEFRAMES]
+        if missing:
+            raise ValueError(f"ENTRY_TIMEFRAME / TREND_TIMEFRAME {missing} not in TIMEFRAMES {self.TIMEFRAMES}")
+        return self
+
+    @property
+    def symbols(self) -> List[str]:
+        """Traded pairs: SYMBOLS if set, else the single SYMBOL."""
+        return self.SYMBOLS or [self.SYMBOL]
+
 settings = Settings()
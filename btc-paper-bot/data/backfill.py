@@ -0,0 +1,51 @@
+"""
+REST backfill of candles missed while the websocket was down.
+
+SymbolState.gap_before() finds the missing range by comparing the newest real
+candle with the first streamed one; GapBackfiller fetches exactly
+that range. Requests from all symbols share one lock and a minimum interval,
+so a reconnect storm across many pairs stays within the exchange limits.
+"""
+import asyncio
+import time
+from typing import List
+
+import structlog
+
+from data.candle_store import PAGE_LIMIT
+from utils.helpers import timeframe_to_ms
+
+log = structlog.get_logger()
+
+
+class GapBackfiller:
+    def __init__(self, exchange, min_interval_ms: int = 250):
+        self.exchange = exchange
+        self.min_interval = min_interval_ms / 1000
+        self._lock = asyncio.Lock()
+        self._last_request = 0.0
+
+    async def _fetch_page(self, symbol: str, timeframe: str, since: int, limit: int) -> list:
+        async with self._lock:
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await self.exchange.fetch_ohlcv(symbol, timeframe, since, limit=limit)
+            finally:
+                self._last_request = time.monotonic()
+
+    async def fetch(self, symbol: str, timeframe: str, start: int, end: int) -> List[list]:
+        """Candles with start <= ts <= end (ms), oldest first."""
+        step = timeframe_to_ms(timeframe)
+        candles: List[list] = []
+        cursor = start
+        while cursor <= end:
+            limit = min((end - cursor) // step + 1, PAGE_LIMIT)
+            page = [c for c in await self._fetch_page(symbol, timeframe, cursor, limit) if cursor <= c[0] <= end]
+            if not page:
+                break
+            candles.extend(page)
+            cursor = int(page[-1][0]) + step
+        log.info("Gap backfilled", symbol=symbol, timeframe=timeframe, start=start, end=end, candles=len(candles))
+        return candles
@@ -0,0 +1,86 @@
+"""
+Closed-bar event detection.
+
+The websocket pushes the developing candle many times per minute, but the
+strategy only needs to run when a bar closes. BarCloseTracker turns the
+candle stream into explicit BarClose events per timeframe:
+
+- rollover: a candle with a newer timestamp arrives -> the previous bar closed
+- timer:    the wall clock passed the bar end (+ grace) before any rollover,
+            so a quiet feed does not delay evaluation
+
+Each bar is emitted exactly once, whichever path sees it first.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from utils.helpers import timeframe_to_ms
+
+
+@dataclass
+class BarClose:
+    timeframe: str
+    timestamp: int  # Open time (ms) of the bar that closed
+    end: int        # Close time (ms) of that bar
+    source: str     # 'rollover' or 'timer'
+
+
+class BarCloseTracker:
+    def __init__(self, timeframes: Iterable[str], grace_ms: int = 2000):
+        self.grace_ms = grace_ms
+        self.step: Dict[str, int] = {tf: timeframe_to_ms(tf) for tf in timeframes}
+        self.last_ts: Dict[str, int] = {tf: 0 for tf in self.step}      # Newest (developing) bar seen
+        self.last_closed: Dict[str, int] = {tf: 0 for tf in self.step}  # Newest bar already emitted
+
+    def seed(self, timeframe: str, last_ts: int):
+        """Start tracking from a loaded buffer: its last bar is developing, older ones count as handled."""
+        self.last_ts[timeframe] = last_ts
+        self.last_closed[timeframe] = last_ts - self.step[timeframe] if last_ts else 0
+
+    def snapshot(self) -> dict:
+        return {'last_ts': dict(self.last_ts), 'last_closed': dict(self.last_closed)}
+
+    def restore(self, snap: dict):
+        for tf in self.step:
+            self.last_ts[tf] = int(snap['last_ts'].get(tf, 0))
+            self.last_closed[tf] = int(snap['last_closed'].get(tf, 0))
+
+    def _close(self, timeframe: str, ts: int, source: str) -> Optional[BarClose]:
+        if ts <= self.last_closed[timeframe]:
+            return None
+        self.last_closed[timeframe] = ts
+        return BarClose(timeframe, ts, ts + self.step[timeframe], source)
+
+    def on_candle(self, timeframe: str, ts: int) -> Optional[BarClose]:
+        """Call for every upserted candle; returns an event when the timestamp rolls over."""
+        if timeframe not in self.step:
+            return None
+        prev = self.last_ts[timeframe]
+        if ts <= prev:
+            return None
+        self.last_ts[timeframe] = ts
+        if not prev:
+            return None
+        return self._close(timeframe, prev, 'rollover')
+
+    def close_through(self, end_ms: int) -> List[BarClose]:
+        """
+        Close every tracked bar that ends at or before end_ms and was not emitted yet.
+        Higher timeframes come first, so they are closed before a lower one triggers evaluation.
+        """
+        events = []
+        for tf, step in sorted(self.step.items(), key=lambda item: -item[1]):
+            ts = self.last_ts[tf]
+            if ts and ts + step <= end_ms:
+                event = self._close(tf, ts, 'timer')
+                if event:
+                    events.append(event)
+        return events
+
+    def on_clock(self, now_ms: int) -> List[BarClose]:
+        """Wall-clock boundary check, see close_through()."""
+        return self.close_through(now_ms - self.grace_ms)
+
+    def next_deadline(self, now_ms: int) -> int:
+        """Next wall-clock time (ms) at which on_clock() may emit something."""
+        return min((now_ms - self.grace_ms) // step * step + step for step in self.step.values()) + self.grace_ms
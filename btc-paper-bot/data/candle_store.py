@@ -0,0 +1,212 @@
+"""
+Local OHLCV Candle Store
+
+Closed candles are persisted as memory-mapped NumPy files, partitioned by
+symbol / timeframe / month:
+
+    data/candles/BTC_USDT/15m/2026-09.npy
+
+Each partition holds a (6, n) float64 array in column order
+timestamp, open, high, low, close, volume - so every column is a contiguous
+slice and a time-range read only touches the months it overlaps.
+Millisecond timestamps are exact in float64 (< 2^53).
+
+Syncing only pages the missing tail from the exchange, so repeated backtest
+and optimizer runs start from local data and keep working offline.
+Only the syncs write to the store: resuming after the last stored candle
+relies on the stored range having no holes, so partial fetches (the live
+bot's recent-candle REST loads) must not be written into it.
+"""
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from config import settings
+from utils.helpers import timeframe_to_ms
+
+log = structlog.get_logger()
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+PAGE_LIMIT = 1000
+
+
+def _now_ms() -> int:
+    return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+
+def _month_key(ts: np.ndarray) -> np.ndarray:
+    return ts.astype('datetime64[ms]').astype('datetime64[M]').astype(str)
+
+
+class CandleStore:
+    def __init__(self, root: str = None):
+        self.root = root or settings.CANDLE_STORE_DIR
+
+    # --- Layout ---
+
+    def _dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol.replace('/', '_'), timeframe)
+
+    def months(self, symbol: str, timeframe: str) -> List[str]:
+        """Sorted list of stored month partitions ('YYYY-MM')."""
+        path = self._dir(symbol, timeframe)
+        if not os.path.isdir(path):
+            return []
+        return sorted(f[:-4] for f in os.listdir(path) if f.endswith('.npy'))
+
+    def _read_month(self, symbol: str, timeframe: str, month: str, mmap: bool = True) -> np.ndarray:
+        path = os.path.join(self._dir(symbol, timeframe), f"{month}.npy")
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def _write_month(self, symbol: str, timeframe: str, month: str, block: np.ndarray):
+        path = os.path.join(self._dir(symbol, timeframe), f"{month}.npy")
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, np.ascontiguousarray(block, dtype=np.float64))
+        os.replace(tmp, path)  # Atomic: readers never see a half-written partition
+
+    # --- Queries ---
+
+    def first_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        months = self.months(symbol, timeframe)
+        if not months:
+            return None
+        return int(self._read_month(symbol, timeframe, months[0])[0, 0])
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        months = self.months(symbol, timeframe)
+        if not months:
+            return None
+        return int(self._read_month(symbol, timeframe, months[-1])[0, -1])
+
+    def read(self, symbol: str, timeframe: str, start: int = None, end: int = None) -> Dict[str, np.ndarray]:
+        """
+        Column arrays for candles with start <= timestamp < end (ms).
+        A range inside a single month is returned as zero-copy memmap views.
+        """
+        blocks = []
+        start_month = str(_month_key(np.array([start]))[0]) if start is not None else None
+        end_month = str(_month_key(np.array([end]))[0]) if end is not None else None
+        for month in self.months(symbol, timeframe):
+            if start_month and month < start_month:
+                continue
+            if end_month and month > end_month:
+                break
+            block = self._read_month(symbol, timeframe, month)
+            lo = np.searchsorted(block[0], start) if start is not None else 0
+            hi = np.searchsorted(block[0], end) if end is not None else block.shape[1]
+            if hi > lo:
+                blocks.append(block[:, lo:hi])
+
+        if not blocks:
+            data = np.empty((len(COLUMNS), 0))
+        elif len(blocks) == 1:
+            data = blocks[0]
+        else:
+            data = np.concatenate(blocks, axis=1)
+
+        columns = {name: data[i] for i, name in enumerate(COLUMNS)}
+        columns['timestamp'] = columns['timestamp'].astype(np.int64)
+        return columns
+
+    def load(self, symbol: str, timeframe: str, start: int = None, end: int = None) -> pd.DataFrame:
+        """Same as read(), shaped like HistoricalFetcher.fetch_ohlcv output."""
+        cols = self.read(symbol, timeframe, start, end)
+        index = pd.DatetimeIndex(pd.to_datetime(cols['timestamp'], unit='ms'), name='timestamp')
+        return pd.DataFrame({name: cols[name] for name in COLUMNS[1:]}, index=index)
+
+    # --- Writes ---
+
+    def write(self, symbol: str, timeframe: str, candles) -> int:
+        """
+        Merge candles ([ts, o, h, l, c, v] rows) into their month partitions.
+        Newer values win on duplicate timestamps. Returns number of rows given.
+        """
+        rows = np.asarray(candles, dtype=np.float64)
+        if rows.size == 0:
+            return 0
+        new = rows.T
+        os.makedirs(self._dir(symbol, timeframe), exist_ok=True)
+        existing = set(self.months(symbol, timeframe))
+
+        keys = _month_key(new[0].astype(np.int64))
+        for month in np.unique(keys):
+            block = new[:, keys == month]
+            if month in existing:
+                block = np.concatenate([self._read_month(symbol, timeframe, month, mmap=False), block], axis=1)
+            # Keep the LAST occurrence of every timestamp, sorted
+            ts_rev = block[0, ::-1]
+            _, idx = np.unique(ts_rev, return_index=True)
+            block = block[:, block.shape[1] - 1 - idx]
+            self._write_month(symbol, timeframe, month, block)
+        return rows.shape[0]
+
+    def closed(self, timeframe: str, candles: list) -> list:
+        """Drop the still-developing candle; the store only holds closed bars."""
+        cutoff = _now_ms() - timeframe_to_ms(timeframe)
+        return [c for c in candles if c[0] <= cutoff]
+
+    def _sync_start(self, symbol: str, timeframe: str, since: int) -> int:
+        last = self.last_timestamp(symbol, timeframe)
+        first = self.first_timestamp(symbol, timeframe)
+        if last is None or since < first:
+            # Nothing stored yet (or history requested before what we have): full page-in.
+            # Duplicates with existing partitions are merged by write().
+            return since
+        return last + timeframe_to_ms(timeframe)
+
+    def sync(self, exchange, symbol: str, timeframe: str, since: int) -> int:
+        """Page the missing tail from a blocking ccxt exchange. Returns candles written."""
+        cursor = self._sync_start(symbol, timeframe, since)
+        step = timeframe_to_ms(timeframe)
+        written = 0
+        while cursor <= _now_ms() - step:
+            data = exchange.fetch_ohlcv(symbol, timeframe, cursor, limit=PAGE_LIMIT)
+            if not data:
+                break
+            written += self.write(symbol, timeframe, self.closed(timeframe, data))
+            cursor = data[-1][0] + step
+            if len(data) < PAGE_LIMIT:
+                break
+        log.info("Candle store synced", symbol=symbol, timeframe=timeframe, new=written)
+        return written
+
+    async def async_sync(self, exchange, symbol: str, timeframe: str, since: int) -> int:
+        """Same as sync() for async (ccxt.pro) exchanges."""
+        cursor = self._sync_start(symbol, timeframe, since)
+        step = timeframe_to_ms(timeframe)
+        written = 0
+        while cursor <= _now_ms() - step:
+            data = await exchange.fetch_ohlcv(symbol, timeframe, cursor, limit=PAGE_LIMIT)
+            if not data:
+                break
+            written += await asyncio.to_thread(self.write, symbol, timeframe, self.closed(timeframe, data))
+            cursor = data[-1][0] + step
+            if len(data) < PAGE_LIMIT:
+                break
+        log.info("Candle store synced", symbol=symbol, timeframe=timeframe, new=written)
+        return written
+
+
+def load_history(symbol: str, timeframe: str, days: int, offline: bool = False,
+                 store: CandleStore = None) -> pd.DataFrame:
+    """
+    Last `days` of closed candles from the local store, syncing the missing
+    tail from Binance first unless offline. Network errors fall back to
+    whatever is already stored.
+    """
+    store = store or CandleStore()
+    since = _now_ms() - days * 24 * 60 * 60 * 1000
+    if not offline:
+        try:
+            import ccxt
+            exchange = ccxt.binance({'enableRateLimit': True})
+            store.sync(exchange, symbol, timeframe, since)
+        except Exception as e:
+            log.warning("Candle sync failed, using local data", error=str(e))
+    return store.load(symbol, timeframe, start=since)
@@ -0,0 +1,92 @@
+"""
+Coalescing, bounded event queue for the bot's consumer loop.
+
+Pending events are keyed so that only the freshest state is processed:
+
+- ticker: one slot, a newer ticker replaces the pending one
+- ohlcv:  one slot per (timeframe, candle timestamp); batches are split per candle
+- others: plain FIFO (bar_clock, reconnect, ...)
+
+A replaced event keeps its place in line but carries the newest data. FIFO
+events are barriers for candles: an update arriving after one is queued behind
+it as a new entry rather than jumping ahead into the pending slot.
+Producers of new keys wait while `maxsize` events are pending (backpressure);
+tickers never wait, they always fit in their single slot.
+Drop-in for the asyncio.Queue API used by WebSocketFetcher and Bot.
+"""
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+
+from monitoring import metrics
+
+
+class CoalescingQueue:
+    def __init__(self, maxsize: int = 1000):
+        self.maxsize = maxsize
+        self._pending: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (event, enqueued_at)
+        self._seq = itertools.count()
+        self._barrier = None  # Sequence number of the last FIFO event put
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._all_done = asyncio.Event()
+        self._all_done.set()
+        self._unfinished = 0
+
+    def qsize(self) -> int:
+        return len(self._pending)
+
+    def empty(self) -> bool:
+        return not self._pending
+
+    def _split(self, item: dict):
+        """(key, event) pairs for an incoming message."""
+        msg_type = item.get('type')
+        if msg_type == 'ticker':
+            yield ('ticker', item.get('symbol')), item
+        elif msg_type == 'ohlcv':
+            for candle in item['data']:
+                event = dict(item, data=[candle])
+                yield ('ohlcv', item.get('symbol'), item['timeframe'], int(candle[0]), self._barrier), event
+        else:
+            self._barrier = next(self._seq)
+            yield (msg_type, self._barrier), item
+
+    async def put(self, item: dict):
+        for key, event in self._split(item):
+            msg_type = event.get('type')
+            while key not in self._pending and msg_type != 'ticker' and len(self._pending) >= self.maxsize:
+                metrics.QUEUE_FULL_WAITS.labels(type=msg_type).inc()
+                self._not_full.clear()
+                await self._not_full.wait()
+
+            if key in self._pending:
+                metrics.QUEUE_COALESCED.labels(type=msg_type).inc()
+                self._pending[key] = (event, time.monotonic())
+                continue
+
+            self._pending[key] = (event, time.monotonic())
+            self._unfinished += 1
+            self._all_done.clear()
+            self._not_empty.set()
+        metrics.QUEUE_DEPTH.set(len(self._pending))
+
+    async def get(self) -> dict:
+        while not self._pending:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        _, (event, enqueued_at) = self._pending.popitem(last=False)
+        self._not_full.set()
+        metrics.QUEUE_DEPTH.set(len(self._pending))
+        metrics.QUEUE_EVENT_AGE.labels(type=event.get('type')).observe(time.monotonic() - enqueued_at)
+        return event
+
+    def task_done(self):
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._all_done.set()
+
+    async def join(self):
+        await self._all_done.wait()
@@ -0,0 +1,279 @@
+"""
+Local stand-in for the ccxt.pro exchange used by the live bot.
+
+FakeExchange implements the methods WebSocketFetcher / HistoricalFetcher call
+(watch_ticker(s), watch_ohlcv, watch_ohlcv_for_symbols, fetch_ohlcv, close) on
+top of one random-walk market per symbol, so the whole live path can be
+load-tested without Binance:
+
+- ticker / ohlcv message rates (tens of thousands per second are fine); the
+  multiplexed watch_* methods spread them round-robin over the symbols
+- bursts:      every `burst_every` s a stream sends `burst_size` messages unpaced
+- disconnects: every `disconnect_every` s all calls raise for `disconnect_for` s
+- gaps:        every `gap_every` s the market clock jumps `gap_bars` base bars ahead
+               (bars skipped by the streams are still served over REST)
+- REST history: `history_bars` base candles before the start, plus everything
+  generated live, resampled to any multiple of the base timeframe
+
+Market time runs `time_scale` times faster than the wall clock, so bar closes
+(and strategy decisions) can be produced at a useful rate.
+Tickers carry the perf_counter() send time in info['sent'] and
+`bar_opened[symbol]` maps each base bar to the send time of its first message,
+for latency stats.
+"""
+import asyncio
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+from utils.helpers import timeframe_to_ms
+
+
+class FakeNetworkError(Exception):
+    """Raised while the fake exchange is 'disconnected'."""
+
+
+class _Market:
+    """Random-walk price and base candles of one symbol."""
+
+    def __init__(self, rng: random.Random, step: int, start_ms: int, volatility: float,
+                 history_bars: int, start_price: float):
+        self.rng = rng
+        self.step = step
+        self.volatility = volatility  # Return stdev per base bar
+        self.price = start_price
+        self.candles: List[list] = [self._walk_bar(start_ms - i * step) for i in range(history_bars, 0, -1)]
+        price = self.price
+        self.bar = [start_ms, price, price, price, price, 0.0]
+        self.last_ms = start_ms
+        self.bar_opened: Dict[int, float] = {}
+        self.ohlcv_from: Optional[int] = start_ms  # Oldest bar the next watch_ohlcv has to (re)send
+
+    def _walk_bar(self, ts: int) -> list:
+        """A whole bar of random walk starting at the current price."""
+        o = self.price
+        c = o * (1 + self.rng.gauss(0, self.volatility))
+        h = max(o, c) * (1 + abs(self.rng.gauss(0, self.volatility / 2)))
+        l = min(o, c) * (1 - abs(self.rng.gauss(0, self.volatility / 2)))
+        self.price = c
+        return [ts, o, h, l, c, self.rng.uniform(50, 500)]
+
+    def tick(self, now: int):
+        bar_ts = now - now % self.step
+        if bar_ts > self.bar[0]:
+            self.candles.append(self.bar)
+            # Bars nobody asked for (outage / gap) still exist and can be fetched over REST
+            self.candles.extend(self._walk_bar(ts) for ts in range(self.bar[0] + self.step, bar_ts, self.step))
+            self.bar = [bar_ts, self.price, self.price, self.price, self.price, 0.0]
+            self.last_ms = max(self.last_ms, bar_ts)
+
+        dt = now - self.last_ms
+        if dt > 0:
+            self.price *= 1 + self.rng.gauss(0, self.volatility * math.sqrt(dt / self.step))
+            self.last_ms = now
+        bar = self.bar
+        bar[2] = max(bar[2], self.price)
+        bar[3] = min(bar[3], self.price)
+        bar[4] = self.price
+        bar[5] += self.rng.random()
+
+    def ohlcv_update(self) -> List[list]:
+        """Like ccxt.pro: final versions of bars completed since the last call, then the live one."""
+        if self.bar[0] not in self.bar_opened:
+            self.bar_opened[self.bar[0]] = time.perf_counter()
+        out = []
+        for c in reversed(self.candles if self.ohlcv_from is not None else []):
+            if c[0] < self.ohlcv_from:
+                break
+            out.append(list(c))
+        out.reverse()
+        out.append(list(self.bar))
+        self.ohlcv_from = self.bar[0]
+        return out
+
+    def resubscribe(self):
+        """Stream dropped: like a fresh ccxt.pro subscription, the next update only has the live bar."""
+        self.ohlcv_from = None
+
+
+class FakeExchange:
+    id = 'fake'
+
+    def __init__(self, symbols: List[str] = None, base_timeframe: str = '15m',
+                 ticker_rate: float = 1000.0, ohlcv_rate: float = 100.0, time_scale: float = 1.0,
+                 start_price: float = 60000.0, volatility: float = 0.003, spread: float = 1.0,
+                 history_bars: int = 2500, start_ms: int = None,
+                 burst_every: float = 0.0, burst_size: int = 0,
+                 disconnect_every: float = 0.0, disconnect_for: float = 1.0,
+                 gap_every: float = 0.0, gap_bars: int = 3, seed: Optional[int] = None):
+        self.symbols = symbols or ['BTC/USDT']
+        self.base_timeframe = base_timeframe
+        self.step = timeframe_to_ms(base_timeframe)
+        self.rates = {'ticker': ticker_rate, 'ohlcv': ohlcv_rate}
+        self.time_scale = time_scale
+        self.spread = spread
+        self.burst_every = burst_every
+        self.burst_size = burst_size
+        self.disconnect_every = disconnect_every
+        self.disconnect_for = disconnect_for
+        self.gap_every = gap_every
+        self.gap_ms = gap_bars * self.step
+        rng = random.Random(seed)
+
+        now = time.time() * 1000 if start_ms is None else start_ms
+        self.start_ms = int(now - now % self.step)
+        self.markets: Dict[str, _Market] = {
+            symbol: _Market(rng, self.step, self.start_ms, volatility, history_bars, start_price * rng.uniform(0.5, 1.5))
+            for symbol in self.symbols
+        }
+        self.bar_opened = {symbol: market.bar_opened for symbol, market in self.markets.items()}
+        self._offset_ms = 0  # Market time skipped by gaps
+        self._t0 = None      # Wall clock (perf_counter) at the first live call
+        self._round_robin = {stream: 0 for stream in self.rates}
+
+        # Pacing / fault injection state
+        self._due = {stream: 0.0 for stream in self.rates}
+        self._burst_left = {stream: 0 for stream in self.rates}
+        self._next_burst = {stream: 0.0 for stream in self.rates}
+        self._next_disconnect = 0.0
+        self._down_until = 0.0
+        self._dropped = set()  # Streams that have not seen the last disconnect yet
+        self._next_gap = 0.0
+
+        self.sent = {stream: 0 for stream in self.rates}
+        self.disconnects = 0
+        self.gaps = 0
+        self.closed = False
+
+    def market_ms(self) -> int:
+        """Current market time (ms), `time_scale` x the wall clock since the first live call."""
+        if self._t0 is None:
+            self._t0 = time.perf_counter()
+        return self.start_ms + int((time.perf_counter() - self._t0) * 1000 * self.time_scale) + self._offset_ms
+
+    def _market(self, symbol: str) -> _Market:
+        market = self.markets.get(symbol)
+        if market is None:
+            raise ValueError(f"FakeExchange has no market {symbol}")
+        market.tick(self.market_ms())
+        return market
+
+    def _next(self, stream: str, items: list):
+        """Round-robin pick for the multiplexed streams."""
+        i = self._round_robin[stream] = (self._round_robin[stream] + 1) % len(items)
+        return items[i]
+
+    # --- Pacing and fault injection ---
+
+    def _check_connection(self, stream: str = None):
+        now = time.perf_counter()
+        if self.disconnect_every:
+            if not self._next_disconnect:
+                self._next_disconnect = now + self.disconnect_every
+            elif now >= self._next_disconnect:
+                self._down_until = now + self.disconnect_for
+                self._next_disconnect = now + self.disconnect_every
+                self._dropped = set(self.rates)
+                self.disconnects += 1
+                for market in self.markets.values():
+                    market.resubscribe()
+        # A dropped socket fails the pending watch call even if the outage is over by then
+        if now < self._down_until or stream in self._dropped:
+            self._dropped.discard(stream)
+            raise FakeNetworkError("Fake exchange disconnected")
+
+        if self.gap_every:
+            if not self._next_gap:
+                self._next_gap = now + self.gap_every
+            elif now >= self._next_gap:
+                self._offset_ms += self.gap_ms
+                self._next_gap = now + self.gap_every
+                self.gaps += 1
+                for market in self.markets.values():
+                    market.resubscribe()
+
+    async def _pace(self, stream: str):
+        self._check_connection(stream)
+        now = time.perf_counter()
+
+        if self.burst_every:
+            if not self._next_burst[stream]:
+                self._next_burst[stream] = now + self.burst_every
+            elif now >= self._next_burst[stream]:
+                self._burst_left[stream] = self.burst_size
+                self._next_burst[stream] = now + self.burst_every
+        if self._burst_left[stream] > 0:
+            self._burst_left[stream] -= 1
+            self._due[stream] = now
+            await asyncio.sleep(0)
+        else:
+            # Fixed-rate schedule; a backlog older than 1s is dropped instead of flooded
+            due = max(self._due[stream], now - 1.0) + 1.0 / self.rates[stream]
+            self._due[stream] = due
+            await asyncio.sleep(max(due - now, 0))
+        # The connection may have dropped while this call was waiting
+        self._check_connection(stream)
+
+    # --- ccxt.pro API ---
+
+    def _ticker(self, symbol: str) -> dict:
+        market = self._market(symbol)
+        self.sent['ticker'] += 1
+        price = market.price
+        return {
+            'symbol': symbol, 'timestamp': market.last_ms, 'last': price, 'close': price,
+            'bid': price - self.spread / 2, 'ask': price + self.spread / 2,
+            'info': {'sent': time.perf_counter()},
+        }
+
+    def _ohlcv(self, symbol: str, timeframe: str) -> List[list]:
+        if timeframe_to_ms(timeframe) != self.step:
+            raise ValueError(f"FakeExchange only streams {self.base_timeframe}")
+        market = self._market(symbol)
+        self.sent['ohlcv'] += 1
+        return market.ohlcv_update()
+
+    async def watch_ticker(self, symbol: str, params={}) -> dict:
+        await self._pace('ticker')
+        return self._ticker(symbol)
+
+    async def watch_tickers(self, symbols: List[str] = None, params={}) -> Dict[str, dict]:
+        await self._pace('ticker')
+        symbol = self._next('ticker', symbols or self.symbols)
+        return {symbol: self._ticker(symbol)}
+
+    async def watch_ohlcv(self, symbol: str, timeframe: str = '1m', since=None, limit=None, params={}) -> List[list]:
+        await self._pace('ohlcv')
+        return self._ohlcv(symbol, timeframe)
+
+    async def watch_ohlcv_for_symbols(self, symbols_and_timeframes: List[list], since=None, limit=None,
+                                      params={}) -> Dict[str, Dict[str, List[list]]]:
+        await self._pace('ohlcv')
+        symbol, timeframe = self._next('ohlcv', symbols_and_timeframes)
+        return {symbol: {timeframe: self._ohlcv(symbol, timeframe)}}
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int = None,
+                          limit: int = None, params={}) -> List[list]:
+        self._check_connection()
+        market = self._market(symbol)
+        step = timeframe_to_ms(timeframe)
+        if step % self.step:
+            raise ValueError(f"Cannot build {timeframe} from {self.base_timeframe}")
+
+        rows: List[list] = []
+        for c in market.candles + [market.bar]:
+            ts = c[0] - c[0] % step
+            if rows and rows[-1][0] == ts:
+                agg = rows[-1]
+                agg[2], agg[3], agg[4], agg[5] = max(agg[2], c[2]), min(agg[3], c[3]), c[4], agg[5] + c[5]
+            else:
+                rows.append([ts, c[1], c[2], c[3], c[4], c[5]])
+
+        if since is not None:
+            rows = [r for r in rows if r[0] >= since]
+            return rows[:limit] if limit else rows
+        return rows[-limit:] if limit else rows
+
+    async def close(self):
+        self.closed = True
@@ -2,24 +2,27 @@ import ccxt
 import pandas as pd
 from config import settings
 from utils.logger import logger
+from data.candle_store import CandleStore
 import structlog
 import asyncio
 
 log = structlog.get_logger()
 
 class HistoricalFetcher:
-    def __init__(self, exchange_id='binance', symbol='BTC/USDT'):
+    def __init__(self, exchange_id='binance', symbol='BTC/USDT', store: CandleStore = None, exchange=None):
         self.exchange_id = exchange_id
         self.symbol = symbol
+        self.store = store or CandleStore()
         # CCXT standard (blocking). We'll run it in executor or use async ccxt if preferred for consistency.
         # But this is "initial load", blocking is fine or use async. Since everything is async, let's use async ccxt.
-        self.exchange = getattr(ccxt.pro, exchange_id)({'enableRateLimit': True})
+        self.exchange = exchange or getattr(ccxt.pro, exchange_id)({'enableRateLimit': True})
 
-    async def fetch_ohlcv(self, timeframe='1h', limit=1000) -> pd.DataFrame:
-        """Fetch historical OHLCV data."""
+    async def fetch_ohlcv(self, timeframe='1h', limit=1000, symbol: str = None) -> pd.DataFrame:
+        """Fetch historical OHLCV data (for `symbol`, default: this fetcher's symbol)."""
+        symbol = symbol or self.symbol
         try:
-            log.info("Fetching historical data", symbol=self.symbol, timeframe=timeframe, limit=limit)
-            ohlcv = await self.exchange.fetch_ohlcv(self.symbol, timeframe, limit=limit)
+            log.info("Fetching historical data", symbol=symbol, timeframe=timeframe, limit=limit)
+            ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
             df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             df.set_index('timestamp', inplace=True)
@@ -28,5 +31,13 @@ class HistoricalFetcher:
             log.error("Error fetching historical data", error=str(e))
             return pd.DataFrame()
 
+    async def fetch_history(self, timeframe: str, since: int) -> pd.DataFrame:
+        """Closed candles since `since` (ms) from the local store, syncing only the missing tail."""
+        try:
+            await self.store.async_sync(self.exchange, self.symbol, timeframe, since)
+        except Exception as e:
+            log.warning("Candle sync failed, using local data", error=str(e))
+        return self.store.load(self.symbol, timeframe, start=since)
+
     async def close(self):
         await self.exchange.close()
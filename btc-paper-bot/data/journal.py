@@ -0,0 +1,239 @@
+"""
+Append-only binary journal of the live event stream.
+
+Every ticker and OHLCV message received by WebSocketFetcher can be recorded
+with its receive timestamp, plus the REST history the bot started from, the
+stream reconnects and the candles backfilled for stream gaps, so a session
+can be replayed deterministically through Bot / PaperEngine (see replay.py).
+
+Record layout (little endian). Every record starts with
+    kind: uint8, recv_ts: float64 (unix seconds)
+followed by
+    STRING   id: uint16, len: uint16, utf-8 bytes      (symbol / timeframe names)
+    TICKER   symbol_id: uint16, ts: int64, last, bid, ask: float64
+    OHLCV    symbol_id, timeframe_id: uint16, count: uint32, count x (ts: int64, o, h, l, c, v: float64)
+    HISTORY  same as OHLCV; candles the bot was seeded with at startup
+    RECONNECT symbol_id (0xFFFF: all symbols), timeframe_id: uint16
+    GAP      symbol_id, timeframe_id: uint16, start, end: int64, count: uint32, count x candle
+             (a stream gap [start, end] and the candles the bot backfilled for it)
+
+A partial record at the end (crash mid-write) is skipped by read_journal and
+cut off when a JournalWriter reopens the file.
+"""
+import os
+import struct
+import time
+from collections import defaultdict, deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+log = structlog.get_logger()
+
+STRING, TICKER, OHLCV, HISTORY, RECONNECT, GAP = 0, 1, 2, 3, 4, 5
+ALL_SYMBOLS = 0xFFFF  # RECONNECT symbol_id of a multiplexed stream
+
+_HEAD = struct.Struct('<Bd')
+_STRING = struct.Struct('<HH')
+_TICKER = struct.Struct('<Hqddd')
+_CANDLES = struct.Struct('<HHI')
+_CANDLE = struct.Struct('<qddddd')
+_MARKER = struct.Struct('<HH')
+_GAP = struct.Struct('<HHqqI')
+
+_NAN = float('nan')
+
+
+def _num(value) -> float:
+    return _NAN if value is None else float(value)
+
+
+class JournalWriter:
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        if os.path.exists(path):
+            # A crash mid-write leaves a partial record: cut it, or every later session is unreadable
+            end = complete_length(path)
+            if end < os.path.getsize(path):
+                log.warning("Journal ends with a partial record, truncated", path=path, size=end)
+                os.truncate(path, end)
+        self._file = open(path, 'ab', buffering=1 << 16)
+        self._ids: Dict[str, int] = {}  # Names are (re)defined at the start of every writer session
+        self._flushed_at = time.monotonic()
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        if time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def _id(self, name: str, recv_ts: float) -> int:
+        if name not in self._ids:
+            self._ids[name] = len(self._ids)
+            raw = name.encode('utf-8')
+            self._file.write(_HEAD.pack(STRING, recv_ts) + _STRING.pack(self._ids[name], len(raw)) + raw)
+        return self._ids[name]
+
+    def record_ticker(self, symbol: str, ticker: dict, recv_ts: float = None):
+        recv_ts = time.time() if recv_ts is None else recv_ts
+        sid = self._id(symbol, recv_ts)
+        self._write(_HEAD.pack(TICKER, recv_ts) + _TICKER.pack(
+            sid, int(ticker.get('timestamp') or 0),
+            _num(ticker.get('last')), _num(ticker.get('bid')), _num(ticker.get('ask'))
+        ))
+
+    def _record_candles(self, kind: int, symbol: str, timeframe: str, candles, recv_ts: float = None):
+        recv_ts = time.time() if recv_ts is None else recv_ts
+        sid, tid = self._id(symbol, recv_ts), self._id(timeframe, recv_ts)
+        parts = [_HEAD.pack(kind, recv_ts), _CANDLES.pack(sid, tid, len(candles))]
+        parts.extend(_CANDLE.pack(int(c[0]), *(float(v) for v in c[1:6])) for c in candles)
+        self._write(b''.join(parts))
+
+    def record_ohlcv(self, symbol: str, timeframe: str, candles, recv_ts: float = None):
+        self._record_candles(OHLCV, symbol, timeframe, candles, recv_ts)
+
+    def record_history(self, symbol: str, timeframe: str, candles, recv_ts: float = None):
+        self._record_candles(HISTORY, symbol, timeframe, candles, recv_ts)
+
+    def record_reconnect(self, symbol: Optional[str], timeframe: str, recv_ts: float = None):
+        """Stream came back after an error; symbol None: every symbol of a multiplexed stream."""
+        recv_ts = time.time() if recv_ts is None else recv_ts
+        sid = ALL_SYMBOLS if symbol is None else self._id(symbol, recv_ts)
+        self._write(_HEAD.pack(RECONNECT, recv_ts) + _MARKER.pack(sid, self._id(timeframe, recv_ts)))
+
+    def record_gap(self, symbol: str, timeframe: str, start: int, end: int, candles, recv_ts: float = None):
+        """Stream gap [start, end] (ms) and the candles backfilled for it (possibly none)."""
+        recv_ts = time.time() if recv_ts is None else recv_ts
+        sid, tid = self._id(symbol, recv_ts), self._id(timeframe, recv_ts)
+        parts = [_HEAD.pack(GAP, recv_ts), _GAP.pack(sid, tid, int(start), int(end), len(candles))]
+        parts.extend(_CANDLE.pack(int(c[0]), *(float(v) for v in c[1:6])) for c in candles)
+        self._write(b''.join(parts))
+
+    def flush(self):
+        self._file.flush()
+        self._flushed_at = time.monotonic()
+
+    def close(self):
+        self._file.close()
+
+
+def _read_exact(f, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) < size:
+        raise EOFError
+    return data
+
+
+def _read_record(f):
+    """
+    (kind, recv_ts, fixed fields, variable-length bytes) of the next record,
+    None at the end of the file; EOFError if the record is cut off.
+    """
+    head = f.read(_HEAD.size)
+    if not head:
+        return None
+    if len(head) < _HEAD.size:
+        raise EOFError
+    kind, recv_ts = _HEAD.unpack(head)
+    if kind == STRING:
+        fields = _STRING.unpack(_read_exact(f, _STRING.size))
+        return kind, recv_ts, fields, _read_exact(f, fields[1])
+    if kind == TICKER:
+        return kind, recv_ts, _TICKER.unpack(_read_exact(f, _TICKER.size)), b''
+    if kind in (OHLCV, HISTORY):
+        fields = _CANDLES.unpack(_read_exact(f, _CANDLES.size))
+        return kind, recv_ts, fields, _read_exact(f, fields[2] * _CANDLE.size)
+    if kind == RECONNECT:
+        return kind, recv_ts, _MARKER.unpack(_read_exact(f, _MARKER.size)), b''
+    if kind == GAP:
+        fields = _GAP.unpack(_read_exact(f, _GAP.size))
+        return kind, recv_ts, fields, _read_exact(f, fields[4] * _CANDLE.size)
+    raise ValueError(f"Corrupt journal at byte {f.tell() - _HEAD.size}")
+
+
+def complete_length(path: str) -> int:
+    """Byte length of the journal up to the end of its last complete record."""
+    with open(path, 'rb') as f:
+        end = 0
+        try:
+            while _read_record(f) is not None:
+                end = f.tell()
+        except EOFError:
+            pass
+        return end
+
+
+def read_journal(path: str) -> Iterator[Tuple[float, dict]]:
+    """
+    Yields (recv_ts, item) in file order. Items have the same shape as the
+    queue messages WebSocketFetcher produces; HISTORY records use type 'history',
+    GAP records type 'gap' ({'symbol', 'timeframe', 'start', 'end', 'data'}).
+    A record cut off at the end of the file (crash mid-write) ends the replay
+    with a warning.
+    """
+    names: Dict[int, str] = {}
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                record = _read_record(f)
+            except EOFError:
+                log.warning("Journal ends with a partial record, ignored", path=path)
+                return
+            if record is None:
+                return
+            kind, recv_ts, fields, data = record
+
+            if kind == STRING:
+                names[fields[0]] = data.decode('utf-8')
+
+            elif kind == TICKER:
+                sid, ts, last, bid, ask = fields
+                symbol = names[sid]
+                yield recv_ts, {'type': 'ticker', 'symbol': symbol, 'data': {
+                    'symbol': symbol, 'timestamp': ts, 'last': last, 'bid': bid, 'ask': ask,
+                }}
+
+            elif kind == RECONNECT:
+                sid, tid = fields
+                yield recv_ts, {'type': 'reconnect', 'symbol': None if sid == ALL_SYMBOLS else names[sid],
+                                'timeframe': names[tid]}
+
+            elif kind == GAP:
+                sid, tid, start, end, _ = fields
+                yield recv_ts, {
+                    'type': 'gap', 'symbol': names[sid], 'timeframe': names[tid], 'start': start, 'end': end,
+                    'data': [list(c) for c in _CANDLE.iter_unpack(data)],
+                }
+
+            else:
+                sid, tid, _ = fields
+                yield recv_ts, {
+                    'type': 'ohlcv' if kind == OHLCV else 'history',
+                    'symbol': names[sid], 'timeframe': names[tid],
+                    'data': [list(c) for c in _CANDLE.iter_unpack(data)],
+                }
+
+
+class JournalBackfiller:
+    """
+    GapBackfiller stand-in for replays: serves each gap the recorded session
+    backfilled with the candles it got then (none for gaps it never fetched).
+    """
+
+    def __init__(self, path: str):
+        self._gaps: Dict[tuple, deque] = defaultdict(deque)
+        for _, item in read_journal(path):
+            if item['type'] == 'gap':
+                key = (item['symbol'], item['timeframe'], item['start'], item['end'])
+                self._gaps[key].append(item['data'])
+
+    async def fetch(self, symbol: str, timeframe: str, start: int, end: int) -> List[list]:
+        recorded = self._gaps.get((symbol, timeframe, start, end))
+        if not recorded:
+            log.warning("Gap not backfilled in the journal", symbol=symbol, timeframe=timeframe, start=start, end=end)
+            return []
+        return recorded.popleft()
+
+
+def open_journal(path: Optional[str]) -> Optional[JournalWriter]:
+    return JournalWriter(path) if path else None
@@ -0,0 +1,129 @@
+"""
+Per-symbol market state of the live bot.
+
+Every traded pair owns its ring buffers, bar-close tracker and resampler;
+Bot routes (symbol, timeframe, candle) events here, so adding pairs costs a
+few hundred KB of preallocated buffers and no extra tasks.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from data.bar_events import BarCloseTracker, BarClose
+from data.resampler import StreamingResampler
+from data.ring_buffer import CandleRingBuffer
+
+
+class SymbolState:
+    def __init__(self, symbol: str, timeframes: Iterable[str], base_timeframe: str,
+                 capacity: int = 500, grace_ms: int = 2000):
+        self.symbol = symbol
+        self.base_timeframe = base_timeframe
+
+        # Data Buffers (fixed-capacity, preallocated per timeframe)
+        self.buffers = {tf: CandleRingBuffer(capacity) for tf in timeframes}
+        self.bar_events = BarCloseTracker(self.buffers.keys(), grace_ms=grace_ms)
+
+        # Higher timeframes are built locally from the single base subscription
+        self.resampler = StreamingResampler(base_timeframe, [tf for tf in self.buffers if tf != base_timeframe])
+
+        # Gap detection (see gap_before): newest real candle per timeframe (timer placeholders
+        # excluded) and the timeframes whose stream reconnected since their last candle
+        self.last_real: Dict[str, int] = {}
+        self.reconnected = set()
+
+    def snapshot(self) -> dict:
+        """Plain-data copy of the buffers, bar tracker and resampler (warm-start snapshot)."""
+        return {
+            'base_timeframe': self.base_timeframe,
+            'buffers': {tf: buffer.snapshot() for tf, buffer in self.buffers.items()},
+            'bar_events': self.bar_events.snapshot(),
+            'resampler': self.resampler.snapshot(),
+            'last_real': dict(self.last_real),
+        }
+
+    def restore(self, snap: dict) -> bool:
+        """
+        Load a snapshot(); returns False (state left as is) if it was taken with other timeframes or
+        buffer capacities. Stream reconnects are not carried over.
+        """
+        buffers = snap.get('buffers', {})
+        if (snap.get('base_timeframe') != self.base_timeframe or list(buffers) != list(self.buffers)
+                or any(buffers[tf]['capacity'] != buffer.capacity for tf, buffer in self.buffers.items())):
+            return False
+        for tf, buffer in self.buffers.items():
+            buffer.restore(buffers[tf])
+        self.bar_events.restore(snap['bar_events'])
+        self.resampler.restore(snap['resampler'])
+        self.last_real = {tf: int(ts) for tf, ts in snap['last_real'].items()}
+        self.reconnected.clear()
+        return True
+
+    def seed_history(self, timeframe: str, candles):
+        """Load startup history ([ts, o, h, l, c, v] rows) for one timeframe."""
+        buffer = self.buffers.get(timeframe)
+        if buffer is not None:
+            buffer.extend(candles)
+            self.bar_events.seed(timeframe, buffer.last_timestamp)
+            self.last_real[timeframe] = buffer.last_timestamp
+        if timeframe == self.base_timeframe:
+            self.resampler.seed(candles)
+
+    def mark_stale(self):
+        """
+        Restored from a snapshot without the candles since: the buffered bars closed long ago, so the
+        timer must not evaluate them. The first streamed candle is backfilled up to via gap_before().
+        """
+        for tf in self.buffers:
+            self.bar_events.last_closed[tf] = self.bar_events.last_ts[tf]
+
+    def gap_before(self, timeframe: str, ts: int) -> Optional[Tuple[int, int]]:
+        """
+        Missing (start, end) bar range before a streamed candle at `ts`, or None.
+        Whole bars are missing when ts skips past the next real bar (bars the timer opened during an
+        outage are only placeholders). After a reconnect, the bar that was developing when the
+        stream dropped is refetched as well, since its final update may be lost.
+        """
+        buffer = self.buffers.get(timeframe)
+        reconnected = timeframe in self.reconnected
+        self.reconnected.discard(timeframe)
+        last = self.last_real.get(timeframe)
+        if buffer is None or not last:
+            return None
+        step = self.bar_events.step[timeframe]
+        if ts > last + step:
+            start = last
+        elif reconnected and ts > last:
+            start = last
+        else:
+            return None
+        end = ts - step
+        # Older bars would fall out of the buffer anyway
+        return max(start, end - (buffer.capacity - 1) * step), end
+
+    def ingest(self, timeframe: str, candle) -> List[BarClose]:
+        """Upsert a candle (and everything derived from it) into the buffers."""
+        self.last_real[timeframe] = max(self.last_real.get(timeframe, 0), int(candle[0]))
+        updates = [(timeframe, candle)]
+        if timeframe == self.base_timeframe:
+            updates += self.resampler.update(candle)
+
+        events = []
+        for tf, c in updates:
+            buffer = self.buffers.get(tf)
+            if buffer is None:
+                continue
+            buffer.upsert(c)
+            event = self.bar_events.on_candle(tf, int(c[0]))
+            if event:
+                events.append(event)
+        return events
+
+    def open_next_bar(self, event: BarClose):
+        """
+        Timer-detected close: start the next bar with a flat placeholder candle so the
+        closed bar sits at iloc[-2] like after a rollover. The first real update overwrites it.
+        """
+        buffer = self.buffers[event.timeframe]
+        if buffer.last_timestamp == event.timestamp:
+            last_close = float(buffer.column('close')[-1])
+            buffer.upsert([event.end, last_close, last_close, last_close, last_close, 0.0])
+            self.bar_events.on_candle(event.timeframe, event.end)
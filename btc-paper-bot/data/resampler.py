@@ -0,0 +1,104 @@
+"""
+Streaming OHLCV resampler.
+
+Builds higher-timeframe candles (15m / 1h / 4h ...) from a single base
+timeframe stream, so only one websocket subscription is needed and every
+timeframe advances in the same event. Buckets are aligned to the Unix epoch
+(UTC), which matches Binance kline boundaries.
+
+Per target timeframe the resampler keeps the aggregate of the base bars that
+are already final plus the developing base bar, so each update is O(1).
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.helpers import timeframe_to_ms
+
+
+def _merge(agg: Optional[list], candle) -> list:
+    """Fold a [ts, o, h, l, c, v] base candle into an [o, h, l, c, v] aggregate."""
+    if agg is None:
+        return [candle[1], candle[2], candle[3], candle[4], candle[5]]
+    return [agg[0], max(agg[1], candle[2]), min(agg[2], candle[3]), candle[4], agg[4] + candle[5]]
+
+
+class _Bucket:
+    __slots__ = ('start', 'members', 'closed', 'dev')
+
+    def __init__(self, start: int):
+        self.start = start
+        self.members: Dict[int, list] = {}  # base ts -> candle (for rare out-of-order revisions)
+        self.closed: Optional[list] = None  # Aggregate of base bars before `dev`
+        self.dev: Optional[list] = None     # Developing base bar
+
+    def update(self, candle) -> None:
+        ts = candle[0]
+        self.members[ts] = candle
+        if self.dev is None or ts == self.dev[0]:
+            self.dev = candle
+        elif ts > self.dev[0]:
+            self.closed = _merge(self.closed, self.dev)
+            self.dev = candle
+        else:
+            # Revision of an older base bar inside this bucket: rebuild the closed part
+            self.closed = None
+            for member_ts in sorted(self.members):
+                if member_ts < self.dev[0]:
+                    self.closed = _merge(self.closed, self.members[member_ts])
+
+    def candle(self) -> list:
+        agg = _merge(self.closed, self.dev)
+        return [self.start] + agg
+
+
+class StreamingResampler:
+    def __init__(self, base_timeframe: str, targets: Iterable[str]):
+        self.base_timeframe = base_timeframe
+        base_step = timeframe_to_ms(base_timeframe)
+        self.steps: Dict[str, int] = {}
+        for tf in targets:
+            step = timeframe_to_ms(tf)
+            if step <= base_step or step % base_step:
+                raise ValueError(f"Cannot derive {tf} from {base_timeframe}")
+            self.steps[tf] = step
+        self._buckets: Dict[str, Optional[_Bucket]] = {tf: None for tf in self.steps}
+
+    def update(self, candle) -> List[Tuple[str, list]]:
+        """Feed one base candle; returns the updated (timeframe, candle) of every target."""
+        candle = [int(candle[0])] + [float(v) for v in candle[1:6]]
+        out = []
+        for tf, step in self.steps.items():
+            start = candle[0] - candle[0] % step
+            bucket = self._buckets[tf]
+            if bucket is None or start > bucket.start:
+                bucket = self._buckets[tf] = _Bucket(start)
+            elif start < bucket.start:
+                continue  # Base bar from an already finished bucket
+            bucket.update(candle)
+            out.append((tf, bucket.candle()))
+        return out
+
+    def snapshot(self) -> Dict[str, Optional[list]]:
+        """Base candles of every developing bucket, oldest first (None: no bucket yet)."""
+        return {tf: [bucket.members[ts] for ts in sorted(bucket.members)] if bucket else None
+                for tf, bucket in self._buckets.items()}
+
+    def restore(self, snap: Dict[str, Optional[list]]) -> None:
+        """Rebuild the buckets of snapshot() by replaying their base candles in order."""
+        for tf, step in self.steps.items():
+            members = snap.get(tf)
+            if not members:
+                self._buckets[tf] = None
+                continue
+            bucket = self._buckets[tf] = _Bucket(int(members[0][0]) - int(members[0][0]) % step)
+            for candle in members:
+                bucket.update([int(candle[0])] + [float(v) for v in candle[1:6]])
+
+    def seed(self, candles) -> None:
+        """Replay base history so the developing buckets start complete."""
+        if not len(candles) or not self.steps:
+            return
+        last_ts = int(candles[-1][0])
+        first_needed = last_ts - last_ts % max(self.steps.values())
+        for candle in candles:
+            if candle[0] >= first_needed:
+                self.update(candle)
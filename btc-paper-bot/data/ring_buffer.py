@@ -0,0 +1,114 @@
+"""
+Fixed-capacity OHLCV ring buffer.
+
+Rows live in preallocated NumPy arrays (int64 ms timestamps + float64 OHLCV).
+Every row is written twice, at slot i and i + capacity, so the latest N rows
+are always one contiguous slice: views are zero-copy and memory stays flat.
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class CandleRingBuffer:
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._data = np.zeros((len(OHLCV_COLUMNS), 2 * capacity), dtype=np.float64)
+        self._count = 0   # Rows ever appended
+        self._slot = -1   # Slot of the newest row
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def last_timestamp(self) -> int:
+        """Timestamp (ms) of the newest row, 0 if empty."""
+        return int(self._ts[self._slot]) if self._count else 0
+
+    def _bounds(self):
+        hi = self._slot + 1 + self.capacity
+        return hi - len(self), hi
+
+    def _write(self, slot: int, candle):
+        for s in (slot, slot + self.capacity):
+            self._ts[s] = candle[0]
+            self._data[:, s] = candle[1:6]
+
+    def upsert(self, candle) -> bool:
+        """
+        Insert or update a [ts, o, h, l, c, v] candle.
+        O(1) for the newest candle, O(log n) for revisions of older rows.
+        Returns False if the candle is older than the buffer window.
+        """
+        ts = int(candle[0])
+        last = self.last_timestamp
+
+        if self._count and ts == last:
+            self._write(self._slot, candle)
+        elif not self._count or ts > last:
+            self._slot = (self._slot + 1) % self.capacity
+            self._count += 1
+            self._write(self._slot, candle)
+        else:
+            lo, hi = self._bounds()
+            pos = lo + int(np.searchsorted(self._ts[lo:hi], ts))
+            if pos >= hi or self._ts[pos] != ts:
+                return False
+            self._write(pos % self.capacity, candle)
+        return True
+
+    def extend(self, candles) -> None:
+        for candle in candles:
+            self.upsert(candle)
+
+    def load_frame(self, df: pd.DataFrame) -> None:
+        """Seed from a HistoricalFetcher-style DataFrame (datetime index)."""
+        if df.empty:
+            return
+        ts = df.index.values.astype('datetime64[ms]').astype(np.int64)
+        rows = np.column_stack([ts, df[list(OHLCV_COLUMNS)].to_numpy(dtype=np.float64)])
+        self.extend(rows)
+
+    # --- Zero-copy views ---
+
+    def timestamps(self) -> np.ndarray:
+        lo, hi = self._bounds()
+        return self._ts[lo:hi]
+
+    def column(self, name: str) -> np.ndarray:
+        lo, hi = self._bounds()
+        return self._data[OHLCV_COLUMNS.index(name), lo:hi]
+
+    def view(self) -> Dict[str, np.ndarray]:
+        lo, hi = self._bounds()
+        cols = {name: self._data[i, lo:hi] for i, name in enumerate(OHLCV_COLUMNS)}
+        cols['timestamp'] = self._ts[lo:hi]
+        return cols
+
+    def rows(self) -> np.ndarray:
+        """Copy of the buffered candles as [ts, o, h, l, c, v] rows, oldest first."""
+        lo, hi = self._bounds()
+        return np.column_stack([self._ts[lo:hi], self._data[:, lo:hi].T])
+
+    # --- Warm-start snapshot (plain arrays, independent of the buffer layout) ---
+
+    def snapshot(self) -> dict:
+        lo, hi = self._bounds()
+        return {'capacity': self.capacity, 'timestamps': self._ts[lo:hi].copy(), 'ohlcv': self._data[:, lo:hi].T.copy()}
+
+    def restore(self, snap: dict) -> None:
+        """Refill from snapshot(); rows beyond this buffer's capacity drop out oldest first."""
+        self._count = 0
+        self._slot = -1
+        for ts, row in zip(snap['timestamps'], snap['ohlcv']):
+            self.upsert([int(ts), *row])
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame over the buffer (values are not copied)."""
+        lo, hi = self._bounds()
+        index = pd.DatetimeIndex(self._ts[lo:hi].view('datetime64[ms]'), name='timestamp')
+        return pd.DataFrame(self._data[:, lo:hi].T, index=index, columns=list(OHLCV_COLUMNS), copy=False)
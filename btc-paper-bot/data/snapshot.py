@@ -0,0 +1,62 @@
+"""
+Warm-start snapshot of the live bot.
+
+Per symbol the SymbolState (ring buffers, bar tracker, resampler) and the
+strategy's streaming indicator state are saved into one file. Bot writes
+it periodically and on shutdown; at startup it is restored and only the
+candles since the snapshot are fetched, so slow indicators (EMA200 on 1h)
+keep their converged state across restarts.
+
+The payload holds plain data only (dicts, lists, scalars and NumPy arrays from
+SymbolState.snapshot() / DayTradingStrategy.snapshot()), never class
+instances, so refactoring those classes does not break old snapshots; each
+restore() checks that the data fits the current settings. Bot copies the
+payload between events and writes it in a worker thread (save_snapshot
+blocks on pickling and disk I/O).
+
+Snapshots are a cache: a missing, unreadable or outdated file just means a
+cold start.
+"""
+import os
+import pickle
+import time
+from typing import Dict, Optional
+
+import structlog
+
+log = structlog.get_logger()
+
+SNAPSHOT_VERSION = 2  # 2: plain-data states instead of pickled SymbolState objects
+
+
+def save_snapshot(path: str, states: Dict[str, dict], strategies: Dict[str, dict]) -> None:
+    """Write {symbol: SymbolState.snapshot()} and {symbol: strategy snapshot} atomically (blocking)."""
+    payload = {
+        'version': SNAPSHOT_VERSION,
+        'saved_at': int(time.time() * 1000),
+        'states': states,
+        'strategies': strategies,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)  # A crash mid-write leaves the previous snapshot intact
+
+
+def load_snapshot(path: str) -> Optional[dict]:
+    """The saved payload, or None if there is no usable snapshot."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        log.warning("Unreadable snapshot, cold start", path=path, error=str(e))
+        return None
+    if not isinstance(payload, dict) or payload.get('version') != SNAPSHOT_VERSION:
+        log.warning("Outdated snapshot, cold start", path=path)
+        return None
+    return payload
@@ -1,32 +1,49 @@
 import ccxt.pro as ccxt
 import asyncio
+from typing import List
 from config import settings
 from utils.logger import logger
+from data.journal import JournalWriter
 import structlog
 
 log = structlog.get_logger()
 
 class WebSocketFetcher:
-    def __init__(self, exchange_id='binance', symbol='BTC/USDT'):
+    def __init__(self, exchange_id='binance', symbol='BTC/USDT', journal: JournalWriter = None, exchange=None,
+                 symbols: List[str] = None):
         self.exchange_id = exchange_id
         self.symbol = symbol
-        self.exchange = getattr(ccxt, exchange_id)({'enableRateLimit': True})
+        self.symbols = symbols or [symbol]  # Streamed by the multiplexed stream_*_multi methods
+        self.journal = journal  # Optional recorder of every received message
+        # Any ccxt.pro-compatible object can be injected (e.g. data.fake_exchange.FakeExchange)
+        self.exchange = exchange or getattr(ccxt, exchange_id)({'enableRateLimit': True})
         self.keep_running = True
 
     async def stream_ohlcv(self, timeframe='1m', queue: asyncio.Queue = None):
         """Streams OHLCV data to a queue."""
         log.info("Starting OHLCV stream", symbol=self.symbol, timeframe=timeframe)
         backoff = 1
+        reconnecting = False
         while self.keep_running:
             try:
                 # watch_ohlcv yields a list of candles. We usually want the latest closed one or the current building one.
                 # The strategy needs closed candles.
                 candles = await self.exchange.watch_ohlcv(self.symbol, timeframe)
+                if reconnecting:
+                    # Lets the consumer check for candles missed while the stream was down
+                    if self.journal:
+                        self.journal.record_reconnect(self.symbol, timeframe)
+                    if queue:
+                        await queue.put({'type': 'reconnect', 'symbol': self.symbol, 'timeframe': timeframe})
+                if self.journal:
+                    self.journal.record_ohlcv(self.symbol, timeframe, candles)
                 if queue:
-                    await queue.put({'type': 'ohlcv', 'data': candles, 'timeframe': timeframe})
+                    await queue.put({'type': 'ohlcv', 'symbol': self.symbol, 'data': candles, 'timeframe': timeframe})
                 backoff = 1
+                reconnecting = False
             except Exception as e:
                 log.error("Error in OHLCV stream", error=str(e))
+                reconnecting = True
                 await asyncio.sleep(backoff)
                 backoff = min(backoff * 2, 60)
 
@@ -37,14 +54,65 @@ class WebSocketFetcher:
         while self.keep_running:
             try:
                 ticker = await self.exchange.watch_ticker(self.symbol)
+                if self.journal:
+                    self.journal.record_ticker(self.symbol, ticker)
                 if queue:
-                    await queue.put({'type': 'ticker', 'data': ticker})
+                    await queue.put({'type': 'ticker', 'symbol': self.symbol, 'data': ticker})
                 backoff = 1
             except Exception as e:
                 log.error("Error in Ticker stream", error=str(e))
                 await asyncio.sleep(backoff)
                 backoff = min(backoff * 2, 60)
 
+    async def stream_ohlcv_multi(self, timeframe='1m', queue: asyncio.Queue = None):
+        """
+        OHLCV for all `symbols` from one task: ccxt.pro multiplexes the kline
+        subscriptions over shared connections and returns whichever symbol updated.
+        """
+        log.info("Starting multiplexed OHLCV stream", symbols=len(self.symbols), timeframe=timeframe)
+        subscriptions = [[symbol, timeframe] for symbol in self.symbols]
+        backoff = 1
+        reconnecting = False
+        while self.keep_running:
+            try:
+                updates = await self.exchange.watch_ohlcv_for_symbols(subscriptions)
+                if reconnecting:
+                    if self.journal:
+                        self.journal.record_reconnect(None, timeframe)
+                    if queue:
+                        await queue.put({'type': 'reconnect', 'symbol': None, 'timeframe': timeframe})  # All symbols
+                reconnecting = False
+                for symbol, by_timeframe in updates.items():
+                    for tf, candles in by_timeframe.items():
+                        if self.journal:
+                            self.journal.record_ohlcv(symbol, tf, candles)
+                        if queue:
+                            await queue.put({'type': 'ohlcv', 'symbol': symbol, 'data': candles, 'timeframe': tf})
+                backoff = 1
+            except Exception as e:
+                log.error("Error in multiplexed OHLCV stream", error=str(e))
+                reconnecting = True
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    async def stream_tickers_multi(self, queue: asyncio.Queue = None):
+        """Tickers for all `symbols` from one task (see stream_ohlcv_multi)."""
+        log.info("Starting multiplexed Ticker stream", symbols=len(self.symbols))
+        backoff = 1
+        while self.keep_running:
+            try:
+                tickers = await self.exchange.watch_tickers(self.symbols)
+                for symbol, ticker in tickers.items():
+                    if self.journal:
+                        self.journal.record_ticker(symbol, ticker)
+                    if queue:
+                        await queue.put({'type': 'ticker', 'symbol': symbol, 'data': ticker})
+                backoff = 1
+            except Exception as e:
+                log.error("Error in multiplexed Ticker stream", error=str(e))
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
     async def close(self):
         self.keep_running = False
         await self.exchange.close()
@@ -3,7 +3,7 @@ import csv
 import os
 import asyncio
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict
 from pydantic import BaseModel
 from config import settings
 from utils.logger import logger
@@ -33,25 +33,31 @@ class Position(BaseModel):
     commission: float = 0.0
 
 class PaperEngine:
-    def __init__(self):
-        self.strategy = DayTradingStrategy()
+    def __init__(self, trade_log_file: str = TRADE_LOG_FILE, balance_history_file: str = BALANCE_HISTORY_FILE,
+                 notify: bool = True, clock: Callable[[], datetime] = None):
+        # Files, notifications and clock are swappable so replays run isolated from the live state
+        self.trade_log_file = trade_log_file
+        self.balance_history_file = balance_history_file
+        self.notify = notify
+        self.clock = clock or datetime.utcnow
+        # One strategy instance (streaming indicator state) and at most one position per symbol;
+        # balance and risk budget are shared
+        self.strategies: Dict[str, DayTradingStrategy] = {}
         self.balance = settings.PAPER_TRADING_BALANCE
-        self.position: Optional[Position] = None
+        self.positions: Dict[str, Position] = {}
+        self.open_pnl: Dict[str, float] = {}
         self.load_state()
         self.lock = asyncio.Lock()
-        self.last_signal_timestamp = None
+        self.last_signal_timestamps: Dict[str, pd.Timestamp] = {}
         metrics.BALANCE.set(self.balance)
-        if self.position:
-            metrics.POSITION_SIZE.set(self.position.size)
-        else:
-            metrics.POSITION_SIZE.set(0)
+        self.update_position_metrics()
 
     def load_state(self):
         """Recover balance and open position from files."""
         # Load Balance History
-        if os.path.exists(BALANCE_HISTORY_FILE):
+        if os.path.exists(self.balance_history_file):
             try:
-                df = pd.read_csv(BALANCE_HISTORY_FILE)
+                df = pd.read_csv(self.balance_history_file)
                 if not df.empty:
                     self.balance = float(df.iloc[-1]['balance'])
                     logger.info("Restored balance", balance=self.balance)
@@ -59,27 +65,27 @@ class PaperEngine:
                 logger.error("Error loading balance history", error=str(e))
 
         # Load Trade Log to find open position
-        if os.path.exists(TRADE_LOG_FILE):
+        if os.path.exists(self.trade_log_file):
             try:
-                with open(TRADE_LOG_FILE, 'r') as f:
+                with open(self.trade_log_file, 'r') as f:
                     trades = json.load(f)
-                    if trades:
-                        last_trade = trades[-1]
-                        if last_trade['status'] == 'OPEN':
-                            self.position = Position(**last_trade)
-                            logger.info("Restored open position", position=self.position.dict())
+                    for trade in trades:
+                        if trade['status'] == 'OPEN':
+                            position = Position(**trade)
+                            self.positions[position.symbol] = position
+                            logger.info("Restored open position", position=position.dict())
             except Exception as e:
                 logger.error("Error loading trade log", error=str(e))
                 # Create empty file if corrupted
-                with open(TRADE_LOG_FILE, 'w') as f:
+                with open(self.trade_log_file, 'w') as f:
                     json.dump([], f)
 
     async def save_trade(self, position: Position):
         """Append or update trade in log."""
         trades = []
-        if os.path.exists(TRADE_LOG_FILE):
+        if os.path.exists(self.trade_log_file):
             try:
-                with open(TRADE_LOG_FILE, 'r') as f:
+                with open(self.trade_log_file, 'r') as f:
                     trades = json.load(f)
             except:
                 trades = []
@@ -94,7 +100,7 @@ class PaperEngine:
         if not found:
             trades.append(position.dict())
 
-        with open(TRADE_LOG_FILE, 'w') as f:
+        with open(self.trade_log_file, 'w') as f:
             json.dump(trades, f, indent=4)
         
         # Update balance history if closed
@@ -102,18 +108,39 @@ class PaperEngine:
             self.save_balance()
 
     def save_balance(self):
-        file_exists = os.path.exists(BALANCE_HISTORY_FILE)
-        with open(BALANCE_HISTORY_FILE, 'a', newline='') as f:
+        file_exists = os.path.exists(self.balance_history_file)
+        with open(self.balance_history_file, 'a', newline='') as f:
             writer = csv.writer(f)
             if not file_exists:
                 writer.writerow(['timestamp', 'balance'])
-            writer.writerow([datetime.utcnow().isoformat(), self.balance])
+            writer.writerow([self.clock().isoformat(), self.balance])
         metrics.BALANCE.set(self.balance)
 
-    async def process_ticker(self, ticker: dict):
+    async def send_email(self, subject: str, body: str):
+        if self.notify:
+            await notifier.send_email(subject, body)
+
+    def strategy_for(self, symbol: str) -> DayTradingStrategy:
+        strategy = self.strategies.get(symbol)
+        if strategy is None:
+            strategy = self.strategies[symbol] = DayTradingStrategy()
+        return strategy
+
+    def open_notional(self) -> float:
+        return sum(p.entry_price * p.size for p in self.positions.values())
+
+    def update_position_metrics(self):
+        metrics.POSITION_SIZE.set(sum(p.size for p in self.positions.values()))
+        metrics.OPEN_POSITIONS.set(len(self.positions))
+        metrics.OPEN_REALIZED_PNL.set(sum(self.open_pnl.values()))
+
+    async def process_ticker(self, ticker: dict, symbol: str = None):
         """Check SL/TP on price update."""
-        if not self.position or self.position.status != 'OPEN':
-            metrics.OPEN_REALIZED_PNL.set(0)
+        symbol = symbol or ticker.get('symbol') or settings.SYMBOL
+        position = self.positions.get(symbol)
+        if not position or position.status != 'OPEN':
+            if not self.positions:
+                metrics.OPEN_REALIZED_PNL.set(0)
             return
 
         async with self.lock:
@@ -123,36 +150,38 @@ class PaperEngine:
 
             # Update Metrics (PnL)
             open_pnl = 0
-            if self.position.side == 'LONG':
-                open_pnl = (current_price - self.position.entry_price) * self.position.size
+            if position.side == 'LONG':
+                open_pnl = (current_price - position.entry_price) * position.size
             else:
-                open_pnl = (self.position.entry_price - current_price) * self.position.size
-            metrics.OPEN_REALIZED_PNL.set(open_pnl)
+                open_pnl = (position.entry_price - current_price) * position.size
+            self.open_pnl[symbol] = open_pnl
+            metrics.OPEN_REALIZED_PNL.set(sum(self.open_pnl.values()))
 
             # Check SL
             hit_sl = False
             hit_tp = False
             
-            if self.position.side == 'LONG':
-                if current_price <= self.position.sl:
+            if position.side == 'LONG':
+                if current_price <= position.sl:
                     hit_sl = True
-                elif current_price >= self.position.tp:
+                elif current_price >= position.tp:
                     hit_tp = True
             else: # SHORT
-                if current_price >= self.position.sl:
+                if current_price >= position.sl:
                     hit_sl = True
-                elif current_price <= self.position.tp:
+                elif current_price <= position.tp:
                     hit_tp = True
             
             if hit_sl or hit_tp:
                 reason = "SL" if hit_sl else "TP"
-                await self.close_position(current_price, reason)
+                await self.close_position(current_price, reason, symbol=symbol)
 
-    async def close_position(self, price: float, reason: str):
-        logger.info("Closing position", reason=reason, price=price)
-        pos = self.position
+    async def close_position(self, price: float, reason: str, symbol: str = None):
+        symbol = symbol or settings.SYMBOL
+        logger.info("Closing position", symbol=symbol, reason=reason, price=price)
+        pos = self.positions[symbol]
         pos.exit_price = price
-        pos.exit_time = datetime.utcnow().isoformat()
+        pos.exit_time = self.clock().isoformat()
         pos.exit_reason = reason
         pos.status = "CLOSED"
         
@@ -173,12 +202,12 @@ class PaperEngine:
         
         self.balance += pos.pnl
         await self.save_trade(pos)
-        self.position = None
+        del self.positions[symbol]
+        self.open_pnl.pop(symbol, None)
         
         metrics.LAST_TRADE_PNL.set(pos.pnl)
-        metrics.POSITION_SIZE.set(0)
         metrics.BALANCE.set(self.balance)
-        metrics.OPEN_REALIZED_PNL.set(0)
+        self.update_position_metrics()
         
         logger.info("Position Closed", pnl=pos.pnl, new_balance=self.balance)
         
@@ -192,25 +221,30 @@ class PaperEngine:
         PnL: {format_balance(pos.pnl)} USDT
         New Balance: {format_balance(self.balance)} USDT
         """
-        await notifier.send_email(f"Trade Closed: {reason} {pos.pnl:.2f}", msg)
+        await self.send_email(f"Trade Closed: {pos.symbol} {reason} {pos.pnl:.2f}", msg)
 
-    async def process_ohlcv(self, df_15m: pd.DataFrame, df_1h: pd.DataFrame):
+    async def process_ohlcv(self, df_15m: pd.DataFrame, df_1h: pd.DataFrame, symbol: str = None):
         """Strategy Check on new Candle (15m or 1h update)."""
-        if self.position:
-            return  # Max 1 position
+        symbol = symbol or settings.SYMBOL
+        if symbol in self.positions:
+            return  # Max 1 position per symbol
 
-        signal = self.strategy.analyze(df_15m, df_1h)
+        signal = self.strategy_for(symbol).analyze(df_15m, df_1h)
         if signal:
             # Prevent duplicate signals on same timestamp
-            if self.last_signal_timestamp == signal.timestamp:
+            if self.last_signal_timestamps.get(symbol) == signal.timestamp:
                 return
             
-            await self.open_position(signal)
-            self.last_signal_timestamp = signal.timestamp
+            await self.open_position(signal, symbol=symbol)
+            self.last_signal_timestamps[symbol] = signal.timestamp
 
-    async def open_position(self, signal: Signal):
+    async def open_position(self, signal: Signal, symbol: str = None):
+        symbol = symbol or settings.SYMBOL
         async with self.lock:
-            if self.position: return
+            if symbol in self.positions: return
+            if len(self.positions) >= settings.MAX_OPEN_POSITIONS:
+                logger.info("Max open positions reached, skipping signal", symbol=symbol, action=signal.action)
+                return
 
             risk_amount = self.balance * settings.RISK_PERCENT / 100
             # Distance to SL
@@ -221,35 +255,40 @@ class PaperEngine:
 
             size = risk_amount / dist
             
+            # Shared budget: notional of all open positions stays within 98% of the balance
+            available = self.balance * 0.98 - self.open_notional()
+            if available <= 0:
+                logger.info("No balance left for new position", symbol=symbol)
+                return
             entry_val = signal.price * size
-            if entry_val > self.balance * 0.98:
-                size = (self.balance * 0.98) / signal.price
+            if entry_val > available:
+                size = available / signal.price
 
             # Create Position
             pos = Position(
-                id=f"{int(datetime.utcnow().timestamp())}",
-                symbol=settings.SYMBOL,
+                id=f"{int(self.clock().timestamp())}-{symbol.replace('/', '')}",
+                symbol=symbol,
                 side=signal.action,
                 entry_price=signal.price,
                 size=size,
                 sl=signal.sl,
                 tp=signal.tp,
-                open_time=datetime.utcnow().isoformat(),
+                open_time=self.clock().isoformat(),
                 status="OPEN"
             )
             
-            logger.info("Opening Position", side=pos.side, size=pos.size, price=pos.entry_price)
-            self.position = pos
+            logger.info("Opening Position", symbol=symbol, side=pos.side, size=pos.size, price=pos.entry_price)
+            self.positions[symbol] = pos
+            self.open_pnl[symbol] = 0.0
             await self.save_trade(pos)
             
-            metrics.POSITION_SIZE.set(pos.size)
-            metrics.OPEN_REALIZED_PNL.set(0)
+            self.update_position_metrics()
             
             # Notify
             rr = abs(signal.tp - signal.price) / abs(signal.price - signal.sl)
             msg = f"""
             NEW SIGNAL: {signal.action}
-            Symbol: {settings.SYMBOL}
+            Symbol: {symbol}
             Entry: {signal.price}
             SL: {signal.sl}
             TP: {signal.tp}
@@ -258,6 +297,6 @@ class PaperEngine:
             Balance: {format_balance(self.balance)}
             Reason: {signal.reason}
             """
-            await notifier.send_email(f"New Trade: {signal.action}", msg)
+            await self.send_email(f"New Trade: {signal.action} {symbol}", msg)
 
 engine = PaperEngine()
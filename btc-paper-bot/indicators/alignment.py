@@ -0,0 +1,58 @@
+"""
+Multi-timeframe alignment for whole-history computations
+(DayTradingStrategy.generate_signals / signal_features, backtests, optimizers).
+
+A 15m bar opening at 10:15 may only see the 1H candle that closed at 10:00,
+i.e. the one stamped 09:00 (floor to the hour, minus one hour). Instead of
+working that out with pandas per bar, completed_bar_index() maps every
+lower-timeframe bar to the position of its last completed higher-timeframe
+bar once per dataset, and take_aligned() gathers the higher-timeframe columns
+onto the lower timeframe with one vectorized take:
+
+    hour_idx = completed_bar_index(df_15m.index, df_1h.index, '1h')
+    ctx_1h = take_aligned(df_1h, hour_idx, ['EMA50', 'EMA200', 'ADX_14'])
+    # ctx_1h['EMA50'][i] is the 1H EMA50 known at 15m bar i (NaN if hour_idx[i] < 0)
+"""
+import os
+import sys
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.helpers import timeframe_to_ms
+
+
+def _index_ms(index: pd.DatetimeIndex) -> np.ndarray:
+    return index.values.astype('datetime64[ms]').astype(np.int64)
+
+
+def completed_bar_index(lower_index: pd.DatetimeIndex, higher_index: pd.DatetimeIndex,
+                        higher_timeframe: str) -> np.ndarray:
+    """
+    For each lower-timeframe bar, the position in higher_index of the last
+    higher-timeframe bar completed when it opened, or -1 if that bar is
+    missing from higher_index (data gap / before the start).
+    """
+    lower = _index_ms(lower_index)
+    higher = _index_ms(higher_index)
+    step = timeframe_to_ms(higher_timeframe)
+    wanted = lower - lower % step - step
+    pos = np.searchsorted(higher, wanted)
+    found = pos < len(higher)
+    found[found] = higher[pos[found]] == wanted[found]
+    return np.where(found, pos, -1)
+
+
+def take_aligned(df_higher: pd.DataFrame, idx: np.ndarray, columns: List[str]) -> Dict[str, np.ndarray]:
+    """{column: higher-timeframe values at idx}, NaN where idx is -1."""
+    missing = idx < 0
+    safe = np.where(missing, 0, idx)
+    out = {}
+    for col in columns:
+        values = df_higher[col].to_numpy(dtype=np.float64).take(safe) if len(df_higher) else np.full(len(idx), np.nan)
+        values[missing] = np.nan
+        out[col] = values
+    return out
@@ -0,0 +1,159 @@
+"""
+Content-addressed cache for the vectorized indicator kernels.
+
+Results are keyed by (fingerprint of the input arrays, kernel name, parameters),
+so every consumer asking for e.g. RSI(14) over the same candles shares one
+computation, whichever frame / copy the arrays came from:
+
+    from indicators.cache import indicator_cache
+    rsi = indicator_cache.get('rsi', [df['close']], length=14)
+    k, d = indicator_cache.get('stochrsi', [df['close']], length=14, rsi_length=14, k=3, d=3)
+
+Two tiers:
+- memory: LRU bounded by the total size of the cached arrays (INDICATOR_CACHE_MB)
+- disk:   optional .npz per key in INDICATOR_CACHE_DIR, survives across runs
+
+Cached arrays are returned read-only; copy before modifying in place.
+Hit / miss counts: stats() and the btc_paper_indicator_cache_* metrics.
+"""
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import structlog
+
+from config import settings
+from indicators import kernels
+from monitoring.metrics import INDICATOR_CACHE_BYTES, INDICATOR_CACHE_LOOKUPS
+
+log = structlog.get_logger()
+
+Result = Union[np.ndarray, Tuple[np.ndarray, ...]]
+
+
+def fingerprint(*arrays) -> str:
+    """blake2b digest of the float64 contents (and lengths) of the arrays."""
+    h = hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        a = np.ascontiguousarray(a, dtype=np.float64)
+        h.update(len(a).to_bytes(8, 'little'))
+        h.update(a.data)
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    def __init__(self, max_bytes: int = 256 * 2**20, directory: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.directory = directory or None
+        self._entries: "OrderedDict[str, Tuple[bool, Tuple[np.ndarray, ...]]]" = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(indicator: str, data_key: str, params: dict) -> str:
+        spec = f"{indicator}|{data_key}|" + ",".join(f"{k}={params[k]!r}" for k in sorted(params))
+        return hashlib.blake2b(spec.encode(), digest_size=16).hexdigest()
+
+    def get(self, indicator: str, inputs: Sequence, **params) -> Result:
+        """kernels.<indicator>(*inputs, **params), computed at most once per distinct input data."""
+        arrays = [np.ascontiguousarray(x, dtype=np.float64) for x in inputs]
+        key = self.key(indicator, fingerprint(*arrays), params)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            INDICATOR_CACHE_LOOKUPS.labels(result='hit').inc()
+            return self._unpack(entry)
+
+        entry = self._load(key)
+        if entry is not None:
+            self.disk_hits += 1
+            INDICATOR_CACHE_LOOKUPS.labels(result='disk_hit').inc()
+        else:
+            self.misses += 1
+            INDICATOR_CACHE_LOOKUPS.labels(result='miss').inc()
+            result = getattr(kernels, indicator)(*arrays, **params)
+            entry = (isinstance(result, tuple), result if isinstance(result, tuple) else (result,))
+            self._store(key, entry)
+        for a in entry[1]:
+            a.setflags(write=False)  # Shared between consumers
+        self._insert(key, entry)
+        return self._unpack(entry)
+
+    @staticmethod
+    def _unpack(entry) -> Result:
+        multi, arrays = entry
+        return arrays if multi else arrays[0]
+
+    def _insert(self, key: str, entry):
+        size = sum(a.nbytes for a in entry[1])
+        if size > self.max_bytes:
+            return  # Larger than the whole memory tier; the disk tier (if any) still has it
+        self._entries[key] = entry
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= sum(a.nbytes for a in evicted)
+            self.evictions += 1
+        INDICATOR_CACHE_BYTES.set(self.nbytes)
+
+    # --- Disk tier ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _load(self, key: str):
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with np.load(self._path(key)) as f:
+                arrays = tuple(f[f"out{i}"] for i in range(len(f.files) - 1))
+                return bool(f['multi']), arrays
+        except Exception as e:
+            log.warning("Unreadable indicator cache file, recomputing", key=key, error=str(e))
+            return None
+
+    def _store(self, key: str, entry):
+        if not self.directory:
+            return
+        multi, arrays = entry
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(key) + '.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                np.savez(f, multi=multi, **{f"out{i}": a for i, a in enumerate(arrays)})
+            os.replace(tmp, self._path(key))  # Concurrent readers never see a partial file
+        except OSError as e:
+            log.warning("Could not write indicator cache file", key=key, error=str(e))
+
+    # --- Housekeeping ---
+
+    def clear(self):
+        """Drop the memory tier (the disk tier is left alone)."""
+        self._entries.clear()
+        self.nbytes = 0
+        INDICATOR_CACHE_BYTES.set(0)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self.nbytes,
+            'evictions': self.evictions,
+        }
+
+
+indicator_cache = IndicatorCache(
+    max_bytes=int(settings.INDICATOR_CACHE_MB * 2**20),
+    directory=settings.INDICATOR_CACHE_DIR,
+)
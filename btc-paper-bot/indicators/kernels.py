@@ -0,0 +1,234 @@
+"""
+Vectorized indicator kernels on raw float64 arrays.
+
+Batch counterpart of indicators/streaming.py for backtests and optimizers:
+every function takes 1-D NumPy arrays and returns arrays of the same length,
+with NaN warm-up rows exactly where pandas_ta has them. No pandas objects are
+created, and multi-output indicators return tuples instead of DataFrames with
+generated column names.
+
+- EMA:      SMA seed over the first `length` values, then alpha = 2 / (length + 1)
+- RMA:      pandas_ta rma, i.e. ewm(alpha=1/length, min_periods=length) (adjust=True)
+- RSI:      rma of gains / losses
+- ATR:      rma of the true range (first bar has no true range)
+- ADX:      rma-smoothed +DM / -DM over ATR, ADX = rma of DX -> (adx, dmp, dmn)
+- MACD:     EMA(fast) - EMA(slow), signal = EMA of the MACD line -> (macd, histogram, signal)
+- StochRSI: rolling min/max of RSI, %K = SMA(k), %D = SMA(d) -> (k, d)
+
+The recursive filters and rolling windows run as compiled loops when numba is
+installed (optional, see requirements.txt) and fall back to NumPy otherwise.
+Parity with pandas_ta on both backends: tests/test_kernels.py (requirements-dev.txt);
+timings: benchmark_indicators.py.
+"""
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+NAN = np.nan
+
+
+# --- Primitives (numba loop or NumPy fallback) ---
+
+def _decay_cumsum_numpy(v: np.ndarray, decay: float) -> np.ndarray:
+    """y[i] = decay * y[i-1] + v[i], y[-1] = 0."""
+    n = len(v)
+    out = np.empty(n)
+    if n == 0 or decay == 0:
+        out[:] = v
+        return out
+    # Closed form per chunk: y[i] = decay^i * cumsum(v[k] / decay^k); chunks keep decay^-k far from overflow
+    chunk = int(max(1, min(n, 600 / -np.log(decay))))
+    powers = decay ** np.arange(1, chunk + 1)
+    inverse = 1.0 / decay ** np.arange(chunk)
+    carry = 0.0
+    for start in range(0, n, chunk):
+        seg = v[start:start + chunk]
+        m = len(seg)
+        acc = np.cumsum(seg * inverse[:m])
+        acc *= powers[:m] / decay
+        acc += carry * powers[:m]
+        out[start:start + m] = acc
+        carry = acc[-1]
+    return out
+
+
+def _rolling_numpy(x: np.ndarray, length: int, how: str) -> np.ndarray:
+    """Rolling min / max / mean over full windows; windows containing NaN are NaN."""
+    n = len(x)
+    out = np.full(n, NAN)
+    if n < length:
+        return out
+    if how == 'mean':
+        out[length - 1:] = sliding_window_view(x, length).mean(axis=1)
+        return out
+    # van Herk / Gil-Werman: every window spans at most two blocks of `length`, so its extreme is
+    # the suffix extreme of the first block combined with the prefix extreme of the second
+    ufunc = np.minimum if how == 'min' else np.maximum
+    blocks = np.concatenate([x, np.full(-n % length, NAN)]).reshape(-1, length)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[length - 1:] = ufunc(suffix[:n - length + 1], prefix[length - 1:n])
+    return out
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _decay_cumsum(v, decay):
+        out = np.empty(len(v))
+        acc = 0.0
+        for i in range(len(v)):
+            acc = decay * acc + v[i]
+            out[i] = acc
+        return out
+
+    @njit(cache=True)
+    def _rolling_loop(x, length, mode):
+        # mode: 0 = min, 1 = max, 2 = mean
+        n = len(x)
+        out = np.full(n, np.nan)
+        for i in range(length - 1, n):
+            acc = 0.0 if mode == 2 else x[i]
+            has_nan = False
+            for j in range(i - length + 1, i + 1):
+                v = x[j]
+                if np.isnan(v):
+                    has_nan = True
+                    break
+                if mode == 0:
+                    acc = min(acc, v)
+                elif mode == 1:
+                    acc = max(acc, v)
+                else:
+                    acc += v  # Summed directly so flat windows stay exact, like streaming.SMA
+            if not has_nan:
+                out[i] = acc / length if mode == 2 else acc
+        return out
+
+    def _rolling(x: np.ndarray, length: int, how: str) -> np.ndarray:
+        return _rolling_loop(x, length, {'min': 0, 'max': 1, 'mean': 2}[how])
+else:
+    _decay_cumsum = _decay_cumsum_numpy
+    _rolling = _rolling_numpy
+
+
+def _as_array(x) -> np.ndarray:
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def _first_valid(x: np.ndarray) -> int:
+    valid = np.flatnonzero(~np.isnan(x))
+    return int(valid[0]) if len(valid) else len(x)
+
+
+# --- Indicators ---
+
+def sma(x, length: int) -> np.ndarray:
+    return _rolling(_as_array(x), length, 'mean')
+
+
+def ema(x, length: int) -> np.ndarray:
+    """pandas_ta ema (sma seed, adjust=False); leading NaNs are skipped, like the MACD signal line."""
+    x = _as_array(x)
+    out = np.full(len(x), NAN)
+    first = _first_valid(x)
+    seed = first + length - 1
+    if seed >= len(x):
+        return out
+    alpha = 2.0 / (length + 1)
+    v = alpha * x[seed:]
+    v[0] = x[first:seed + 1].mean()
+    out[seed:] = _decay_cumsum(v, 1.0 - alpha)
+    return out
+
+
+def rma(x, length: int) -> np.ndarray:
+    """pandas ewm(alpha=1/length, min_periods=length).mean(): NaNs add no weight but still decay older ones."""
+    x = _as_array(x)
+    decay = 1.0 - 1.0 / length
+    valid = ~np.isnan(x)
+    first = int(valid.argmax()) if valid.any() else len(x)
+    out = np.full(len(x), NAN)
+    if valid[first:].all():
+        # Only leading NaNs: the weight sum is 1 + decay + ... + decay^i, constant once decay^i underflows
+        num = _decay_cumsum(x[first:], decay)
+        den = np.full(len(num), 1.0 / (1.0 - decay) if decay else 1.0)
+        head = min(len(num), int(40 / -np.log(decay)) + 1 if decay else 1)
+        den[:head] = np.cumsum(decay ** np.arange(head))
+        out[first:] = num / den
+        out[first:first + length - 1] = NAN
+        return out
+    num = _decay_cumsum(np.where(valid, x, 0.0), decay)
+    den = _decay_cumsum(valid.astype(np.float64), decay)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[:] = num / den
+    out[np.cumsum(valid) < length] = NAN
+    return out
+
+
+def rsi(close, length: int = 14) -> np.ndarray:
+    close = _as_array(close)
+    diff = np.empty(len(close))
+    diff[:1] = NAN
+    diff[1:] = np.diff(close)
+    gain = rma(np.maximum(diff, 0.0), length)  # np.maximum keeps the leading NaN
+    loss = rma(np.maximum(-diff, 0.0), length)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100.0 * gain / (gain + loss)
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    out = np.empty(len(close))
+    out[:1] = NAN
+    prev_close = close[:-1]
+    out[1:] = np.maximum(high[1:] - low[1:], np.maximum(np.abs(high[1:] - prev_close), np.abs(prev_close - low[1:])))
+    return out
+
+
+def atr(high, low, close, length: int = 14) -> np.ndarray:
+    return rma(true_range(high, low, close), length)
+
+
+def adx(high, low, close, length: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(ADX, DMP, DMN) like pandas_ta ADX_n / DMP_n / DMN_n."""
+    high, low = _as_array(high), _as_array(low)
+    up = np.empty(len(high))
+    dn = np.empty(len(high))
+    up[:1] = dn[:1] = NAN
+    up[1:] = high[1:] - high[:-1]
+    dn[1:] = low[:-1] - low[1:]
+    pos = np.where((up > dn) & (up > 0), up, 0.0) + up * 0  # Keeps the leading NaN
+    neg = np.where((dn > up) & (dn > 0), dn, 0.0) + dn * 0
+
+    atr_ = atr(high, low, close, length)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dmp = 100.0 * rma(pos, length) / atr_
+        dmn = 100.0 * rma(neg, length) / atr_
+        dx = 100.0 * np.abs(dmp - dmn) / (dmp + dmn)
+    return rma(dx, length), dmp, dmn
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(MACD, histogram, signal) like pandas_ta MACD_f_s_g / MACDh_f_s_g / MACDs_f_s_g."""
+    close = _as_array(close)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, line - signal_line, signal_line
+
+
+def stochrsi(close, length: int = 14, rsi_length: int = 14, k: int = 3, d: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """(%K, %D) like pandas_ta STOCHRSIk / STOCHRSId."""
+    rsi_ = rsi(close, rsi_length)
+    lowest = _rolling(rsi_, length, 'min')
+    span = _rolling(rsi_, length, 'max') - lowest
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stoch = np.where(span > 0, 100.0 * (rsi_ - lowest) / span, 0.0) + span * 0  # Flat window -> 0
+    k_line = sma(stoch, k)
+    return k_line, sma(k_line, d)
@@ -0,0 +1,304 @@
+"""
+Streaming (incremental) indicators.
+
+Each indicator consumes one candle at a time in O(1) and mirrors the
+pandas_ta defaults used by the strategies:
+
+- EMA:      SMA seed over the first `length` closes, then alpha = 2 / (length + 1)
+- RMA:      pandas_ta rma, i.e. ewm(alpha=1/length, min_periods=length) (adjust=True)
+- RSI:      rma of gains / losses
+- ATR:      rma of the true range (first bar has no true range)
+- ADX:      rma-smoothed +DM / -DM over ATR, ADX = rma of DX
+- StochRSI: rolling min/max of RSI, %K = SMA(k), %D = SMA(d)
+
+Values that are not available yet are NaN, like the pandas_ta warm-up rows.
+
+IndicatorEngine runs a named set of indicators over one candle series and
+keeps a short rollback journal, so a revised "developing" candle (same
+timestamp, new values) is undone and re-applied instead of double-counted.
+"""
+import math
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+NAN = float('nan')
+
+
+class StreamingIndicator:
+    """Base class: subclasses list their mutable state in `_state`."""
+    _state = ()
+
+    def snapshot(self) -> tuple:
+        return tuple(
+            tuple(v) if isinstance(v, deque) else (v.snapshot() if isinstance(v, StreamingIndicator) else v)
+            for v in (getattr(self, name) for name in self._state)
+        )
+
+    def restore(self, snap: tuple):
+        for name, value in zip(self._state, snap):
+            current = getattr(self, name)
+            if isinstance(current, deque):
+                current.clear()
+                current.extend(value)
+            elif isinstance(current, StreamingIndicator):
+                current.restore(value)
+            else:
+                setattr(self, name, value)
+
+    def update(self, candle):
+        raise NotImplementedError
+
+
+class SMA(StreamingIndicator):
+    # Summed directly (no running total) so flat windows stay exact, e.g. %K == %D == 0
+    _state = ('window',)
+
+    def __init__(self, length: int, source: int = 4):
+        self.length = length
+        self.source = source
+        self.window = deque(maxlen=length)
+
+    def push(self, x: float) -> float:
+        self.window.append(x)
+        return sum(self.window) / self.length if len(self.window) == self.length else NAN
+
+    def update(self, candle) -> float:
+        return self.push(candle[self.source])
+
+
+class EMA(StreamingIndicator):
+    _state = ('value', 'count', 'seed_sum')
+
+    def __init__(self, length: int, source: int = 4):
+        self.length = length
+        self.source = source
+        self.alpha = 2.0 / (length + 1)
+        self.value = NAN
+        self.count = 0
+        self.seed_sum = 0.0
+
+    def push(self, x: float) -> float:
+        self.count += 1
+        if self.count < self.length:
+            self.seed_sum += x
+            return NAN
+        if self.count == self.length:
+            self.value = (self.seed_sum + x) / self.length
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def update(self, candle) -> float:
+        return self.push(candle[self.source])
+
+
+class RMA(StreamingIndicator):
+    """Wilder smoothing as computed by pandas_ta (adjusted ewm)."""
+    _state = ('num', 'den', 'count')
+
+    def __init__(self, length: int):
+        self.length = length
+        self.decay = 1.0 - 1.0 / length
+        self.num = 0.0
+        self.den = 0.0
+        self.count = 0
+
+    def push(self, x: float) -> float:
+        self.num = x + self.decay * self.num
+        self.den = 1.0 + self.decay * self.den
+        self.count += 1
+        return self.num / self.den if self.count >= self.length else NAN
+
+
+class RSI(StreamingIndicator):
+    _state = ('prev', 'gain', 'loss')
+
+    def __init__(self, length: int = 14, source: int = 4):
+        self.source = source
+        self.prev = None
+        self.gain = RMA(length)
+        self.loss = RMA(length)
+
+    def push(self, x: float) -> float:
+        prev, self.prev = self.prev, x
+        if prev is None:
+            return NAN
+        diff = x - prev
+        avg_gain = self.gain.push(max(diff, 0.0))
+        avg_loss = self.loss.push(max(-diff, 0.0))
+        if math.isnan(avg_gain) or avg_gain + avg_loss == 0:
+            return NAN
+        return 100.0 * avg_gain / (avg_gain + avg_loss)
+
+    def update(self, candle) -> float:
+        return self.push(candle[self.source])
+
+
+def _true_range(candle, prev_close: float) -> float:
+    high, low = candle[2], candle[3]
+    return max(high - low, abs(high - prev_close), abs(prev_close - low))
+
+
+class ATR(StreamingIndicator):
+    _state = ('prev_close', 'rma')
+
+    def __init__(self, length: int = 14):
+        self.prev_close = None
+        self.rma = RMA(length)
+
+    def update(self, candle) -> float:
+        prev_close, self.prev_close = self.prev_close, candle[4]
+        if prev_close is None:
+            return NAN
+        return self.rma.push(_true_range(candle, prev_close))
+
+
+class ADX(StreamingIndicator):
+    """Returns (ADX, DMP, DMN) like pandas_ta ADX_n / DMP_n / DMN_n."""
+    _state = ('prev', 'atr', 'pos', 'neg', 'adx')
+
+    def __init__(self, length: int = 14):
+        self.prev = None  # (high, low, close)
+        self.atr = RMA(length)
+        self.pos = RMA(length)
+        self.neg = RMA(length)
+        self.adx = RMA(length)
+
+    def update(self, candle):
+        high, low, close = candle[2], candle[3], candle[4]
+        prev, self.prev = self.prev, (high, low, close)
+        if prev is None:
+            return NAN, NAN, NAN
+
+        up = high - prev[0]
+        dn = prev[1] - low
+        atr = self.atr.push(_true_range(candle, prev[2]))
+        pos = self.pos.push(up if (up > dn and up > 0) else 0.0)
+        neg = self.neg.push(dn if (dn > up and dn > 0) else 0.0)
+        if math.isnan(atr) or atr == 0:
+            return NAN, NAN, NAN
+
+        dmp = 100.0 * pos / atr
+        dmn = 100.0 * neg / atr
+        if dmp + dmn == 0:
+            return NAN, dmp, dmn
+        dx = 100.0 * abs(dmp - dmn) / (dmp + dmn)
+        return self.adx.push(dx), dmp, dmn
+
+
+class StochRSI(StreamingIndicator):
+    """Returns (%K, %D) like pandas_ta STOCHRSIk / STOCHRSId."""
+    _state = ('rsi', 'window', 'k_sma', 'd_sma')
+
+    def __init__(self, length: int = 14, rsi_length: int = 14, k: int = 3, d: int = 3, source: int = 4):
+        self.source = source
+        self.rsi = RSI(rsi_length)
+        self.window = deque(maxlen=length)
+        self.k_sma = SMA(k)
+        self.d_sma = SMA(d)
+
+    def update(self, candle):
+        rsi = self.rsi.push(candle[self.source])
+        if math.isnan(rsi):
+            return NAN, NAN
+        self.window.append(rsi)
+        if len(self.window) < self.window.maxlen:
+            return NAN, NAN
+
+        lowest, highest = min(self.window), max(self.window)
+        span = highest - lowest
+        stoch = 100.0 * (rsi - lowest) / span if span > 0 else 0.0
+        k = self.k_sma.push(stoch)
+        if math.isnan(k):
+            return NAN, NAN
+        return k, self.d_sma.push(k)
+
+
+class IndicatorEngine:
+    """
+    Runs named streaming indicators over a candle series ([ts, o, h, l, c, v]).
+
+    `rows` holds the outputs of the last `history` candles (oldest first), each
+    a dict with the candle fields plus one entry per indicator.
+    Candles up to `history` bars back can be revised: the engine restores the
+    snapshot taken before that bar and replays the newer ones.
+    """
+
+    def __init__(self, factory: Callable[[], Dict[str, StreamingIndicator]], history: int = 3):
+        self.factory = factory
+        self.indicators = factory()
+        self.history = history
+        self.rows: deque = deque(maxlen=history)
+        # (candle, snapshot taken before applying it) for the last `history` bars
+        self._journal: deque = deque(maxlen=history)
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self._journal[-1][0][0]) if self._journal else None
+
+    def reset(self):
+        self.indicators = self.factory()
+        self.rows.clear()
+        self._journal.clear()
+
+    def snapshot(self) -> tuple:
+        """Picklable state (indicators, output rows, rollback journal), e.g. for warm starts."""
+        return (
+            {name: ind.snapshot() for name, ind in self.indicators.items()},
+            list(self.rows),
+            list(self._journal),
+        )
+
+    def restore(self, snap: tuple):
+        indicators, rows, journal = snap
+        self.reset()
+        if set(indicators) != set(self.indicators):
+            raise ValueError(f"Snapshot indicators {sorted(indicators)} do not match {sorted(self.indicators)}")
+        for name, ind in self.indicators.items():
+            ind.restore(indicators[name])
+        self.rows.extend(rows)
+        self._journal.extend(journal)
+
+    def _apply(self, candle) -> dict:
+        snap = {name: ind.snapshot() for name, ind in self.indicators.items()}
+        row = {
+            'timestamp': int(candle[0]), 'open': candle[1], 'high': candle[2],
+            'low': candle[3], 'close': candle[4], 'volume': candle[5],
+        }
+        for name, ind in self.indicators.items():
+            row[name] = ind.update(candle)
+        self._journal.append((candle, snap))
+        self.rows.append(row)
+        return row
+
+    def update(self, candle) -> bool:
+        """
+        Feed one candle. Returns False if the candle is older than the rollback
+        window (the caller should reset and replay).
+        """
+        candle = tuple(float(v) for v in candle[:6])
+        last = self.last_timestamp
+        if last is None or candle[0] > last:
+            self._apply(candle)
+            return True
+
+        # Revision of a bar still in the journal
+        for pos in range(len(self._journal) - 1, -1, -1):
+            if self._journal[pos][0][0] == candle[0]:
+                break
+        else:
+            return False
+        if self._journal[pos][0] == candle:
+            return True  # Unchanged
+
+        replay: List[tuple] = [candle] + [c for c, _ in list(self._journal)[pos + 1:]]
+        snap = self._journal[pos][1]
+        for name, ind in self.indicators.items():
+            ind.restore(snap[name])
+        for _ in range(len(self._journal) - pos):
+            self._journal.pop()
+            self.rows.pop()
+        for c in replay:
+            self._apply(c)
+        return True
+
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Load-test the live pipeline (main.Bot + PaperEngine) against a local FakeExchange.
+
+    python loadtest.py                                    # 30s, 20k tickers/s, 2k klines/s
+    python loadtest.py --ticker-rate 50000 --burst-every 5 --burst-size 20000
+    python loadtest.py --disconnect-every 10 --gap-every 15
+    python loadtest.py --symbols 50                      # multi-symbol mode
+
+Market time runs --time-scale x faster than the wall clock (default: one 15m
+bar per second), so bar closes come from kline rollovers; the wall-clock bar
+timer is not started. Reports message throughput and latency percentiles:
+
+- tick-to-trade:    ticker sent by the exchange -> PaperEngine.process_ticker done
+- tick-to-decision: first kline of a new bar sent -> strategy evaluation of the closed bar done
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import structlog
+from prometheus_client import REGISTRY
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import settings
+from data.fake_exchange import FakeExchange
+from execution.paper_engine import PaperEngine
+from main import Bot
+
+log = structlog.get_logger()
+
+
+class InstrumentedEngine(PaperEngine):
+    def __init__(self, exchange: FakeExchange, **kwargs):
+        super().__init__(**kwargs)
+        self.exchange = exchange
+        self.tick_latency = []
+        self.decision_latency = []
+
+    async def process_ticker(self, ticker: dict, symbol: str = None):
+        await super().process_ticker(ticker, symbol=symbol)
+        sent = (ticker.get('info') or {}).get('sent')
+        if sent:
+            self.tick_latency.append(time.perf_counter() - sent)
+
+    async def process_ohlcv(self, df_15m: pd.DataFrame, df_1h: pd.DataFrame, symbol: str = None):
+        await super().process_ohlcv(df_15m, df_1h, symbol=symbol)
+        # The closed bar is at iloc[-2]; the kline that opened iloc[-1] triggered the decision
+        opened = int(df_15m.index.values[-1].astype('datetime64[ms]').astype(np.int64))
+        sent = self.exchange.bar_opened[symbol].get(opened)
+        if sent:
+            self.decision_latency.append(time.perf_counter() - sent)
+
+
+class LoadTestBot(Bot):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.handled = {}
+
+    async def handle_event(self, item: dict):
+        await super().handle_event(item)
+        self.handled[item['type']] = self.handled.get(item['type'], 0) + 1
+
+
+def print_latency(name: str, samples: list):
+    if not samples:
+        print(f"  {name:<17} no samples")
+        return
+    p50, p90, p99, pmax = np.percentile(np.array(samples) * 1000, [50, 90, 99, 100])
+    print(f"  {name:<17} n={len(samples):>8,}  p50={p50:8.3f}ms  p90={p90:8.3f}ms  "
+          f"p99={p99:8.3f}ms  max={pmax:8.3f}ms")
+
+
+async def run_loadtest(args):
+    out_dir = tempfile.mkdtemp(prefix='loadtest_')
+    settings.CANDLE_STORE_DIR = os.path.join(out_dir, 'candles')  # Keep fake candles out of the real store
+    if args.symbols > 1:
+        settings.SYMBOLS = [f"FAKE{i}/USDT" for i in range(args.symbols)]
+
+    exchange = FakeExchange(
+        symbols=settings.symbols, base_timeframe=settings.BASE_TIMEFRAME,
+        ticker_rate=args.ticker_rate, ohlcv_rate=args.ohlcv_rate, time_scale=args.time_scale,
+        burst_every=args.burst_every, burst_size=args.burst_size,
+        disconnect_every=args.disconnect_every, disconnect_for=args.disconnect_for,
+        gap_every=args.gap_every, seed=args.seed,
+    )
+    engine = InstrumentedEngine(
+        exchange,
+        trade_log_file=os.path.join(out_dir, 'trade_log.json'),
+        balance_history_file=os.path.join(out_dir, 'balance_history.csv'),
+        notify=False,
+    )
+    bot = LoadTestBot(engine=engine, record=False, exchange=exchange, persist=False)
+    bot.clock = lambda: exchange.market_ms() / 1000
+
+    await bot.initialize_data()
+    tasks = [asyncio.create_task(stream) for stream in bot.streams()] + [asyncio.create_task(bot.process_queue())]
+
+    print(f"🚀 Load test: {args.duration:.0f}s, {len(bot.states)} symbol(s), {args.ticker_rate:,.0f} tickers/s, "
+          f"{args.ohlcv_rate:,.0f} klines/s, time scale {args.time_scale:g}x")
+    start = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    bot.ws_fetcher.keep_running = False
+    bot.keep_running = False
+    elapsed = time.perf_counter() - start
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    sent = sum(exchange.sent.values())
+    handled = sum(bot.handled.values())
+    print(f"\n📨 Sent {sent:,} messages ({sent / elapsed:,.0f}/s): "
+          + ", ".join(f"{k}={v:,}" for k, v in exchange.sent.items()))
+    print(f"⚙️  Handled {handled:,} events ({handled / elapsed:,.0f}/s): "
+          + ", ".join(f"{k}={v:,}" for k, v in sorted(bot.handled.items())))
+    print(f"   Pending at stop: {bot.queue.qsize()}, disconnects: {exchange.disconnects}, gaps: {exchange.gaps}")
+    labels = {'timeframe': settings.BASE_TIMEFRAME}
+    print(f"   Stream gaps backfilled: {REGISTRY.get_sample_value('btc_paper_stream_gaps_total', labels) or 0:.0f} "
+          f"({REGISTRY.get_sample_value('btc_paper_backfilled_candles_total', labels) or 0:.0f} candles)")
+
+    print("\n⏱️  Latency:")
+    print_latency("tick-to-trade", engine.tick_latency)
+    print_latency("tick-to-decision", engine.decision_latency)
+    print(f"\nTrades: see {out_dir}, final balance {engine.balance:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--symbols", type=int, default=1, help="Number of fake pairs (> 1 uses the multiplexed streams)")
+    parser.add_argument("--ticker-rate", type=float, default=20000.0, help="Ticker messages per second")
+    parser.add_argument("--ohlcv-rate", type=float, default=2000.0, help="Kline messages per second")
+    parser.add_argument("--time-scale", type=float, default=900.0, help="Market seconds per wall second")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="Seconds between unpaced bursts (0 = off)")
+    parser.add_argument("--burst-size", type=int, default=10000, help="Messages per burst and stream")
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="Seconds between disconnects (0 = off)")
+    parser.add_argument("--disconnect-for", type=float, default=1.0, help="Disconnect duration (s)")
+    parser.add_argument("--gap-every", type=float, default=0.0, help="Seconds between market gaps (0 = off)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for the fake market")
+    args = parser.parse_args()
+
+    asyncio.run(run_loadtest(args))
+
+
+if __name__ == "__main__":
+    main()
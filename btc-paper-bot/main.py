@@ -2,9 +2,11 @@ import asyncio
 import sys
 import os
 import signal
-import pandas as pd
+import time
 import structlog
+import numpy as np
 from collections import deque
+from typing import Dict, Optional, Set
 
 # Windows compatibility for uvloop
 if os.name != 'nt':
@@ -16,65 +18,310 @@ from config import settings
 from utils.logger import logger
 from data.websocket_fetcher import WebSocketFetcher
 from data.historical import HistoricalFetcher
-from execution.paper_engine import engine
+from data.bar_events import BarClose
+from data.market_state import SymbolState
+from data.backfill import GapBackfiller
+from data.event_queue import CoalescingQueue
+from data.journal import open_journal
+from data.snapshot import load_snapshot, save_snapshot
+from execution import paper_engine
+from execution.paper_engine import PaperEngine
 from notifier.daily_report import start_scheduler
 from notifier.email_notifier import notifier
+from monitoring import metrics
+from utils.helpers import timeframe_to_ms
 
 log = structlog.get_logger()
 
+# Candles fetched per timeframe at a cold start (EMA200 on 1H needs the longer history)
+HISTORY_LIMITS = {'15m': 100, '1h': 500}
+
 class Bot:
-    def __init__(self):
+    def __init__(self, engine: PaperEngine = None, record: bool = True, exchange=None, persist: bool = True,
+                 backfiller=None):
         self.keep_running = True
-        self.ws_fetcher = WebSocketFetcher(symbol=settings.SYMBOL)
-        self.queue = asyncio.Queue()
-        
-        # Data Buffers
-        self.df_1h = pd.DataFrame()
-        self.df_15m = pd.DataFrame()
+        self.engine = engine or paper_engine.engine
+        self.clock = time.time  # Replays substitute simulated time
+        self.exchange = exchange  # Injected ccxt.pro-compatible exchange (load tests), else Binance
+        self.journal = open_journal(settings.JOURNAL_PATH) if record else None
+        self.queue = CoalescingQueue(settings.QUEUE_MAXSIZE)
+        # Warm-start snapshot; replays and load tests never read or overwrite the live one
+        self.snapshot_path = settings.SNAPSHOT_PATH if persist else None
+        self.snapshot_task: Optional[asyncio.Task] = None  # Latest snapshot write (worker thread)
         
-        self.last_ts_1h = 0
+        # One state (buffers, bar tracker, resampler) per traded pair
+        self.states: Dict[str, SymbolState] = {}
+        for symbol in settings.symbols:
+            self.add_symbol(symbol)
+        self.ws_fetcher = WebSocketFetcher(
+            symbol=settings.symbols[0], symbols=list(self.states), journal=self.journal, exchange=exchange
+        )
+        # REST backfill of stream gaps (replays inject the backfills recorded in their journal)
+        self.backfiller = backfiller or GapBackfiller(self.ws_fetcher.exchange, settings.BACKFILL_MIN_INTERVAL_MS)
+
+    def add_symbol(self, symbol: str) -> SymbolState:
+        state = self.states[symbol] = SymbolState(
+            symbol, settings.TIMEFRAMES, settings.BASE_TIMEFRAME, settings.BUFFER_CAPACITY, settings.BAR_CLOSE_GRACE_MS
+        )
+        return state
+
+    def history_limits(self, state: SymbolState, now_ms: int) -> Optional[Dict[str, int]]:
+        """
+        Candles to fetch per timeframe: HISTORY_LIMITS for an empty state, only the tail from the last
+        buffered bar on for a restored one. None if that tail is longer than a cold start would fetch.
+        """
+        timeframes = list(state.buffers)
+        if settings.BASE_TIMEFRAME not in timeframes:
+            # Only needed to seed the developing higher-timeframe buckets
+            timeframes.append(settings.BASE_TIMEFRAME)
+        limits = {}
+        for tf in timeframes:
+            limit = HISTORY_LIMITS.get(tf, 500)
+            buffer = state.buffers.get(tf)
+            if buffer is not None and len(buffer):
+                tail = (now_ms - buffer.last_timestamp) // timeframe_to_ms(tf) + 1
+                if tail > limit:
+                    return None
+                limit = tail
+            limits[tf] = limit
+        return limits
+
+    async def fetch_symbol_history(self, hist: HistoricalFetcher, state: SymbolState,
+                                   limits: Dict[str, int]) -> Dict[str, np.ndarray]:
+        timeframes = list(limits)
+        frames = await asyncio.gather(*(
+            hist.fetch_ohlcv(tf, limit=limits[tf], symbol=state.symbol) for tf in timeframes
+        ))
+        if any(df.empty for df in frames):
+            return {}
+        return {
+            tf: np.column_stack([
+                df.index.values.astype('datetime64[ms]').astype(np.int64),
+                df[['open', 'high', 'low', 'close', 'volume']].to_numpy()
+            ])
+            for tf, df in zip(timeframes, frames)
+        }
+
+    def restore_snapshot(self) -> Set[str]:
+        """Swap in the snapshotted state and indicators of every configured symbol; returns the restored ones."""
+        payload = load_snapshot(self.snapshot_path)
+        if payload is None:
+            return set()
+        restored = set()
+        for symbol, snap in payload['states'].items():
+            if symbol not in self.states:
+                continue  # Pair no longer traded
+            if not self.states[symbol].restore(snap):
+                log.warning("Snapshot does not match the buffer settings, cold start", symbol=symbol)
+                continue
+            strategy = payload['strategies'].get(symbol)
+            if strategy is None or not self.engine.strategy_for(symbol).restore(strategy):
+                log.info("Indicator state not restored, rebuilding from buffers", symbol=symbol)
+            restored.add(symbol)
+        log.info("Snapshot restored", symbols=len(restored),
+                 age_s=round(self.clock() - payload['saved_at'] / 1000))
+        return restored
+
+    def write_snapshot(self) -> Optional[asyncio.Task]:
+        """
+        Copy every symbol's state and indicators now (between events, so none is half-applied) and
+        write them in a worker thread. Returns the write task; writes run one at a time, in order.
+        """
+        if not self.snapshot_path:
+            return None
+        try:
+            states = {symbol: state.snapshot() for symbol, state in self.states.items()}
+            strategies = {symbol: self.engine.strategy_for(symbol).snapshot() for symbol in self.states}
+        except Exception as e:
+            log.error("Failed to save snapshot", error=str(e))
+            return None
+        self.snapshot_task = asyncio.create_task(self._save_snapshot(states, strategies, self.snapshot_task))
+        return self.snapshot_task
+
+    async def _save_snapshot(self, states: dict, strategies: dict, previous: Optional[asyncio.Task]):
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(save_snapshot, self.snapshot_path, states, strategies)
+        except Exception as e:
+            log.error("Failed to save snapshot", error=str(e))
+            return
+        metrics.SNAPSHOT_SECONDS.observe(time.perf_counter() - start)
 
     async def initialize_data(self):
-        log.info("Initializing Historical Data...")
-        hist = HistoricalFetcher(symbol=settings.SYMBOL)
-        
-        self.df_1h = await hist.fetch_ohlcv('1h', limit=500)
-        self.df_15m = await hist.fetch_ohlcv('15m', limit=100)
-        
+        start = time.perf_counter()
+        restored = self.restore_snapshot()
+        log.info("Initializing Historical Data...", symbols=len(self.states), restored=len(restored))
+        hist = HistoricalFetcher(symbol=settings.symbols[0], exchange=self.exchange)
+
+        now_ms = int(self.clock() * 1000)
+        limits = {}
+        for symbol in list(self.states):
+            limits[symbol] = self.history_limits(self.states[symbol], now_ms)
+            if limits[symbol] is None:
+                log.info("Snapshot too old, cold start", symbol=symbol)
+                restored.discard(symbol)
+                limits[symbol] = self.history_limits(self.add_symbol(symbol), now_ms)
+
+        # All symbols and timeframes are requested together; ccxt's rate limiter spaces them out.
+        # A restored symbol can start without its tail (the stream backfills it), an empty one is retried.
+        pending = list(self.states)
+        backoff = 1
+        for attempt in range(settings.STARTUP_FETCH_RETRIES + 1):
+            histories = await asyncio.gather(*(
+                self.fetch_symbol_history(hist, self.states[symbol], limits[symbol]) for symbol in pending
+            ))
+            failed = []
+            for symbol, frames in zip(pending, histories):
+                state = self.states[symbol]
+                if not frames and symbol not in restored:
+                    failed.append(symbol)
+                    continue
+                if frames:
+                    for tf, candles in frames.items():
+                        state.seed_history(tf, candles)
+                else:
+                    log.warning("Failed to fetch missing candles, starting from snapshot", symbol=symbol)
+                    state.mark_stale()
+                if self.journal:
+                    # Warm starts journal the merged buffers, so a replay starts from the same candles
+                    history = frames if symbol not in restored else {tf: b.rows() for tf, b in state.buffers.items()}
+                    for tf, candles in history.items():
+                        self.journal.record_history(symbol, tf, candles)
+            pending = failed
+            if not pending or attempt == settings.STARTUP_FETCH_RETRIES:
+                break
+            log.warning("Failed to fetch historical data, retrying", symbols=pending, retry_in=backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
         await hist.close()
-        
-        if self.df_1h.empty or self.df_15m.empty:
+
+        for symbol in pending:
+            log.error("Failed to fetch historical data, dropping symbol", symbol=symbol)
+            del self.states[symbol]
+        if not self.states:
             log.error("Failed to fetch historical data. Exiting.")
             sys.exit(1)
-            
-        # Initialize last timestamps
-        if not self.df_1h.empty:
-            self.last_ts_1h = self.df_1h.index[-1].timestamp() * 1000
-            
-        log.info("Data Initialized", 
-                 len_1h=len(self.df_1h), 
-                 len_15m=len(self.df_15m))
-
-    def update_buffer(self, df: pd.DataFrame, candle: list) -> pd.DataFrame:
-        ts = pd.to_datetime(candle[0], unit='ms')
-        row_data = {
-            'open': candle[1],
-            'high': candle[2],
-            'low': candle[3],
-            'close': candle[4],
-            'volume': candle[5]
-        }
+        self.ws_fetcher.symbols = list(self.states)
+
+        for state in self.states.values():
+            log.info("Data Initialized", symbol=state.symbol,
+                     **{f"len_{tf}": len(buffer) for tf, buffer in state.buffers.items()})
+        elapsed = time.perf_counter() - start
+        metrics.STARTUP_SECONDS.labels(mode='warm' if restored else 'cold').set(elapsed)
+        log.info("Market state ready", seconds=round(elapsed, 3), warm=len(restored), cold=len(self.states) - len(restored))
+
+    def seed_history(self, symbol: str, timeframe: str, candles):
+        """Seed one symbol/timeframe (replays: journaled history of any symbol)."""
+        state = self.states.get(symbol) or self.add_symbol(symbol)
+        state.seed_history(timeframe, candles)
+
+    def next_deadline(self, now_ms: int) -> int:
+        """Next bar boundary (+ grace); all symbols share the same timeframes."""
+        return next(iter(self.states.values())).bar_events.next_deadline(now_ms)
+
+    async def backfill(self, state: SymbolState, timeframe: str, start: int, end: int):
+        """
+        Merge candles missed by the stream into the buffers before the next evaluation.
+        Bars that closed inside the gap are in the past: they update the indicators but are not traded.
+        """
+        step = state.bar_events.step[timeframe]
+        metrics.STREAM_GAPS.labels(timeframe=timeframe).inc()
+        metrics.STREAM_GAP_DURATION.labels(timeframe=timeframe).observe((end + step - start) / 1000)
+        log.warning("Stream gap detected", symbol=state.symbol, timeframe=timeframe, bars=(end - start) // step + 1)
+        try:
+            candles = await self.backfiller.fetch(state.symbol, timeframe, start, end)
+        except Exception as e:
+            metrics.BACKFILL_ERRORS.labels(timeframe=timeframe).inc()
+            log.error("Gap backfill failed", symbol=state.symbol, timeframe=timeframe, error=str(e))
+            return
+        if self.journal:
+            self.journal.record_gap(state.symbol, timeframe, start, end, candles)
+        for candle in candles:
+            state.ingest(timeframe, candle)
+        metrics.BACKFILLED_CANDLES.labels(timeframe=timeframe).inc(len(candles))
+
+    async def on_bar_close(self, state: SymbolState, event: BarClose):
+        metrics.BAR_CLOSES.labels(timeframe=event.timeframe, source=event.source).inc()
+        if event.source == 'timer':
+            state.open_next_bar(event)
+        if event.timeframe != settings.ENTRY_TIMEFRAME:
+            return
+
+        # Higher timeframes closing on the same boundary must be closed before evaluating
+        for other in state.bar_events.close_through(event.end):
+            await self.on_bar_close(state, other)
+
+        # Strategy runs exactly once per closed entry bar:
+        # entry frame (Primary/Trigger) and trend frame, both with the closed bar at iloc[-2]
+        await self.engine.process_ohlcv(
+            state.buffers[settings.ENTRY_TIMEFRAME].to_frame(), state.buffers[settings.TREND_TIMEFRAME].to_frame(),
+            symbol=state.symbol
+        )
+        metrics.BAR_CLOSE_DECISION_LATENCY.observe(max(self.clock() - event.end / 1000, 0))
+        log.debug("Bar closed", symbol=state.symbol, timeframe=event.timeframe, ts=event.timestamp, source=event.source)
+
+    async def bar_clock(self):
+        """Posts a 'bar_clock' event right after every bar boundary (+ grace)."""
+        while self.keep_running:
+            now = time.time() * 1000
+            await asyncio.sleep((self.next_deadline(int(now)) - now) / 1000)
+            await self.queue.put({'type': 'bar_clock', 'now': int(time.time() * 1000)})
+
+    async def snapshot_clock(self):
+        """Posts a 'snapshot' event every SNAPSHOT_INTERVAL s; the consumer copies the state between events."""
+        while self.keep_running:
+            await asyncio.sleep(settings.SNAPSHOT_INTERVAL)
+            await self.queue.put({'type': 'snapshot'})
+
+    async def handle_event(self, item: dict):
+        msg_type = item.get('type')
+        if msg_type == 'reconnect':
+            # Stream came back: the next candle of these symbols is checked for a gap
+            states = [self.states[item['symbol']]] if item.get('symbol') in self.states else self.states.values()
+            for state in states:
+                state.reconnected.add(item['timeframe'])
+            return
+        symbol = item.get('symbol') or settings.symbols[0]
         
-        if ts in df.index:
-            df.loc[ts] = row_data
-        else:
-            new_row = pd.DataFrame([row_data], index=[ts])
-            df = pd.concat([df, new_row])
+        if msg_type == 'ticker':
+            await self.engine.process_ticker(item['data'], symbol=symbol)
             
-        if len(df) > 600:
-            df = df.iloc[-500:]
-            
-        return df
+        elif msg_type == 'ohlcv':
+            state = self.states.get(symbol)
+            if state is None:
+                return
+            closed = []
+            for candle in item['data']:
+                gap = state.gap_before(item['timeframe'], int(candle[0]))
+                if gap:
+                    await self.backfill(state, item['timeframe'], *gap)
+                closed.extend(state.ingest(item['timeframe'], candle))
+            for event in closed:
+                await self.on_bar_close(state, event)
+
+        elif msg_type == 'bar_clock':
+            # Wall-clock boundary passed without a rollover from the feed
+            for state in self.states.values():
+                for event in state.bar_events.on_clock(item['now']):
+                    await self.on_bar_close(state, event)
+
+        elif msg_type == 'snapshot':
+            self.write_snapshot()
+
+    def streams(self) -> list:
+        """Websocket producer coroutines: per-symbol watchers for one pair, multiplexed ones for many."""
+        if len(self.states) == 1:
+            return [
+                self.ws_fetcher.stream_ticker(self.queue),
+                self.ws_fetcher.stream_ohlcv(settings.BASE_TIMEFRAME, self.queue),
+            ]
+        return [
+            self.ws_fetcher.stream_tickers_multi(self.queue),
+            self.ws_fetcher.stream_ohlcv_multi(settings.BASE_TIMEFRAME, self.queue),
+        ]
 
     async def process_queue(self):
         log.info("Starting Queue Processor...")
@@ -82,53 +329,18 @@ class Bot:
             item = await self.queue.get()
             
             try:
-                msg_type = item.get('type')
-                
-                if msg_type == 'ticker':
-                    await engine.process_ticker(item['data'])
-                    
-                elif msg_type == 'ohlcv':
-                    candles = item['data']
-                    tf = item['timeframe']
-                    
-                    for candle in candles:
-                        ts = candle[0]
-                        if tf == '1h':
-                            self.df_1h = self.update_buffer(self.df_1h, candle)
-                            if ts > self.last_ts_1h:
-                                self.last_ts_1h = ts
-                        elif tf == '15m':
-                            self.df_15m = self.update_buffer(self.df_15m, candle)
-
-                    # Trigger Strategy Check on every OHLCV update or specifically 15m?
-                    # Strategy relies on LATEST CLOSED candles.
-                    # As discussed, we pass the current buffers. 
-                    # The strategy takes .iloc[-1] which is the current one (potentially open).
-                    # If we strictly want closed candles, we should pass df[:-1] if the last one is not closed.
-                    # But for simplicity in Paper Trading with "1m/15m/1h" confirmation,
-                    # we often use the developing 1h candle state as "Current 1h Momentum".
-                    
-                    # However, "Entry nur bei Bestätigung auf 15m- oder 1h-Close" suggests:
-                    # Only Check when a 15m or 1h candle CLOSES.
-                    # To implement this strictly:
-                    # Detect New Candle timestamp (previous closed).
-                    
-                    # Since implementing strict "New Candle Event" is complex with just buffers,
-                    # I will call strategy on every 15m update, but let strategy handle logic or accept developing values.
-                    # The user prompt: "Entry-Preis = aktueller Close des 1h-Candles".
-                    
-                    # Day Trading Strategy: Signal check on 15m or 1h updates.
-                    # We pass the buffers: df_15m (Primary/Trigger) and df_1h (Trend)
-                    await engine.process_ohlcv(self.df_15m, self.df_1h)
-                    
+                await self.handle_event(item)
             except Exception as e:
                 log.error("Error in loop", error=str(e))
             finally:
                 self.queue.task_done()
 
     async def run(self):
-        await notifier.send_email("Bot Started", f"BTC Paper Bot started on {settings.SYMBOL}")
-        await self.initialize_data()
+        # The startup email no longer delays loading the market state
+        await asyncio.gather(
+            notifier.send_email("Bot Started", f"BTC Paper Bot started on {', '.join(settings.symbols)}"),
+            self.initialize_data(),
+        )
         
         # Start Prometheus Metrics
         try:
@@ -139,12 +351,12 @@ class Bot:
         
         scheduler = start_scheduler()
         
-        tasks = [
-            asyncio.create_task(self.ws_fetcher.stream_ticker(self.queue)),
-            asyncio.create_task(self.ws_fetcher.stream_ohlcv('15m', self.queue)),
-            asyncio.create_task(self.ws_fetcher.stream_ohlcv('1h', self.queue)),
+        tasks = [asyncio.create_task(stream) for stream in self.streams()] + [
+            asyncio.create_task(self.bar_clock()),
             asyncio.create_task(self.process_queue())
         ]
+        if self.snapshot_path:
+            tasks.append(asyncio.create_task(self.snapshot_clock()))
         
         try:
             while self.keep_running:
@@ -154,7 +366,13 @@ class Bot:
         finally:
             log.info("Shutting down...")
             for t in tasks: t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            snapshot = self.write_snapshot()  # After the consumer stopped, so no event is half-applied
+            if snapshot:
+                await snapshot
             await self.ws_fetcher.close()
+            if self.journal:
+                self.journal.close()
             scheduler.shutdown()
             await notifier.send_email("Bot Stopped", "BTC Paper Bot stopped.")
 
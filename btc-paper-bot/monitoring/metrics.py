@@ -1,7 +1,36 @@
-from prometheus_client import Gauge
+from prometheus_client import Gauge, Counter, Histogram
 
 # Prometheus Metrics
 BALANCE = Gauge('btc_paper_balance', 'Current simulated balance in USDT')
-POSITION_SIZE = Gauge('btc_paper_position_size', 'Current position size')
+POSITION_SIZE = Gauge('btc_paper_position_size', 'Current position size (sum over open positions)')
+OPEN_POSITIONS = Gauge('btc_paper_open_positions', 'Number of open positions across all symbols')
 LAST_TRADE_PNL = Gauge('btc_paper_last_trade_pnl', 'PnL of the last closed trade')
-OPEN_REALIZED_PNL = Gauge('btc_paper_open_pnl', 'Unrealized PnL of open position') # requires tick update
+OPEN_REALIZED_PNL = Gauge('btc_paper_open_pnl', 'Unrealized PnL of open positions') # requires tick update
+
+# Bar close events
+BAR_CLOSES = Counter('btc_paper_bar_closes_total', 'Closed bars detected', ['timeframe', 'source'])
+BAR_CLOSE_DECISION_LATENCY = Histogram('btc_paper_bar_close_decision_seconds', 'Bar end to strategy decision',
+                                       buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 30))
+
+# Event queue (coalescing, bounded)
+QUEUE_DEPTH = Gauge('btc_paper_queue_depth', 'Pending events in the bot queue')
+QUEUE_COALESCED = Counter('btc_paper_queue_coalesced_total', 'Events dropped because a newer one replaced them', ['type'])
+QUEUE_FULL_WAITS = Counter('btc_paper_queue_full_waits_total', 'Producer waits on a full queue (backpressure)', ['type'])
+QUEUE_EVENT_AGE = Histogram('btc_paper_queue_event_age_seconds', 'Age of events when dequeued', ['type'],
+                            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30))
+
+# Startup (cold: full history fetch, warm: snapshot + missing tail)
+STARTUP_SECONDS = Gauge('btc_paper_startup_seconds', 'Time to load market state at startup', ['mode'])
+SNAPSHOT_SECONDS = Histogram('btc_paper_snapshot_seconds', 'Time to write the warm-start snapshot',
+                             buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1))
+
+# Stream gaps (reconnects / missed candles) and their REST backfill
+STREAM_GAPS = Counter('btc_paper_stream_gaps_total', 'Detected gaps in the candle stream', ['timeframe'])
+STREAM_GAP_DURATION = Histogram('btc_paper_stream_gap_seconds', 'Market time refetched per gap', ['timeframe'],
+                                buckets=(60, 300, 900, 1800, 3600, 4 * 3600, 12 * 3600, 24 * 3600, 7 * 24 * 3600))
+BACKFILLED_CANDLES = Counter('btc_paper_backfilled_candles_total', 'Candles merged from REST backfills', ['timeframe'])
+BACKFILL_ERRORS = Counter('btc_paper_backfill_errors_total', 'Failed gap backfills', ['timeframe'])
+
+# Indicator cache (indicators/cache.py)
+INDICATOR_CACHE_LOOKUPS = Counter('btc_paper_indicator_cache_lookups_total', 'Indicator cache lookups', ['result'])
+INDICATOR_CACHE_BYTES = Gauge('btc_paper_indicator_cache_bytes', 'Size of the in-memory indicator cache')
@@ -23,8 +23,9 @@ async def send_daily_report():
 
         curve_path = generate_equity_curve(BALANCE_HISTORY_FILE)
         
+        pairs = settings.SYMBOL if len(settings.symbols) == 1 else f"{len(settings.symbols)} pairs"
         msg = f"""
-        Daily Report ({settings.SYMBOL})
+        Daily Report ({pairs})
         --------------------------------
         Balance: {stats.get('current_balance', 0):.2f} USDT
         Total Return: {stats.get('total_return_pct', 0):.2f}%
@@ -36,13 +37,13 @@ async def send_daily_report():
         Sharpe Ratio: {stats.get('sharpe_ratio', 0):.2f}
         Expectancy: {stats.get('expectancy', 0):.2f}
         
-        Open Position: {'YES' if engine.position else 'NO'}
+        Open Positions: {', '.join(engine.positions) or 'NONE'}
         """
         
         attachments = [curve_path] if curve_path else []
         
         await notifier.send_email(
-            f"Daily Report: {settings.SYMBOL} - {stats.get('total_return_pct', 0):.2f}%",
+            f"Daily Report: {pairs} - {stats.get('total_return_pct', 0):.2f}%",
             msg,
             attachments=attachments
         )
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded event journal (see JOURNAL_PATH) through Bot and PaperEngine.
+
+    python replay.py journal.bin              # max speed
+    python replay.py journal.bin --speed 1    # real time
+    python replay.py journal.bin --speed 60   # 60x
+
+At max speed every record is handled in order, one at a time, so a replay is
+deterministic. Paced replays go through Bot.process_queue like the live feed
+(including coalescing when the consumer falls behind).
+The bar timer runs on the journal's receive timestamps; trades are written to
+a scratch directory and no emails are sent. Recorded stream reconnects are
+replayed as events, and stream gaps get the candles the session backfilled
+for them (no network).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import structlog
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from data.journal import JournalBackfiller, read_journal
+from execution.paper_engine import PaperEngine
+from main import Bot
+
+log = structlog.get_logger()
+
+
+class Replay:
+    def __init__(self, path: str, speed: float = 0.0, out_dir: str = None):
+        self.path = path
+        self.speed = speed  # 0 = max speed
+        self.out_dir = out_dir or tempfile.mkdtemp(prefix='replay_')
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.now = 0.0  # Simulated wall clock (unix seconds)
+
+        engine = PaperEngine(
+            trade_log_file=os.path.join(self.out_dir, 'trade_log.json'),
+            balance_history_file=os.path.join(self.out_dir, 'balance_history.csv'),
+            notify=False,
+            clock=lambda: datetime.utcfromtimestamp(self.now),
+        )
+        # No network: stream gaps get the candles the recorded session backfilled
+        self.bot = Bot(engine=engine, record=False, persist=False, backfiller=JournalBackfiller(path))
+        self.bot.clock = lambda: self.now
+
+        self.events = 0
+        self.latencies = {}  # type -> handling times (s), max speed only
+        self.elapsed = 0.0
+
+    async def dispatch(self, item: dict):
+        self.events += 1
+        if self.speed:
+            await self.bot.queue.put(item)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.bot.handle_event(item)
+        except Exception as e:
+            log.error("Error in replay", error=str(e))
+        self.latencies.setdefault(item['type'], []).append(time.perf_counter() - start)
+
+    async def run(self):
+        consumer = asyncio.create_task(self.bot.process_queue()) if self.speed else None
+        first = None
+        deadline = None
+        started = time.perf_counter()
+
+        for recv_ts, item in read_journal(self.path):
+            if item['type'] == 'history':
+                self.bot.seed_history(item['symbol'], item['timeframe'], item['data'])
+                continue
+            if item['type'] == 'gap':
+                continue  # Served by JournalBackfiller when the replayed stream hits the gap
+
+            if first is None:
+                first = recv_ts
+            if self.speed:
+                delay = (recv_ts - first) / self.speed - (time.perf_counter() - started)
+                await asyncio.sleep(max(delay, 0))  # Also lets the consumer run when behind
+
+            # Simulated bar clock: the same boundaries Bot.bar_clock would have hit
+            now_ms = int(recv_ts * 1000)
+            if deadline is None:
+                deadline = self.bot.next_deadline(now_ms)
+            while deadline <= now_ms:
+                self.now = deadline / 1000
+                await self.dispatch({'type': 'bar_clock', 'now': deadline})
+                deadline = self.bot.next_deadline(deadline)
+
+            self.now = recv_ts
+            await self.dispatch(item)
+
+        if consumer:
+            await self.bot.queue.join()
+            self.bot.keep_running = False
+            consumer.cancel()
+        self.elapsed = time.perf_counter() - started
+
+    def report(self):
+        engine = self.bot.engine
+        print(f"\n📼 Replayed {self.events:,} events in {self.elapsed:.2f}s "
+              f"({self.events / max(self.elapsed, 1e-9):,.0f} events/s)")
+
+        for msg_type, samples in sorted(self.latencies.items()):
+            p50, p99, pmax = np.percentile(np.array(samples) * 1e6, [50, 99, 100])
+            print(f"  {msg_type:<10} n={len(samples):>10,}  p50={p50:8.1f}µs  p99={p99:8.1f}µs  max={pmax:10.1f}µs")
+
+        trades = []
+        if os.path.exists(engine.trade_log_file):
+            with open(engine.trade_log_file) as f:
+                trades = json.load(f)
+        closed = [t for t in trades if t['status'] == 'CLOSED']
+        print(f"\nTrades: {len(trades)} ({len(closed)} closed)")
+        print(f"Final Balance: {engine.balance:.2f}")
+        print(f"Trade log: {self.out_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("journal", help="Journal file recorded via JOURNAL_PATH")
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay speed multiplier (0 = max speed)")
+    parser.add_argument("--out", default=None, help="Directory for the replay trade log (default: temp dir)")
+    args = parser.parse_args()
+
+    replay = Replay(args.journal, speed=args.speed, out_dir=args.out)
+    asyncio.run(replay.run())
+    replay.report()
+
+
+if __name__ == "__main__":
+    main()
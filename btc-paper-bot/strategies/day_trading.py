@@ -1,11 +1,19 @@
-import pandas_ta as ta
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
-from typing import Optional, Literal
+from typing import Dict, Optional, Literal
 from structlog import get_logger
+from indicators.streaming import IndicatorEngine, EMA, RSI, ATR, ADX, StochRSI
+from indicators.cache import indicator_cache
+from indicators.alignment import completed_bar_index, take_aligned
+from utils.helpers import timeframe_to_ms
 
 log = get_logger()
 
+# Bars re-fed on every analyze() call: the developing candle and the one before it,
+# so a late final update of the just-closed candle is still picked up.
+REVISION_DEPTH = 2
+
 @dataclass
 class Signal:
     action: Literal["LONG", "SHORT", "NONE"]
@@ -15,6 +23,15 @@ class Signal:
     tp: float
     timestamp: pd.Timestamp
 
+@dataclass
+class SignalArrays:
+    """Per-bar entry signals of a whole history (SL / TP are NaN on bars without a signal)."""
+    index: pd.DatetimeIndex
+    long: np.ndarray
+    short: np.ndarray
+    sl: np.ndarray
+    tp: np.ndarray
+
 class DayTradingStrategy:
     """
     Day Trading Strategy optimized for BTC/USDT 15m timeframe.
@@ -46,6 +63,62 @@ class DayTradingStrategy:
         self.rsi_long_max = 60               # Reasonable RSI filter
         self.rsi_short_min = 40              # Reasonable RSI filter
 
+        # Streaming indicator state (O(1) per candle, independent of history length)
+        self.trend_engine = IndicatorEngine(lambda: {
+            'EMA50': EMA(50),
+            'EMA200': EMA(200),
+            'ADX': ADX(14),
+        })
+        self.entry_engine = IndicatorEngine(lambda: {
+            'EMA200': EMA(200),
+            'RSI': RSI(14),
+            'STOCHRSI': StochRSI(length=14, rsi_length=14, k=3, d=3),
+            'ATR': ATR(self.atr_period),
+        })
+
+    def snapshot(self) -> dict:
+        """Streaming indicator state, restorable into a strategy with the same indicator parameters."""
+        return {
+            'atr_period': self.atr_period,
+            'trend': self.trend_engine.snapshot(),
+            'entry': self.entry_engine.snapshot(),
+        }
+
+    def restore(self, snap: dict) -> bool:
+        """Load a snapshot(); returns False (state left empty) if it does not fit this strategy."""
+        if snap.get('atr_period') != self.atr_period:
+            return False
+        try:
+            self.trend_engine.restore(snap['trend'])
+            self.entry_engine.restore(snap['entry'])
+        except (KeyError, ValueError):
+            self.trend_engine.reset()
+            self.entry_engine.reset()
+            return False
+        return True
+
+    @staticmethod
+    def _sync(engine: IndicatorEngine, df: pd.DataFrame):
+        """Feed the engine the candles it has not seen yet (plus the last REVISION_DEPTH bars)."""
+        start = 0
+        last = engine.last_timestamp
+        if last is not None:
+            pos = df.index.searchsorted(pd.Timestamp(last, unit='ms'))
+            if pos < len(df) and df.index[pos] == pd.Timestamp(last, unit='ms'):
+                start = max(pos - (REVISION_DEPTH - 1), 0)
+            else:
+                engine.reset()  # Frame no longer overlaps the engine state
+
+        tail = df.iloc[start:]
+        timestamps = tail.index.values.astype('datetime64[ms]').astype(np.int64)
+        values = tail[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=np.float64)
+        for ts, row in zip(timestamps, values):
+            if not engine.update((ts, *row)):
+                # Revision older than the rollback window: rebuild from the whole frame
+                engine.reset()
+                DayTradingStrategy._sync(engine, df)
+                return
+
     def analyze(self, df_15m: pd.DataFrame, df_1h: pd.DataFrame) -> Optional[Signal]:
         """
         Analyzes 15m and 1h dataframes for Day Trading signals.
@@ -58,52 +131,28 @@ class DayTradingStrategy:
         if df_15m.empty or df_1h.empty:
             return None
 
-        # --- 1H Trend Filter + Chop Filter ---
-        df_1h['EMA50'] = ta.ema(df_1h['close'], length=50)
-        df_1h['EMA200'] = ta.ema(df_1h['close'], length=200)
-        
-        # ADX for Trend Strength
-        adx_result = ta.adx(df_1h['high'], df_1h['low'], df_1h['close'], length=14)
-        if adx_result is None or adx_result.empty:
+        # Incremental update: only new / revised candles are fed to the engines
+        self._sync(self.trend_engine, df_1h)
+        self._sync(self.entry_engine, df_15m)
+        if len(self.trend_engine.rows) < 2 or len(self.entry_engine.rows) < 3:
             return None
-        df_1h = df_1h.join(adx_result)
-        
-        last_1h = df_1h.iloc[-2]  # Last COMPLETED 1H candle
+
+        # --- 1H Trend Filter + Chop Filter ---
+        last_1h = self.trend_engine.rows[-2]  # Last COMPLETED 1H candle
+        adx = last_1h['ADX'][0]
         
         # Trend + Strength
-        trend_bullish = (last_1h['EMA50'] > last_1h['EMA200']) and (last_1h['ADX_14'] > self.adx_threshold)
-        trend_bearish = (last_1h['EMA50'] < last_1h['EMA200']) and (last_1h['ADX_14'] > self.adx_threshold)
+        trend_bullish = (last_1h['EMA50'] > last_1h['EMA200']) and (adx > self.adx_threshold)
+        trend_bearish = (last_1h['EMA50'] < last_1h['EMA200']) and (adx > self.adx_threshold)
 
         # --- 15m Execution Indicators ---
-        df_15m['EMA200'] = ta.ema(df_15m['close'], length=200)
-        df_15m['RSI'] = ta.rsi(df_15m['close'], length=14)
-        
-        # Stochastic RSI
-        stoch = ta.stochrsi(df_15m['close'], length=14, rsi_length=14, k=3, d=3)
-        if stoch is None or stoch.empty:
-            return None
-        df_15m = df_15m.join(stoch)
-        
-        # Column names
-        k_col = [c for c in df_15m.columns if c.startswith('STOCHRSIk')][0]
-        d_col = [c for c in df_15m.columns if c.startswith('STOCHRSId')][0]
-        
-        # ATR for dynamic stops
-        atr = ta.atr(df_15m['high'], df_15m['low'], df_15m['close'], length=self.atr_period)
-        if atr is None:
-            return None
-        df_15m = df_15m.join(atr)
-        atr_col = 'ATRr_14' if 'ATRr_14' in df_15m.columns else 'ATR_14'
-
         # Analyze last COMPLETED candle
-        current = df_15m.iloc[-2]
-        prev = df_15m.iloc[-3]
+        current = self.entry_engine.rows[-2]
+        prev = self.entry_engine.rows[-3]
         
         # --- LONG SETUP ---
-        stoch_k = current[k_col]
-        stoch_d = current[d_col]
-        prev_k = prev[k_col]
-        prev_d = prev[d_col]
+        stoch_k, stoch_d = current['STOCHRSI']
+        prev_k, prev_d = prev['STOCHRSI']
         
         stoch_cross_up = (stoch_k > stoch_d) and (prev_k <= prev_d)
         stoch_in_oversold = stoch_k < self.stoch_oversold
@@ -113,7 +162,7 @@ class DayTradingStrategy:
         
         if trend_bullish and price_above_ema and rsi_valid_long and stoch_cross_up and stoch_in_oversold:
             entry_price = current['close']
-            sl_dist = current[atr_col] * self.sl_atr_multiplier
+            sl_dist = current['ATR'] * self.sl_atr_multiplier
             sl = entry_price - sl_dist
             risk = entry_price - sl
             tp = entry_price + (risk * self.risk_reward_ratio)
@@ -124,7 +173,7 @@ class DayTradingStrategy:
                 reason=f"1H Bull+ADX>{self.adx_threshold} | 15m>EMA | StochRSI<{self.stoch_oversold} Cross↑ | RSI<{self.rsi_long_max}",
                 sl=sl,
                 tp=tp,
-                timestamp=current.name
+                timestamp=pd.Timestamp(current['timestamp'], unit='ms')
             )
             
         # --- SHORT SETUP ---
@@ -136,7 +185,7 @@ class DayTradingStrategy:
         
         if trend_bearish and price_below_ema and rsi_valid_short and stoch_cross_down and stoch_in_overbought:
             entry_price = current['close']
-            sl_dist = current[atr_col] * self.sl_atr_multiplier
+            sl_dist = current['ATR'] * self.sl_atr_multiplier
             sl = entry_price + sl_dist
             risk = sl - entry_price
             tp = entry_price - (risk * self.risk_reward_ratio)
@@ -147,7 +196,70 @@ class DayTradingStrategy:
                 reason=f"1H Bear+ADX>{self.adx_threshold} | 15m<EMA | StochRSI>{self.stoch_overbought} Cross↓ | RSI>{self.rsi_short_min}",
                 sl=sl,
                 tp=tp,
-                timestamp=current.name
+                timestamp=pd.Timestamp(current['timestamp'], unit='ms')
             )
             
         return None
+
+    def signal_features(self, df_15m: pd.DataFrame, df_1h: pd.DataFrame,
+                        entry_timeframe: str = '15m', trend_timeframe: str = '1h') -> Dict[str, np.ndarray]:
+        """
+        Per-15m-bar inputs of generate_signals: the 15m indicators and the 1H
+        trend context known when the bar closes. None of them depends on the
+        thresholds / SL / TP parameters (only ATR on atr_period), so parameter
+        sweeps compute them once (backtesting/sweep.py).
+        """
+        close = df_15m['close'].to_numpy(dtype=np.float64)
+        stoch_k, stoch_d = indicator_cache.get('stochrsi', [df_15m['close']], length=14, rsi_length=14, k=3, d=3)
+
+        # --- 1H Trend Filter (last 1H candle completed when the 15m bar closes) ---
+        trend = pd.DataFrame({
+            'EMA50': indicator_cache.get('ema', [df_1h['close']], length=50),
+            'EMA200': indicator_cache.get('ema', [df_1h['close']], length=200),
+            'ADX': indicator_cache.get('adx', [df_1h['high'], df_1h['low'], df_1h['close']], length=14)[0],
+        })
+        closed_at = df_15m.index + pd.Timedelta(milliseconds=timeframe_to_ms(entry_timeframe))
+        ctx_1h = take_aligned(trend, completed_bar_index(closed_at, df_1h.index, trend_timeframe),
+                              ['EMA50', 'EMA200', 'ADX'])
+        return {
+            'close': close,
+            'ema200': indicator_cache.get('ema', [df_15m['close']], length=200),
+            'rsi': indicator_cache.get('rsi', [df_15m['close']], length=14),
+            'atr': indicator_cache.get('atr', [df_15m['high'], df_15m['low'], df_15m['close']], length=self.atr_period),
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+            'prev_k': np.concatenate([[np.nan], stoch_k[:-1]]),
+            'prev_d': np.concatenate([[np.nan], stoch_d[:-1]]),
+            'ema50_1h': ctx_1h['EMA50'],
+            'ema200_1h': ctx_1h['EMA200'],
+            'adx_1h': ctx_1h['ADX'],
+        }
+
+    def generate_signals(self, df_15m: pd.DataFrame, df_1h: pd.DataFrame,
+                         entry_timeframe: str = '15m', trend_timeframe: str = '1h') -> SignalArrays:
+        """
+        Batch counterpart of analyze() for backtests: the signal of every 15m bar
+        in one vectorized pass over the whole history.
+
+        Bar i gets what analyze() returns right after it closes, i.e. with the 1H
+        candle completed at that time as trend context. Every row is treated as a
+        completed candle; bars whose 1H context candle is missing get no signal.
+        """
+        f = self.signal_features(df_15m, df_1h, entry_timeframe, trend_timeframe)
+        close = f['close']
+        trend_bullish = (f['ema50_1h'] > f['ema200_1h']) & (f['adx_1h'] > self.adx_threshold)
+        trend_bearish = (f['ema50_1h'] < f['ema200_1h']) & (f['adx_1h'] > self.adx_threshold)
+
+        # --- 15m Entry (same conditions as analyze; NaN compares False) ---
+        long = (trend_bullish & (close > f['ema200']) & (f['rsi'] < self.rsi_long_max)
+                & (f['stoch_k'] > f['stoch_d']) & (f['prev_k'] <= f['prev_d']) & (f['stoch_k'] < self.stoch_oversold))
+        short = (trend_bearish & (close < f['ema200']) & (f['rsi'] > self.rsi_short_min)
+                 & (f['stoch_k'] < f['stoch_d']) & (f['prev_k'] >= f['prev_d']) & (f['stoch_k'] > self.stoch_overbought))
+
+        sl_dist = f['atr'] * self.sl_atr_multiplier
+        long_sl = close - sl_dist
+        short_sl = close + sl_dist
+        sl = np.where(long, long_sl, np.where(short, short_sl, np.nan))
+        tp = np.where(long, close + (close - long_sl) * self.risk_reward_ratio,
+                      np.where(short, close - (short_sl - close) * self.risk_reward_ratio, np.nan))
+        return SignalArrays(index=df_15m.index, long=long, short=short, sl=sl, tp=tp)
@@ -1,8 +1,8 @@
-import pandas_ta as ta
 import pandas as pd
 from dataclasses import dataclass
 from typing import Optional, Literal
 from structlog import get_logger
+from indicators.cache import indicator_cache
 
 log = get_logger()
 
@@ -26,19 +26,17 @@ class MultiTimeframeStrategy:
         Analyzes 1h and 4h dataframes for signals.
         df_1h and df_4h must have 'open', 'high', 'low', 'close', 'volume' columns and datetime index.
         """
-        if df_1h.empty or df_4h.empty:
+        # Needs the last two completed 1h candles and the last completed 4h one
+        if len(df_1h) < 3 or len(df_4h) < 2:
             return None
 
         # --- 4h Trend Analysis ---
         # EMA50 > EMA200
-        df_4h['EMA50'] = ta.ema(df_4h['close'], length=50)
-        df_4h['EMA200'] = ta.ema(df_4h['close'], length=200)
+        df_4h['EMA50'] = indicator_cache.get('ema', [df_4h['close']], length=50)
+        df_4h['EMA200'] = indicator_cache.get('ema', [df_4h['close']], length=200)
         
         # ADX > 22
-        adx_4h = ta.adx(df_4h['high'], df_4h['low'], df_4h['close'], length=14)
-        if adx_4h is None or adx_4h.empty:
-            return None
-        df_4h = df_4h.join(adx_4h) # Adds ADX_14, DMP_14, DMN_14
+        df_4h['ADX_14'], df_4h['DMP_14'], df_4h['DMN_14'] = indicator_cache.get('adx', [df_4h['high'], df_4h['low'], df_4h['close']], length=14)
 
         # Using iloc[-2] to ensure we analyze the last COMPLETED candle.
         # iloc[-1] is the developing candle which has incomplete volume.
@@ -49,16 +47,13 @@ class MultiTimeframeStrategy:
         
         # --- 1h Momentum Analysis ---
         # RSI(14)
-        df_1h['RSI'] = ta.rsi(df_1h['close'], length=14)
+        df_1h['RSI'] = indicator_cache.get('rsi', [df_1h['close']], length=14)
         
         # MACD
-        macd = ta.macd(df_1h['close'])
-        if macd is None or macd.empty:
-            return None
-        df_1h = df_1h.join(macd) # MACD_12_26_9, MACDh_12_26_9 (Hist), MACDs_12_26_9 (Signal)
+        df_1h['MACD_12_26_9'], df_1h['MACDh_12_26_9'], df_1h['MACDs_12_26_9'] = indicator_cache.get('macd', [df_1h['close']], fast=12, slow=26, signal=9)
         
         # Volume MA(20)
-        df_1h['VolMA20'] = ta.sma(df_1h['volume'], length=20)
+        df_1h['VolMA20'] = indicator_cache.get('sma', [df_1h['volume']], length=20)
         
         # Use iloc[-2] (Completed Candle) and iloc[-3] (Previous Completed Candle)
         current_1h = df_1h.iloc[-2]
@@ -83,8 +78,8 @@ class MultiTimeframeStrategy:
         macd_cross_short = (current_1h['MACDh_12_26_9'] < 0) and (prev_1h['MACDh_12_26_9'] >= 0)
 
         # ATR for SL/TP
-        atr = ta.atr(df_1h['high'], df_1h['low'], df_1h['close'], length=self.atr_period)
-        current_atr = atr.iloc[-1]
+        atr = indicator_cache.get('atr', [df_1h['high'], df_1h['low'], df_1h['close']], length=self.atr_period)
+        current_atr = atr[-1]
 
         signal = None
         action = "NONE"
@@ -0,0 +1,46 @@
+"""Coalescing of candle updates and their order around FIFO control events."""
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.event_queue import CoalescingQueue
+
+
+def _candle(close):
+    return {'type': 'ohlcv', 'symbol': 'BTC/USDT', 'timeframe': '15m', 'data': [[1_700_000_000_000, 1.0, 2.0, 0.5, close, 10.0]]}
+
+
+async def _drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(await queue.get())
+        queue.task_done()
+    return events
+
+
+def test_candle_updates_coalesce():
+    async def run():
+        queue = CoalescingQueue()
+        await queue.put(_candle(1.5))
+        await queue.put(_candle(1.6))
+        return await _drain(queue)
+
+    events = asyncio.run(run())
+    assert [e['data'][0][4] for e in events] == [1.6]
+
+
+def test_candle_after_reconnect_stays_behind_it():
+    async def run():
+        queue = CoalescingQueue()
+        await queue.put(_candle(1.5))
+        await queue.put({'type': 'reconnect', 'symbol': 'BTC/USDT', 'timeframe': '15m'})
+        await queue.put(_candle(1.6))
+        await queue.put(_candle(1.7))  # Coalesces with the update behind the marker
+        return await _drain(queue)
+
+    events = asyncio.run(run())
+    assert [e['type'] for e in events] == ['ohlcv', 'reconnect', 'ohlcv']
+    assert events[0]['data'][0][4] == 1.5
+    assert events[2]['data'][0][4] == 1.7
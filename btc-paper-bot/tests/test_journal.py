@@ -0,0 +1,64 @@
+"""Journal round trip, stream markers and recovery from a record cut off by a crash."""
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.journal import JournalBackfiller, JournalWriter, read_journal
+
+CANDLES = [[1_700_000_000_000, 1.0, 2.0, 0.5, 1.5, 10.0], [1_700_000_900_000, 1.5, 2.5, 1.0, 2.0, 12.0]]
+TICKER = {'timestamp': 1_700_000_000_500, 'last': 1.5, 'bid': 1.4, 'ask': 1.6}
+
+
+def _write_session(path, recv_ts):
+    writer = JournalWriter(path)
+    writer.record_ticker('BTC/USDT', TICKER, recv_ts=recv_ts)
+    writer.record_ohlcv('BTC/USDT', '15m', CANDLES, recv_ts=recv_ts + 1)
+    writer.close()
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'events.bin')
+    _write_session(path, 100.0)
+    items = list(read_journal(path))
+    assert [item['type'] for _, item in items] == ['ticker', 'ohlcv']
+    assert items[0][1]['data']['last'] == 1.5
+    assert items[1] == (101.0, {'type': 'ohlcv', 'symbol': 'BTC/USDT', 'timeframe': '15m', 'data': CANDLES})
+
+
+def test_truncated_tail(tmp_path):
+    path = str(tmp_path / 'events.bin')
+    _write_session(path, 100.0)
+    os.truncate(path, os.path.getsize(path) - 5)  # Crash in the middle of the OHLCV record
+
+    # Reader: everything before the partial record, no error
+    assert [item['type'] for _, item in read_journal(path)] == ['ticker']
+
+    # Writer: the partial record is cut off, so the next session stays readable
+    _write_session(path, 200.0)
+    items = list(read_journal(path))
+    assert [(ts, item['type']) for ts, item in items] == [(100.0, 'ticker'), (200.0, 'ticker'), (201.0, 'ohlcv')]
+    assert items[-1][1]['data'] == CANDLES
+
+
+def test_reconnect_and_gap_records(tmp_path):
+    path = str(tmp_path / 'events.bin')
+    writer = JournalWriter(path)
+    writer.record_reconnect('BTC/USDT', '15m', recv_ts=100.0)
+    writer.record_reconnect(None, '15m', recv_ts=101.0)
+    writer.record_gap('BTC/USDT', '15m', CANDLES[0][0], CANDLES[1][0], CANDLES, recv_ts=102.0)
+    writer.record_gap('ETH/USDT', '15m', 0, 900_000, [], recv_ts=103.0)
+    writer.close()
+
+    items = [item for _, item in read_journal(path)]
+    assert items[0] == {'type': 'reconnect', 'symbol': 'BTC/USDT', 'timeframe': '15m'}
+    assert items[1] == {'type': 'reconnect', 'symbol': None, 'timeframe': '15m'}
+    assert items[2] == {'type': 'gap', 'symbol': 'BTC/USDT', 'timeframe': '15m',
+                        'start': CANDLES[0][0], 'end': CANDLES[1][0], 'data': CANDLES}
+    assert items[3]['data'] == []
+
+    # Replays get each recorded backfill back for the same gap, and nothing for unrecorded ones
+    backfiller = JournalBackfiller(path)
+    assert asyncio.run(backfiller.fetch('BTC/USDT', '15m', CANDLES[0][0], CANDLES[1][0])) == CANDLES
+    assert asyncio.run(backfiller.fetch('BTC/USDT', '15m', CANDLES[0][0], CANDLES[1][0])) == []
@@ -0,0 +1,63 @@
+"""Indicator kernels against pandas_ta, on both backends (numba loops and the NumPy fallback)."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators import kernels
+from benchmark_indicators import KERNELS, PANDAS_TA, random_walk
+
+TOLERANCE = 1e-9  # Relative, as benchmark_indicators.py
+BARS = 5_000
+
+
+@pytest.fixture(params=['numpy', 'numba'])
+def backend(request, monkeypatch):
+    if request.param == 'numba':
+        if not kernels.HAVE_NUMBA:
+            pytest.skip("numba not installed")
+    else:
+        monkeypatch.setattr(kernels, '_decay_cumsum', kernels._decay_cumsum_numpy)
+        monkeypatch.setattr(kernels, '_rolling', kernels._rolling_numpy)
+    return request.param
+
+
+def _assert_close(got, expected):
+    np.testing.assert_array_equal(np.isnan(got), np.isnan(expected))  # Same warm-up rows
+    valid = ~np.isnan(expected)
+    err = np.abs(got[valid] - expected[valid]) / np.maximum(np.abs(expected[valid]), 1.0)
+    assert err.max(initial=0.0) <= TOLERANCE
+
+
+@pytest.mark.parametrize('name', list(KERNELS))
+def test_matches_pandas_ta(name, backend):
+    pytest.importorskip('pandas_ta')
+    data = random_walk(BARS, seed=11)
+    got, expected = KERNELS[name](data), PANDAS_TA[name](pd.DataFrame(data))
+    assert len(got) == len(expected)
+    for a, b in zip(got, expected):
+        _assert_close(a, b)
+
+
+def test_numpy_primitives_match_loops():
+    rng = np.random.default_rng(3)
+    v = rng.normal(size=3_000)
+    for decay in (0.0, 0.5, 13 / 14, 0.999):
+        expected = np.empty(len(v))
+        acc = 0.0
+        for i, x in enumerate(v):
+            acc = decay * acc + x
+            expected[i] = acc
+        np.testing.assert_allclose(kernels._decay_cumsum_numpy(v, decay), expected, rtol=1e-9, atol=1e-9)
+
+    x = v.copy()
+    x[[0, 100, 101, 2_000]] = np.nan
+    for length in (1, 3, 14):
+        windows = [x[i - length + 1:i + 1] for i in range(length - 1, len(x))]
+        for how, fn in (('min', np.min), ('max', np.max), ('mean', np.mean)):
+            expected = np.concatenate([np.full(length - 1, np.nan), [fn(w) for w in windows]])
+            np.testing.assert_allclose(kernels._rolling_numpy(x, length, how), expected, rtol=1e-12)
@@ -0,0 +1,53 @@
+"""Batch signals (generate_signals / signal_features) against bar-by-bar analyze() on a synthetic history."""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting.market_data import resample_1h
+from benchmark_signals import make_strategy, random_walk_15m
+
+BARS = 3_000  # 1H EMA200 warm-up is 800 bars
+TOLERANCE = 1e-9  # Relative
+
+
+def _close(a, b):
+    return (np.isnan(a) and np.isnan(b)) or abs(a - b) <= TOLERANCE * max(abs(b), 1.0)
+
+
+@pytest.mark.parametrize('loose', [False, True])
+def test_batch_matches_analyze(loose):
+    df_15m = random_walk_15m(BARS, seed=7)
+    df_1h = resample_1h(df_15m)
+    batch_strategy = make_strategy(loose)
+    batch = batch_strategy.generate_signals(df_15m, df_1h)
+    features = batch_strategy.signal_features(df_15m, df_1h)
+    strategy = make_strategy(loose)
+
+    hours = df_1h.index
+    signals = 0
+    for i in range(len(df_15m) - 1):
+        # Live view right after bar i closed: bar i+1 is developing, and so is its hour
+        developing_hour = hours.searchsorted(df_15m.index[i + 1], side='right')
+        signal = strategy.analyze(df_15m.iloc[:i + 2], df_1h.iloc[:developing_hour])
+
+        if len(strategy.trend_engine.rows) >= 2 and len(strategy.entry_engine.rows) >= 3:
+            # Same indicator inputs as the per-bar engines
+            current, trend = strategy.entry_engine.rows[-2], strategy.trend_engine.rows[-2]
+            assert current['timestamp'] == df_15m.index[i].value // 10**6
+            for name, value in (('ema200', current['EMA200']), ('rsi', current['RSI']), ('atr', current['ATR']),
+                                ('stoch_k', current['STOCHRSI'][0]), ('stoch_d', current['STOCHRSI'][1]),
+                                ('ema50_1h', trend['EMA50']), ('ema200_1h', trend['EMA200']),
+                                ('adx_1h', trend['ADX'][0])):
+                assert _close(value, features[name][i]), (df_15m.index[i], name, value, features[name][i])
+
+        action = "LONG" if batch.long[i] else "SHORT" if batch.short[i] else None
+        assert (signal.action if signal else None) == action, df_15m.index[i]
+        if signal:
+            signals += 1
+            assert signal.timestamp == batch.index[i]
+            assert _close(signal.sl, batch.sl[i]) and _close(signal.tp, batch.tp[i])
+    assert signals > 0
@@ -0,0 +1,55 @@
+"""Warm-start snapshot: SymbolState round trip through the snapshot file."""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.market_state import SymbolState
+from data.snapshot import load_snapshot, save_snapshot
+
+START = 1_700_000_000_000 - 1_700_000_000_000 % 3_600_000
+STEP = 900_000
+
+
+def _candles(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 60000.0 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    return [[START + i * STEP, c, c * 1.001, c * 0.999, c, 10.0] for i, c in enumerate(close)]
+
+
+def _state(capacity=50):
+    return SymbolState('BTC/USDT', ['15m', '1h'], '15m', capacity=capacity)
+
+
+def test_round_trip(tmp_path):
+    candles = _candles(130)  # Ends inside an hour: the 1h bucket is still developing
+    state = _state()
+    state.seed_history('15m', candles[:100])
+    for candle in candles[100:]:
+        state.ingest('15m', candle)
+
+    path = str(tmp_path / 'snapshot.pkl')
+    save_snapshot(path, {'BTC/USDT': state.snapshot()}, {})
+    restored = _state()
+    assert restored.restore(load_snapshot(path)['states']['BTC/USDT'])
+
+    for tf in state.buffers:
+        np.testing.assert_array_equal(restored.buffers[tf].rows(), state.buffers[tf].rows())
+    assert restored.bar_events.last_ts == state.bar_events.last_ts
+    assert restored.bar_events.last_closed == state.bar_events.last_closed
+    assert restored.last_real == state.last_real
+
+    # Both continue identically: same bar closes, same resampled 1h candle
+    nxt = [START + 130 * STEP, 1.0, 2.0, 0.5, 1.5, 5.0]
+    assert restored.ingest('15m', nxt) == state.ingest('15m', nxt)
+    np.testing.assert_array_equal(restored.buffers['1h'].rows(), state.buffers['1h'].rows())
+
+
+def test_mismatched_settings_are_refused():
+    state = _state()
+    state.seed_history('15m', _candles(10))
+    fresh = _state(capacity=60)
+    assert not fresh.restore(state.snapshot())
+    assert len(fresh.buffers['15m']) == 0
@@ -0,0 +1,153 @@
+"""Streaming indicator engine: parity with the batch kernels / pandas_ta and revised-candle rollback."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators import kernels
+from indicators.streaming import ADX, ATR, EMA, RSI, IndicatorEngine, StochRSI
+from strategies.day_trading import REVISION_DEPTH, DayTradingStrategy
+from benchmark_indicators import random_walk
+
+TOLERANCE = 1e-9  # Relative, as benchmark_indicators.py
+BARS = 2_000
+
+
+def _indicators():
+    return {
+        'EMA200': EMA(200),
+        'RSI': RSI(14),
+        'ATR': ATR(14),
+        'ADX': ADX(14),
+        'STOCHRSI': StochRSI(length=14, rsi_length=14, k=3, d=3),
+    }
+
+
+def _candles(n=BARS, seed=5):
+    d = random_walk(n, seed)
+    ts = 1_700_000_000_000 + np.arange(n) * 900_000
+    return np.column_stack([ts, d['open'], d['high'], d['low'], d['close'], d['volume']])
+
+
+def _stream(candles, history=3):
+    engine = IndicatorEngine(_indicators, history=history)
+    for candle in candles:
+        assert engine.update(candle)
+    return engine
+
+
+def _outputs(rows, name):
+    return np.array([row[name] for row in rows], dtype=np.float64).reshape(len(rows), -1).T
+
+
+def _assert_close(got, expected):
+    np.testing.assert_array_equal(np.isnan(got), np.isnan(expected))  # Same warm-up rows
+    valid = ~np.isnan(expected)
+    err = np.abs(got[valid] - expected[valid]) / np.maximum(np.abs(expected[valid]), 1.0)
+    assert err.max(initial=0.0) <= TOLERANCE
+
+
+def _assert_same_rows(a, b):
+    assert [row['timestamp'] for row in a] == [row['timestamp'] for row in b]
+    for name in _indicators():
+        np.testing.assert_array_equal(_outputs(a, name), _outputs(b, name))
+
+
+def _batch(candles):
+    high, low, close = candles[:, 2], candles[:, 3], candles[:, 4]
+    return {
+        'EMA200': (kernels.ema(close, 200),),
+        'RSI': (kernels.rsi(close, 14),),
+        'ATR': (kernels.atr(high, low, close, 14),),
+        'ADX': kernels.adx(high, low, close, 14),
+        'STOCHRSI': kernels.stochrsi(close, length=14, rsi_length=14, k=3, d=3),
+    }
+
+
+def test_matches_batch_kernels():
+    candles = _candles()
+    rows = list(_stream(candles, history=BARS).rows)
+    for name, expected in _batch(candles).items():
+        for got, exp in zip(_outputs(rows, name), expected):
+            _assert_close(got, exp)
+
+
+def test_matches_pandas_ta():
+    ta = pytest.importorskip('pandas_ta')
+    candles = _candles()
+    df = pd.DataFrame(candles[:, 1:], columns=['open', 'high', 'low', 'close', 'volume'])
+    rows = list(_stream(candles, history=BARS).rows)
+    expected = {
+        'EMA200': (ta.ema(df['close'], length=200).to_numpy(),),
+        'RSI': (ta.rsi(df['close'], length=14).to_numpy(),),
+        'ATR': (ta.atr(df['high'], df['low'], df['close'], length=14).to_numpy(),),
+        'ADX': tuple(ta.adx(df['high'], df['low'], df['close'], length=14).to_numpy().T),
+        'STOCHRSI': tuple(ta.stochrsi(df['close'], length=14, rsi_length=14, k=3, d=3).to_numpy().T),
+    }
+    for name, columns in expected.items():
+        for got, exp in zip(_outputs(rows, name), columns):
+            _assert_close(got, exp)
+
+
+@pytest.mark.parametrize('depth', [1, 2])
+def test_revised_candles_roll_back(depth):
+    candles = _candles(400)
+    revised = candles.copy()
+    revised[-depth:, 4] *= 1.01  # New close (and range) for the last `depth` candles
+    revised[-depth:, 2] = np.maximum(revised[-depth:, 2], revised[-depth:, 4])
+
+    engine = _stream(candles)
+    for candle in revised[-depth:]:
+        assert engine.update(candle)
+    _assert_same_rows(engine.rows, _stream(revised).rows)
+
+
+def test_revision_beyond_journal_needs_rebuild():
+    candles = _candles(400)
+    engine = _stream(candles)
+    old = candles[-engine.history - 1].copy()
+    old[4] *= 1.01
+    assert not engine.update(old)  # Older than the rollback window: the caller must rebuild
+
+
+def _frame(candles):
+    index = pd.to_datetime(candles[:, 0].astype(np.int64), unit='ms')
+    return pd.DataFrame(candles[:, 1:], index=index, columns=['open', 'high', 'low', 'close', 'volume'])
+
+
+def test_strategy_sync_revises_last_bars():
+    candles = _candles(400)
+    engine = IndicatorEngine(_indicators)
+    DayTradingStrategy._sync(engine, _frame(candles[:-1]))
+
+    # Late updates of the last REVISION_DEPTH bars the engine has seen, plus a new bar
+    revised = candles.copy()
+    seen = slice(-1 - REVISION_DEPTH, -1)
+    revised[seen, 4] *= 0.99
+    revised[seen, 3] = np.minimum(revised[seen, 3], revised[seen, 4])
+    DayTradingStrategy._sync(engine, _frame(revised))
+    _assert_same_rows(engine.rows, _stream(revised).rows)
+
+
+def test_strategy_sync_rebuilds_beyond_journal():
+    candles = _candles(400)
+    engine = IndicatorEngine(_indicators, history=1)  # Shorter than REVISION_DEPTH: re-fed bars fall out
+    DayTradingStrategy._sync(engine, _frame(candles[:-1]))
+
+    revised = candles.copy()
+    revised[-3, 4] *= 1.01  # Re-fed by the next sync, but no longer in the engine's journal
+    revised[-3, 2] = max(revised[-3, 2], revised[-3, 4])
+    DayTradingStrategy._sync(engine, _frame(revised))
+    _assert_same_rows(engine.rows, _stream(revised, history=1).rows)
+
+
+def test_strategy_sync_resets_on_disjoint_frame():
+    candles = _candles(800)
+    engine = IndicatorEngine(_indicators)
+    DayTradingStrategy._sync(engine, _frame(candles[:400]))
+    DayTradingStrategy._sync(engine, _frame(candles[450:]))  # Does not contain the last fed bar
+    _assert_same_rows(engine.rows, _stream(candles[450:]).rows)
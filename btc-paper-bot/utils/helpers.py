@@ -11,3 +11,14 @@ def format_balance(amount: float) -> str:
 
 def format_pct(value: float) -> str:
     return f"{value * 100:.2f}%"
+
+TIMEFRAME_UNIT_MS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+}
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Convert a ccxt timeframe string ('15m', '1h', '4h', ...) to milliseconds."""
+    return int(timeframe[:-1]) * TIMEFRAME_UNIT_MS[timeframe[-1]]